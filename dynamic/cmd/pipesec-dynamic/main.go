@@ -8,20 +8,36 @@ import (
 	"io"
 	"os"
 	"os/exec"
+	"strconv"
 	"time"
 
 	"github.com/yetanotherparticipant/PipeSec/dynamic/internal/dynscan"
 )
 
 func main() {
-	mode := flag.String("mode", "scan", "scan|run")
+	mode := flag.String("mode", "scan", "scan|run|redact")
 	format := flag.String("format", "console", "console|json")
 	source := flag.String("source", "stdin", "source label for findings")
 	logFile := flag.String("log", "", "path to log file (optional; default stdin)")
 	timeout := flag.Duration("timeout", 0, "timeout for run mode (0 = none)")
 	patternsPath := flag.String("patterns", "", "path to pipesec secret_patterns.json (optional)")
+	stream := flag.Bool("stream", false, "run mode: forward command output and emit NDJSON findings as soon as they are detected")
+	redact := flag.Bool("redact", false, "stream mode: redact detected secrets in forwarded output")
+	findingsOut := flag.String("findings-out", "", "NDJSON findings destination, a file or e.g. /dev/fd/3 (required with -stream; redact mode: default stderr)")
+	latency := flag.Bool("latency", false, "stream/redact modes: print a per-line latency histogram to stderr on exit")
 	flag.Parse()
 
+	if *redact && !*stream && *mode == "run" {
+		fmt.Fprintln(os.Stderr, "-redact requires -stream")
+		os.Exit(2)
+	}
+	if *stream && *mode == "run" && *findingsOut == "" {
+		// stderr carries the command's own stderr: findings written there could
+		// not be told apart from it.
+		fmt.Fprintln(os.Stderr, "-stream requires -findings-out (a file or e.g. /dev/fd/3)")
+		os.Exit(2)
+	}
+
 	patterns := dynscan.DefaultSecretPatterns()
 	if *patternsPath != "" {
 		if loaded, err := dynscan.LoadSecretPatternsFromFile(*patternsPath); err == nil {
@@ -39,17 +55,24 @@ func main() {
 	var findings []dynscan.Finding
 	switch *mode {
 	case "scan":
-		var r io.Reader = os.Stdin
-		if *logFile != "" {
-			f, err := os.Open(*logFile)
-			if err != nil {
-				exitWith(findingsWithIOError(*logFile, err), *format, 1)
-			}
-			defer f.Close()
-			r = f
-		}
+		r := openInput(*logFile, *format)
 		findings = dynscan.ScanLogStream(r, *source, patterns)
 		exitWith(findings, *format, exitCode(findings))
+	case "redact":
+		// stdin (or -log) -> stdout filter: every line is forwarded as soon as it
+		// is scanned, with secrets replaced by ***<type>***.
+		r := openInput(*logFile, *format)
+		sink, sinkFile := openSink(*findingsOut, *format)
+		opts := streamOptions(sink, os.Stdout, true)
+		if *latency {
+			opts.Latency = &dynscan.LatencyHistogram{}
+		}
+		dynscan.ScanLogStreamWith(r, *source, patterns, opts)
+		closeSink(sink, sinkFile)
+		if opts.Latency != nil {
+			opts.Latency.WriteTo(os.Stderr)
+		}
+		os.Exit(0)
 	case "run":
 		if flag.NArg() == 0 {
 			fmt.Fprintln(os.Stderr, "pipesec-dynamic -mode run -- <command> [args...]")
@@ -64,34 +87,38 @@ func main() {
 		stdout, _ := cmd.StdoutPipe()
 		stderr, _ := cmd.StderrPipe()
 
-		before := dynscan.LinuxRemoteEndpoints()
-		observed := map[string]struct{}{}
+		var sink *dynscan.NDJSONSink
+		var sinkFile *os.File
+		if *stream {
+			sink, sinkFile = openSink(*findingsOut, *format)
+		}
+		stdoutOpts := streamOptions(sink, os.Stdout, *redact)
+		stderrOpts := streamOptions(sink, os.Stderr, *redact)
+		if sink != nil && *latency {
+			stdoutOpts.Latency = &dynscan.LatencyHistogram{}
+			stderrOpts.Latency = &dynscan.LatencyHistogram{}
+		}
 
 		if err := cmd.Start(); err != nil {
 			exitWith(findingsWithExecError(cmdName, err), *format, 1)
 		}
 
+		// Only sockets owned by the command's process tree are attributed to it.
+		egress := dynscan.NewEgressCollector(cmd.Process.Pid)
 		stopEgress := make(chan struct{})
 		egressDone := make(chan struct{})
 		go func() {
 			defer close(egressDone)
-			t := time.NewTicker(200 * time.Millisecond)
-			defer t.Stop()
-			for {
-				select {
-				case <-t.C:
-					for ep := range dynscan.LinuxRemoteEndpoints() {
-						observed[ep] = struct{}{}
-					}
-				case <-stopEgress:
-					return
-				}
-			}
+			egress.Run(stopEgress)
 		}()
 
 		outCh := make(chan []dynscan.Finding, 2)
-		go func() { outCh <- dynscan.ScanLogStream(stdout, *source+":stdout", patterns) }()
-		go func() { outCh <- dynscan.ScanLogStream(stderr, *source+":stderr", patterns) }()
+		go func() {
+			outCh <- dynscan.ScanLogStreamWith(stdout, *source+":stdout", patterns, stdoutOpts)
+		}()
+		go func() {
+			outCh <- dynscan.ScanLogStreamWith(stderr, *source+":stderr", patterns, stderrOpts)
+		}()
 
 		f1 := <-outCh
 		f2 := <-outCh
@@ -102,26 +129,24 @@ func main() {
 		close(stopEgress)
 		<-egressDone
 
-		for ep := range dynscan.LinuxRemoteEndpoints() {
-			observed[ep] = struct{}{}
-		}
-
-		for ep := range observed {
-			if _, ok := before[ep]; ok {
-				continue
-			}
-			findings = append(findings, dynscan.Finding{
+		var late []dynscan.Finding
+		for _, conn := range egress.Connections() {
+			proc, seen := conn.Process, conn.FirstSeen
+			late = append(late, dynscan.Finding{
 				Severity:       dynscan.SeverityMedium,
 				Category:       "Network Egress (Observed)",
-				Description:    "Обнаружено новое исходящее сетевое соединение во время выполнения команды.",
+				Description:    "Обнаружено новое исходящее сетевое соединение во время выполнения команды (" + describeProcess(proc) + ").",
 				Location:       *source,
 				Recommendation: "Проверьте необходимость сетевого доступа; для CI лучше ограничивать egress и/или фиксировать allowlist доменов.",
-				Evidence:       ep,
+				Evidence:       conn.Endpoint,
+				Process:        &proc,
+				FirstSeen:      &seen,
+				RuleID:         "egress",
 			})
 		}
 
 		if err != nil {
-			findings = append(findings, dynscan.Finding{
+			late = append(late, dynscan.Finding{
 				Severity:       dynscan.SeverityLow,
 				Category:       "Command Exit",
 				Description:    "Команда завершилась с ошибкой.",
@@ -130,6 +155,29 @@ func main() {
 				Evidence:       err.Error(),
 			})
 		}
+		findings = append(findings, late...)
+
+		if sink != nil {
+			for _, f := range late {
+				sink.Send(f)
+			}
+			if dropped := sink.Dropped(); dropped > 0 {
+				sink.Send(dynscan.Finding{
+					Severity:       dynscan.SeverityLow,
+					Category:       "Stream Overflow",
+					Description:    "Часть находок не была выведена в поток: потребитель не успевал их читать.",
+					Location:       *source,
+					Recommendation: "Находки учтены в коде возврата; запустите анализ без -stream для полного отчёта.",
+					Evidence:       strconv.FormatInt(dropped, 10),
+				})
+			}
+			closeSink(sink, sinkFile)
+			if stdoutOpts.Latency != nil {
+				stdoutOpts.Latency.Merge(stderrOpts.Latency)
+				stdoutOpts.Latency.WriteTo(os.Stderr)
+			}
+			os.Exit(exitCode(findings))
+		}
 
 		exitWith(findings, *format, exitCode(findings))
 	default:
@@ -138,6 +186,58 @@ func main() {
 	}
 }
 
+// Findings queued for the NDJSON writer; beyond this they are counted as dropped
+// rather than blocking the goroutines that drain the command's pipes.
+const streamBuffer = 1024
+
+func openInput(path, format string) io.Reader {
+	if path == "" {
+		return os.Stdin
+	}
+	f, err := os.Open(path)
+	if err != nil {
+		exitWith(findingsWithIOError(path, err), format, 1)
+	}
+	// Closed on process exit.
+	return f
+}
+
+func openSink(path, format string) (*dynscan.NDJSONSink, *os.File) {
+	if path == "" {
+		return dynscan.NewNDJSONSink(os.Stderr, streamBuffer), nil
+	}
+	f, err := os.Create(path)
+	if err != nil {
+		exitWith([]dynscan.Finding{{
+			Severity:       dynscan.SeverityHigh,
+			Category:       "IO Error",
+			Description:    "Не удалось открыть файл для потоковых находок.",
+			Location:       path,
+			Recommendation: "Проверьте путь и права доступа.",
+			Evidence:       err.Error(),
+		}}, format, 1)
+	}
+	return dynscan.NewNDJSONSink(f, streamBuffer), f
+}
+
+func closeSink(sink *dynscan.NDJSONSink, f *os.File) {
+	sink.Close()
+	if f != nil {
+		f.Close()
+	}
+}
+
+func streamOptions(sink *dynscan.NDJSONSink, w io.Writer, redact bool) dynscan.StreamOptions {
+	if sink == nil {
+		return dynscan.StreamOptions{}
+	}
+	return dynscan.StreamOptions{
+		Passthrough: w,
+		Redact:      redact,
+		OnFinding:   func(f dynscan.Finding) { sink.TrySend(f) },
+	}
+}
+
 func contextOrBackground(timeout time.Duration) (context.Context, func()) {
 	if timeout <= 0 {
 		return context.Background(), func() {}
@@ -156,9 +256,16 @@ func exitCode(findings []dynscan.Finding) int {
 
 func exitWith(findings []dynscan.Finding, format string, code int) {
 	if format == "json" {
+		out := make([]dynscan.Finding, len(findings))
+		for i, f := range findings {
+			out[i] = dynscan.WithFingerprint(f)
+		}
 		b, _ := json.MarshalIndent(map[string]any{
-			"findings": findings,
-			"count":    len(findings),
+			"schemaVersion":    dynscan.SchemaVersion,
+			"engine":           "dynamic",
+			"findings":         out,
+			"count":            len(out),
+			"countsBySeverity": dynscan.CountsBySeverity(out),
 		}, "", "  ")
 		fmt.Println(string(b))
 	} else {
@@ -184,6 +291,17 @@ func exitWith(findings []dynscan.Finding, format string, code int) {
 	os.Exit(code)
 }
 
+func describeProcess(p dynscan.ProcessInfo) string {
+	out := "PID " + strconv.Itoa(p.PID)
+	switch {
+	case p.Cmdline != "":
+		out += ": " + p.Cmdline
+	case p.Exe != "":
+		out += ": " + p.Exe
+	}
+	return out
+}
+
 func findingsWithIOError(path string, err error) []dynscan.Finding {
 	return []dynscan.Finding{{
 		Severity:       dynscan.SeverityHigh,
@@ -0,0 +1,434 @@
+//go:build linux
+
+package dynscan
+
+import (
+	"bufio"
+	"os"
+	"sort"
+	"strconv"
+	"strings"
+	"time"
+)
+
+const (
+	// The poll interval starts (and drops back to) the minimum whenever the
+	// process tree or its sockets change, and backs off while nothing happens.
+	egressMinInterval = 5 * time.Millisecond
+	egressMaxInterval = 200 * time.Millisecond
+
+	// Non-socket fds are trusted between full refreshes; a full refresh
+	// re-resolves every fd to catch numbers closed and reused within a tick.
+	// Socket fds are few and re-resolved on every poll: back-to-back short
+	// connections usually get the same fd number.
+	egressFullRefresh = time.Second
+
+	maxCmdlineLen = 256
+)
+
+var procNetTables = []string{"tcp", "tcp6", "udp", "udp6"}
+
+type trackedProc struct {
+	info  ProcessInfo
+	netns string
+	// fd name -> socket inode ("" for non-socket fds).
+	fds     map[string]string
+	sockets int
+}
+
+// EgressCollector observes remote endpoints of sockets owned by a process and
+// its descendants. Only their /proc/<pid>/fd entries and the network tables of
+// their namespaces are read, so cost scales with the build, not the runner.
+// fd listings are diffed against a per-process cache and only new fds are
+// resolved, keeping an inode -> pid index up to date incrementally.
+type EgressCollector struct {
+	root        int
+	connections map[string]*EgressConnection
+
+	procs    map[int]*trackedProc
+	inodes   map[string]int
+	lastFull time.Time
+	polls    int
+	now      func() time.Time
+}
+
+func NewEgressCollector(rootPID int) *EgressCollector {
+	return &EgressCollector{
+		root:        rootPID,
+		connections: map[string]*EgressConnection{},
+		procs:       map[int]*trackedProc{},
+		inodes:      map[string]int{},
+		now:         time.Now,
+	}
+}
+
+// Run polls until stop is closed, adapting the interval to activity.
+func (c *EgressCollector) Run(stop <-chan struct{}) {
+	interval := egressMinInterval
+	t := time.NewTimer(0)
+	defer t.Stop()
+	for {
+		select {
+		case <-stop:
+			return
+		case <-t.C:
+		}
+		if c.Poll() {
+			interval = egressMinInterval
+		} else if interval *= 2; interval > egressMaxInterval {
+			interval = egressMaxInterval
+		}
+		t.Reset(interval)
+	}
+}
+
+// Poll takes one snapshot and reports whether the process tree or its set of
+// sockets changed since the previous one.
+func (c *EgressCollector) Poll() bool {
+	c.polls++
+	now := c.now()
+	full := now.Sub(c.lastFull) >= egressFullRefresh
+	if full {
+		c.lastFull = now
+	}
+
+	changed := false
+	alive := map[int]struct{}{}
+	for _, pid := range processTree(c.root) {
+		alive[pid] = struct{}{}
+		p, ok := c.procs[pid]
+		if !ok {
+			p = newTrackedProc(pid)
+			c.procs[pid] = p
+			changed = true
+		}
+		if c.refreshFds(p, full) {
+			changed = true
+		}
+	}
+	for pid, p := range c.procs {
+		if _, ok := alive[pid]; ok {
+			continue
+		}
+		c.forgetFds(p, p.fds)
+		delete(c.procs, pid)
+		changed = true
+	}
+
+	if len(c.inodes) == 0 {
+		return changed
+	}
+
+	// One representative pid per network namespace that owns sockets.
+	netns := map[string]int{}
+	for pid, p := range c.procs {
+		if !p.hasSockets() {
+			continue
+		}
+		if cur, ok := netns[p.netns]; !ok || pid < cur {
+			netns[p.netns] = pid
+		}
+	}
+	for _, pid := range netns {
+		for _, table := range procNetTables {
+			c.readTable("/proc/"+strconv.Itoa(pid)+"/net/"+table, now)
+		}
+	}
+	return changed
+}
+
+func newTrackedProc(pid int) *trackedProc {
+	p := &trackedProc{fds: map[string]string{}}
+	p.info = readProcessInfo(pid)
+	if ns, err := os.Readlink("/proc/" + strconv.Itoa(pid) + "/ns/net"); err == nil {
+		p.netns = ns
+	} else {
+		p.netns = "pid:" + strconv.Itoa(pid)
+	}
+	return p
+}
+
+func readProcessInfo(pid int) ProcessInfo {
+	dir := "/proc/" + strconv.Itoa(pid)
+	info := ProcessInfo{PID: pid}
+	if exe, err := os.Readlink(dir + "/exe"); err == nil {
+		info.Exe = exe
+	}
+	if b, err := os.ReadFile(dir + "/cmdline"); err == nil {
+		// Arguments are NUL-separated; control characters would break report lines.
+		cmdline := strings.TrimSpace(strings.Map(func(r rune) rune {
+			if r < 0x20 || r == 0x7f {
+				return ' '
+			}
+			return r
+		}, string(b)))
+		if len(cmdline) > maxCmdlineLen {
+			cmdline = cmdline[:maxCmdlineLen] + "..."
+		}
+		info.Cmdline = cmdline
+	}
+	return info
+}
+
+func (p *trackedProc) hasSockets() bool {
+	return p.sockets > 0
+}
+
+// refreshFds syncs the fd cache of p with /proc/<pid>/fd, resolving fds not
+// seen before and socket fds (all of them when full), and reports socket
+// changes.
+func (c *EgressCollector) refreshFds(p *trackedProc, full bool) bool {
+	dir := "/proc/" + strconv.Itoa(p.info.PID) + "/fd/"
+	names, err := readDirNames(dir)
+	if err != nil {
+		return false
+	}
+
+	changed := false
+	newSocket := false
+	present := make(map[string]struct{}, len(names))
+	for _, fd := range names {
+		present[fd] = struct{}{}
+		old, known := p.fds[fd]
+		if known && !full && old == "" {
+			continue
+		}
+		inode, ok := socketInode(dir + fd)
+		if !ok {
+			// Closed since the listing (e.g. the listing's own directory fd):
+			// handled as gone, so a socket that reuses the number is resolved.
+			delete(present, fd)
+			continue
+		}
+		if known && inode == old {
+			continue
+		}
+		if old != "" {
+			c.forgetInode(old, p.info.PID)
+			p.sockets--
+		}
+		p.fds[fd] = inode
+		if inode != "" {
+			if _, ok := c.inodes[inode]; !ok {
+				c.inodes[inode] = p.info.PID
+			}
+			p.sockets++
+			changed = true
+			newSocket = true
+		}
+	}
+	if newSocket {
+		// The process may have exec'd since it was first seen (fork, then exec of
+		// the program that actually connects).
+		p.info = readProcessInfo(p.info.PID)
+	}
+
+	var closed map[string]string
+	for fd, inode := range p.fds {
+		if _, ok := present[fd]; ok {
+			continue
+		}
+		if closed == nil {
+			closed = map[string]string{}
+		}
+		closed[fd] = inode
+	}
+	if len(closed) > 0 {
+		c.forgetFds(p, closed)
+		for fd, inode := range closed {
+			delete(p.fds, fd)
+			if inode != "" {
+				p.sockets--
+				changed = true
+			}
+		}
+	}
+	return changed
+}
+
+func (c *EgressCollector) forgetFds(p *trackedProc, fds map[string]string) {
+	for _, inode := range fds {
+		if inode != "" {
+			c.forgetInode(inode, p.info.PID)
+		}
+	}
+}
+
+func (c *EgressCollector) forgetInode(inode string, pid int) {
+	// A socket inherited across fork is shared; keep the entry while another
+	// tracked process still holds it.
+	if c.inodes[inode] != pid {
+		return
+	}
+	delete(c.inodes, inode)
+	for other, p := range c.procs {
+		if other == pid {
+			continue
+		}
+		for _, i := range p.fds {
+			if i == inode {
+				c.inodes[inode] = other
+				return
+			}
+		}
+	}
+}
+
+// readTable records remote endpoints of rows whose socket is in the index.
+func (c *EgressCollector) readTable(path string, now time.Time) {
+	f, err := os.Open(path)
+	if err != nil {
+		return
+	}
+	defer f.Close()
+
+	s := bufio.NewScanner(f)
+	first := true
+	for s.Scan() {
+		if first {
+			first = false
+			continue // header
+		}
+		fields := strings.Fields(s.Text())
+		if len(fields) < 10 {
+			continue
+		}
+		pid, ok := c.inodes[fields[9]]
+		if !ok {
+			continue
+		}
+		ep, ok := remoteEndpoint(fields[2])
+		if !ok {
+			continue
+		}
+		if _, seen := c.connections[ep]; seen {
+			continue
+		}
+		conn := &EgressConnection{Endpoint: ep, FirstSeen: now}
+		if p, ok := c.procs[pid]; ok {
+			conn.Process = p.info
+		} else {
+			conn.Process = ProcessInfo{PID: pid}
+		}
+		c.connections[ep] = conn
+	}
+}
+
+// Connections returns every observed endpoint in the order it was first seen.
+func (c *EgressCollector) Connections() []EgressConnection {
+	out := make([]EgressConnection, 0, len(c.connections))
+	for _, conn := range c.connections {
+		out = append(out, *conn)
+	}
+	sort.Slice(out, func(i, j int) bool {
+		if !out[i].FirstSeen.Equal(out[j].FirstSeen) {
+			return out[i].FirstSeen.Before(out[j].FirstSeen)
+		}
+		return out[i].Endpoint < out[j].Endpoint
+	})
+	return out
+}
+
+func (c *EgressCollector) Endpoints() []string {
+	out := make([]string, 0, len(c.connections))
+	for ep := range c.connections {
+		out = append(out, ep)
+	}
+	sort.Strings(out)
+	return out
+}
+
+func (c *EgressCollector) Polls() int {
+	return c.polls
+}
+
+// processTree returns root and all of its live descendants.
+func processTree(root int) []int {
+	if _, err := os.Stat("/proc/" + strconv.Itoa(root) + "/task"); err != nil {
+		return nil
+	}
+	if _, err := os.Stat("/proc/" + strconv.Itoa(root) + "/task/" + strconv.Itoa(root) + "/children"); err != nil {
+		// Kernels without CONFIG_PROC_CHILDREN: derive the tree from ppids.
+		return processTreeByPPID(root)
+	}
+
+	out := []int{root}
+	for i := 0; i < len(out); i++ {
+		pid := strconv.Itoa(out[i])
+		tasks, err := readDirNames("/proc/" + pid + "/task")
+		if err != nil {
+			continue
+		}
+		for _, tid := range tasks {
+			b, err := os.ReadFile("/proc/" + pid + "/task/" + tid + "/children")
+			if err != nil {
+				continue
+			}
+			for _, f := range strings.Fields(string(b)) {
+				if child, err := strconv.Atoi(f); err == nil {
+					out = append(out, child)
+				}
+			}
+		}
+	}
+	return out
+}
+
+func processTreeByPPID(root int) []int {
+	names, err := readDirNames("/proc")
+	if err != nil {
+		return []int{root}
+	}
+	children := map[int][]int{}
+	for _, name := range names {
+		pid, err := strconv.Atoi(name)
+		if err != nil {
+			continue
+		}
+		b, err := os.ReadFile("/proc/" + name + "/stat")
+		if err != nil {
+			continue
+		}
+		// The command name may contain spaces and parentheses; fields resume after
+		// the last ')': state, ppid, ...
+		s := string(b)
+		i := strings.LastIndexByte(s, ')')
+		if i < 0 {
+			continue
+		}
+		fields := strings.Fields(s[i+1:])
+		if len(fields) < 2 {
+			continue
+		}
+		if ppid, err := strconv.Atoi(fields[1]); err == nil {
+			children[ppid] = append(children[ppid], pid)
+		}
+	}
+	out := []int{root}
+	for i := 0; i < len(out); i++ {
+		out = append(out, children[out[i]]...)
+	}
+	return out
+}
+
+func readDirNames(path string) ([]string, error) {
+	d, err := os.Open(path)
+	if err != nil {
+		return nil, err
+	}
+	defer d.Close()
+	return d.Readdirnames(-1)
+}
+
+// socketInode returns the socket inode behind an fd ("" for other files) and
+// false if the fd could not be read.
+func socketInode(fdPath string) (string, bool) {
+	link, err := os.Readlink(fdPath)
+	if err != nil {
+		return "", false
+	}
+	if !strings.HasPrefix(link, "socket:[") || !strings.HasSuffix(link, "]") {
+		return "", true
+	}
+	return link[len("socket:[") : len(link)-1], true
+}
@@ -0,0 +1,30 @@
+//go:build !linux
+
+package dynscan
+
+// EgressCollector is a stub on non-Linux platforms: it observes nothing.
+type EgressCollector struct{}
+
+func NewEgressCollector(rootPID int) *EgressCollector {
+	return &EgressCollector{}
+}
+
+func (c *EgressCollector) Run(stop <-chan struct{}) {
+	<-stop
+}
+
+func (c *EgressCollector) Poll() bool {
+	return false
+}
+
+func (c *EgressCollector) Connections() []EgressConnection {
+	return nil
+}
+
+func (c *EgressCollector) Endpoints() []string {
+	return nil
+}
+
+func (c *EgressCollector) Polls() int {
+	return 0
+}
@@ -0,0 +1,71 @@
+package dynscan
+
+import (
+	"crypto/hmac"
+	"crypto/sha256"
+	"encoding/hex"
+	"os"
+	"regexp"
+	"sync"
+)
+
+// FingerprintKeyEnv matches the static module, so both engines produce the same
+// fingerprint for the same secret.
+const FingerprintKeyEnv = "PIPESEC_FINGERPRINT_KEY"
+
+const defaultFingerprintKey = "pipesec-fingerprint-v1"
+
+var fingerprintKey = sync.OnceValue(func() []byte {
+	if k := os.Getenv(FingerprintKeyEnv); k != "" {
+		return []byte(k)
+	}
+	return []byte(defaultFingerprintKey)
+})
+
+func FingerprintSecret(value []byte) string {
+	m := hmac.New(sha256.New, fingerprintKey())
+	m.Write(value)
+	return hex.EncodeToString(m.Sum(nil))[:32]
+}
+
+var lineSuffixRe = regexp.MustCompile(`:line \d+$`)
+
+// StableLocation drops the line number, which shifts with unrelated edits.
+func StableLocation(location string) string {
+	return lineSuffixRe.ReplaceAllString(location, "")
+}
+
+func FindingFingerprint(f Finding) string {
+	if f.Fingerprint != "" {
+		return f.Fingerprint
+	}
+	rule := f.RuleID
+	if rule == "" {
+		rule = f.Category
+	}
+	h := sha256.New()
+	for _, part := range []string{rule, StableLocation(f.Location), f.Evidence} {
+		h.Write([]byte(part))
+		h.Write([]byte{0})
+	}
+	return hex.EncodeToString(h.Sum(nil))[:32]
+}
+
+// WithFingerprint returns f with its fingerprint filled in.
+func WithFingerprint(f Finding) Finding {
+	f.Fingerprint = FindingFingerprint(f)
+	return f
+}
+
+func CountsBySeverity(findings []Finding) map[Severity]int {
+	out := map[Severity]int{
+		SeverityCritical: 0,
+		SeverityHigh:     0,
+		SeverityMedium:   0,
+		SeverityLow:      0,
+	}
+	for _, f := range findings {
+		out[f.Severity]++
+	}
+	return out
+}
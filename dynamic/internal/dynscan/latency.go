@@ -0,0 +1,100 @@
+package dynscan
+
+import (
+	"fmt"
+	"io"
+	"math/bits"
+	"strings"
+	"time"
+)
+
+// Bucket 0 holds latencies under 1µs, bucket i (i > 0) holds [2^(i-1), 2^i) µs.
+const latencyBuckets = 32
+
+// LatencyHistogram is a fixed-size log2 histogram of per-line processing time.
+// It is not safe for concurrent use; use one per stream and Merge them.
+type LatencyHistogram struct {
+	buckets [latencyBuckets]uint64
+	count   uint64
+	total   time.Duration
+	max     time.Duration
+}
+
+func (h *LatencyHistogram) Observe(d time.Duration) {
+	i := bits.Len64(uint64(d / time.Microsecond))
+	if i >= latencyBuckets {
+		i = latencyBuckets - 1
+	}
+	h.buckets[i]++
+	h.count++
+	h.total += d
+	if d > h.max {
+		h.max = d
+	}
+}
+
+func (h *LatencyHistogram) Merge(o *LatencyHistogram) {
+	for i, n := range o.buckets {
+		h.buckets[i] += n
+	}
+	h.count += o.count
+	h.total += o.total
+	if o.max > h.max {
+		h.max = o.max
+	}
+}
+
+func (h *LatencyHistogram) Count() uint64 {
+	return h.count
+}
+
+func bucketUpper(i int) time.Duration {
+	return time.Duration(uint64(1)<<uint(i)) * time.Microsecond
+}
+
+// Quantile returns the upper bound of the bucket containing the q-th quantile.
+func (h *LatencyHistogram) Quantile(q float64) time.Duration {
+	if h.count == 0 {
+		return 0
+	}
+	rank := uint64(q*float64(h.count) + 0.5)
+	if rank < 1 {
+		rank = 1
+	}
+	var seen uint64
+	for i, n := range h.buckets {
+		seen += n
+		if seen >= rank {
+			return bucketUpper(i)
+		}
+	}
+	return h.max
+}
+
+func (h *LatencyHistogram) WriteTo(w io.Writer) (int64, error) {
+	var b strings.Builder
+	if h.count == 0 {
+		b.WriteString("⏱  Задержка на строку: нет данных\n")
+	} else {
+		fmt.Fprintf(&b, "⏱  Задержка на строку: строк=%d, среднее=%s, p50≤%s, p99≤%s, max=%s\n",
+			h.count, h.total/time.Duration(h.count), h.Quantile(0.5), h.Quantile(0.99), h.max)
+		var peak uint64
+		for _, n := range h.buckets {
+			if n > peak {
+				peak = n
+			}
+		}
+		for i, n := range h.buckets {
+			if n == 0 {
+				continue
+			}
+			bar := int(n * 40 / peak)
+			if bar == 0 {
+				bar = 1
+			}
+			fmt.Fprintf(&b, "   <%-8s %10d %s\n", bucketUpper(i), n, strings.Repeat("#", bar))
+		}
+	}
+	n, err := io.WriteString(w, b.String())
+	return int64(n), err
+}
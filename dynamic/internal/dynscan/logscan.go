@@ -2,33 +2,264 @@ package dynscan
 
 import (
 	"bufio"
+	"bytes"
 	"io"
+	"time"
 )
 
+const (
+	// Lines longer than lineWindow are scanned in windows of this size, each
+	// re-reading the last windowOverlap bytes of the previous one, so memory stays
+	// bounded and secrets straddling a window boundary are still found.
+	lineWindow    = 1 << 20
+	windowOverlap = 4 << 10
+)
+
+// lineSegment is a whole line, or one window of a line longer than lineWindow.
+type lineSegment struct {
+	lineNo int
+	data   []byte
+	// Position of data[0] within the line.
+	offset int
+	// Matches starting at or after this index are left to the next window.
+	owned int
+	// Original line terminator; empty for non-final windows and a last line
+	// without one.
+	eol []byte
+}
+
+func (s lineSegment) partial() bool {
+	return s.offset > 0 || s.owned < len(s.data)
+}
+
+func readSegments(r io.Reader, window, overlap int, fn func(seg lineSegment)) (int, error) {
+	br := bufio.NewReaderSize(r, window)
+	var buf []byte
+	lineNo := 0
+	offset := 0
+	long := false
+	for {
+		chunk, err := br.ReadSlice('\n')
+		if err == bufio.ErrBufferFull {
+			if !long {
+				lineNo++
+				offset = 0
+				long = true
+				buf = buf[:0]
+			}
+			buf = append(buf, chunk...)
+			owned := len(buf) - overlap
+			fn(lineSegment{lineNo: lineNo, data: buf, offset: offset, owned: owned})
+			offset += owned
+			buf = append(buf[:0], buf[owned:]...)
+			continue
+		}
+
+		if len(chunk) > 0 || long || err == nil {
+			data := chunk
+			if long {
+				buf = append(buf, chunk...)
+				data = buf
+			} else {
+				lineNo++
+				offset = 0
+			}
+			trimmed := trimEOL(data)
+			fn(lineSegment{
+				lineNo: lineNo,
+				data:   trimmed,
+				offset: offset,
+				owned:  len(trimmed),
+				eol:    data[len(trimmed):],
+			})
+			long = false
+		}
+
+		if err != nil {
+			if err == io.EOF {
+				return lineNo, nil
+			}
+			return lineNo, err
+		}
+	}
+}
+
+func trimEOL(b []byte) []byte {
+	b = bytes.TrimSuffix(b, []byte("\n"))
+	return bytes.TrimSuffix(b, []byte("\r"))
+}
+
 func ScanLogStream(r io.Reader, source string, patterns []SecretPattern) []Finding {
+	return ScanLogStreamWith(r, source, patterns, StreamOptions{})
+}
+
+func ScanLogStreamWith(r io.Reader, source string, patterns []SecretPattern, opts StreamOptions) []Finding {
 	var findings []Finding
 
-	scanner := bufio.NewScanner(r)
-	lineNo := 0
-	for scanner.Scan() {
-		lineNo++
-		line := scanner.Text()
-		for _, p := range patterns {
-			matches := p.Re.FindAllString(line, -1)
-			for _, m := range matches {
-				evidence := m
-				if len(evidence) > 20 {
-					evidence = evidence[:20] + "..."
+	matcher := NewMatcher(patterns)
+	// End of the last reported match per pattern within the current long line;
+	// drops the tail of a match that was already reported by the previous window.
+	var ends map[*SecretPattern]int
+
+	var spans []redactSpan
+	var rank map[*SecretPattern]int
+	if opts.Redact {
+		rank = make(map[*SecretPattern]int, len(patterns))
+		for i := range patterns {
+			rank[&patterns[i]] = i
+		}
+	}
+	var out []byte
+	skip := 0
+	passthrough := opts.Passthrough
+
+	// process scans one segment on its own and forwards it.
+	process := func(seg lineSegment, started time.Time) {
+		partial := seg.partial()
+		if seg.offset == 0 {
+			skip = 0
+			if len(ends) > 0 {
+				ends = nil
+			}
+		}
+		spans = spans[:0]
+
+		// seg.data aliases the reader buffer; only matched evidence is copied out.
+		line := seg.data
+		matcher.Match(line, func(p *SecretPattern, start, end int) {
+			if start >= seg.owned {
+				return
+			}
+			if partial {
+				if prev, ok := ends[p]; ok && seg.offset+start < prev {
+					return
+				}
+				if ends == nil {
+					ends = map[*SecretPattern]int{}
 				}
-				findings = append(findings, Finding{
-					Severity:       SeverityCritical,
-					Category:       "Secret in Logs",
-					Description:    "Обнаружен секрет типа '" + p.Name + "' в потоке логов.",
-					Location:       source + ":line " + itoa(lineNo),
-					Recommendation: "Секрет попал в лог: срочно ротируйте секрет и уберите его вывод в stdout/stderr.",
-					Evidence:       evidence,
-				})
+				ends[p] = seg.offset + end
 			}
+			if opts.Redact {
+				spans = append(spans, redactSpan{start: start, end: end, rank: rank[p], name: p.Name})
+			}
+
+			var evidence string
+			if end-start > 20 {
+				evidence = string(line[start:start+20]) + "..."
+			} else {
+				evidence = string(line[start:end])
+			}
+			f := Finding{
+				Severity:       SeverityCritical,
+				Category:       "Secret in Logs",
+				Description:    "Обнаружен секрет типа '" + p.Name + "' в потоке логов.",
+				Location:       source + ":line " + itoa(seg.lineNo),
+				Recommendation: "Секрет попал в лог: срочно ротируйте секрет и уберите его вывод в stdout/stderr.",
+				Evidence:       evidence,
+				Fingerprint:    FingerprintSecret(line[start:end]),
+				RuleID:         "logs",
+				Occurrences:    1,
+			}
+			findings = append(findings, f)
+			if opts.OnFinding != nil {
+				opts.OnFinding(f)
+			}
+		})
+
+		if passthrough != nil {
+			out, skip = appendRedacted(out[:0], seg, spans, skip)
+			out = append(out, seg.eol...)
+			if _, werr := passthrough.Write(out); werr != nil {
+				// Keep draining and scanning the stream even if the consumer is gone.
+				passthrough = nil
+			}
+		}
+		if opts.Latency != nil {
+			opts.Latency.Observe(time.Since(started))
+		}
+	}
+
+	// A completed multi-line secret is one finding; its lines are forwarded
+	// redacted as a whole and are not scanned again.
+	processBlock := func(b *secretBlock) {
+		evidence := string(b.value)
+		if len(b.value) > 20 {
+			evidence = string(b.value[:20]) + "..."
+		}
+		f := Finding{
+			Severity: SeverityCritical,
+			Category: "Secret in Logs",
+			Description: "Обнаружен многострочный секрет типа '" + b.name + "' в потоке логов (строки " +
+				itoa(b.firstLine) + "–" + itoa(b.lastLine) + ").",
+			Location:       source + ":line " + itoa(b.firstLine),
+			Recommendation: "Секрет попал в лог: срочно ротируйте секрет и уберите его вывод в stdout/stderr.",
+			Evidence:       evidence,
+			Fingerprint:    FingerprintSecret(b.value),
+			RuleID:         "logs",
+			Occurrences:    1,
+		}
+		findings = append(findings, f)
+		if opts.OnFinding != nil {
+			opts.OnFinding(f)
+		}
+
+		if passthrough != nil {
+			out = b.appendRedacted(out[:0])
+			if _, werr := passthrough.Write(out); werr != nil {
+				passthrough = nil
+			}
+		}
+		if opts.Latency != nil {
+			for _, l := range b.lines {
+				opts.Latency.Observe(time.Since(l.started))
+			}
+		}
+	}
+
+	var blocks blockTracker
+	release := func(lines []heldLine, block *secretBlock) {
+		for _, l := range lines {
+			process(l.seg, l.started)
+		}
+		if block != nil {
+			processBlock(block)
+		}
+	}
+
+	lastLine, err := readSegments(r, lineWindow, windowOverlap, func(seg lineSegment) {
+		var started time.Time
+		if opts.Latency != nil {
+			started = time.Now()
+		}
+		// Windows of a long line never belong to a block; the held lines before
+		// one are released first to keep the output in order.
+		if seg.partial() {
+			if blocks.holding() {
+				release(blocks.flush(), nil)
+			}
+			process(seg, started)
+			return
+		}
+		if blocks.ordinary(seg.lineNo, seg.data) {
+			process(seg, started)
+			return
+		}
+		release(blocks.feed(seg, started))
+	})
+	release(blocks.finish())
+
+	if err != nil {
+		f := Finding{
+			Severity:       SeverityHigh,
+			Category:       "IO Error",
+			Description:    "Чтение потока логов прервано с ошибкой; строки после указанной не проанализированы.",
+			Location:       source + ":line " + itoa(lastLine),
+			Recommendation: "Проверьте источник логов и повторите анализ.",
+			Evidence:       err.Error(),
+		}
+		findings = append(findings, f)
+		if opts.OnFinding != nil {
+			opts.OnFinding(f)
 		}
 	}
 
@@ -0,0 +1,103 @@
+package dynscan
+
+import (
+	"bytes"
+	"io"
+	"runtime"
+	"strings"
+	"testing"
+)
+
+// longLineReader streams one line of size bytes of filler with secrets
+// spliced in at the given offsets, without holding the line in memory.
+type longLineReader struct {
+	size    int
+	pos     int
+	secrets map[int]string
+}
+
+func (r *longLineReader) Read(p []byte) (int, error) {
+	n := 0
+	for ; n < len(p) && r.pos <= r.size; n, r.pos = n+1, r.pos+1 {
+		p[n] = r.byteAt(r.pos)
+	}
+	if n == 0 {
+		return 0, io.EOF
+	}
+	return n, nil
+}
+
+func (r *longLineReader) byteAt(pos int) byte {
+	if pos == r.size {
+		return '\n'
+	}
+	for start, s := range r.secrets {
+		if start <= pos && pos < start+len(s) {
+			return s[pos-start]
+		}
+	}
+	if pos%7 == 0 {
+		return '.'
+	}
+	return ' '
+}
+
+func TestScanLogStreamLongLine(t *testing.T) {
+	secret := "ghp_" + strings.Repeat("Ab1", 12)
+	const size = 8 << 20
+	// Window boundaries: the first window ends at lineWindow, and each window
+	// owns all but the last windowOverlap bytes it holds.
+	secrets := map[int]string{
+		lineWindow - 10:                  secret, // straddles the end of the first window
+		lineWindow - windowOverlap - 10:  secret, // straddles the end of the owned part
+		2*lineWindow - windowOverlap - 5: secret, // straddles the second window
+		size - len(secret):               secret, // end of the line
+	}
+
+	var before, after runtime.MemStats
+	runtime.GC()
+	runtime.ReadMemStats(&before)
+	findings := ScanLogStream(&longLineReader{size: size, secrets: secrets}, "long.log", DefaultSecretPatterns())
+	runtime.ReadMemStats(&after)
+
+	if len(findings) != len(secrets) {
+		t.Fatalf("got %d findings, want %d: %+v", len(findings), len(secrets), findings)
+	}
+	want := FingerprintSecret([]byte(secret))
+	for _, f := range findings {
+		if f.Fingerprint != want || f.Location != "long.log:line 1" {
+			t.Errorf("unexpected finding %+v", f)
+		}
+	}
+	// The reader buffer, one window with its overlap and slack for findings;
+	// the line itself is 8 MiB.
+	if alloc := after.TotalAlloc - before.TotalAlloc; alloc > 4*lineWindow {
+		t.Errorf("allocated %d bytes scanning an %d-byte line, want at most %d", alloc, size, 4*lineWindow)
+	}
+}
+
+func TestScanLogStreamLongLineRedacted(t *testing.T) {
+	secret := "ghp_" + strings.Repeat("Ab1", 12)
+	const size = 3 << 20
+	secrets := map[int]string{
+		lineWindow - 10:                secret,
+		lineWindow - windowOverlap - 3: secret,
+	}
+
+	var out bytes.Buffer
+	ScanLogStreamWith(&longLineReader{size: size, secrets: secrets}, "long.log", DefaultSecretPatterns(), StreamOptions{
+		Passthrough: &out,
+		Redact:      true,
+	})
+
+	var orig bytes.Buffer
+	if _, err := io.Copy(&orig, &longLineReader{size: size, secrets: secrets}); err != nil {
+		t.Fatal(err)
+	}
+	placeholder := RedactionPlaceholder("GitHub Token (classic)")
+	wantOut := strings.ReplaceAll(orig.String(), secret, placeholder)
+	if out.String() != wantOut {
+		t.Fatalf("redacted output differs: got %d bytes, want %d; secret left: %v",
+			out.Len(), len(wantOut), strings.Contains(out.String(), secret))
+	}
+}
@@ -0,0 +1,366 @@
+package dynscan
+
+import (
+	"bytes"
+	"encoding/json"
+	"regexp"
+	"time"
+)
+
+// Multi-line secrets: PEM private keys and pretty-printed GCP service-account
+// JSON. Mirrors static/multiline.py so both engines report the same block with
+// the same fingerprint.
+
+const (
+	pemSecretName            = "Private Key"
+	serviceAccountSecretName = "GCP Service Account Key"
+
+	// Lines held while a block is open; past either limit the block is given up
+	// and its lines are scanned as ordinary lines. A 8192-bit RSA key is ~100
+	// lines.
+	blockMaxLines = 128
+	blockMaxBytes = 64 << 10
+	// Longer lines never belong to a block.
+	blockMaxLineBytes = 4096
+	// Body lines are 64 characters (70 for OpenSSH); only the last one is
+	// shorter.
+	pemMinBodyBytes = 16
+)
+
+var (
+	pemBeginMarker = []byte("-----BEGIN ")
+	saMarker       = []byte("service_account")
+	saKeyField     = []byte(`"private_key"`)
+
+	pemBeginRe = regexp.MustCompile(`-----BEGIN ((?:[A-Z0-9]+ )*PRIVATE KEY)-----`)
+	saTypeRe   = regexp.MustCompile(`"type"\s*:\s*"service_account"`)
+	saKeyRe    = regexp.MustCompile(`"private_key"\s*:\s*"((?:[^"\\]|\\.)*)"`)
+)
+
+type blockStep int
+
+const (
+	blockOpen blockStep = iota
+	blockClosed
+	blockRejected
+)
+
+// heldLine is a line kept back while a block may be open. Its data and eol are
+// copies: segments alias the reader buffer.
+type heldLine struct {
+	seg     lineSegment
+	started time.Time
+	// Part of the line that belongs to the secret, masked on redaction;
+	// maskEnd == 0 means none.
+	maskStart, maskEnd int
+}
+
+type secretBlock struct {
+	name string
+	// Canonical form of the secret: fingerprints do not depend on line
+	// prefixes, wrapping or the surrounding format.
+	value               []byte
+	firstLine, lastLine int
+	lines               []heldLine
+}
+
+// appendRedacted appends every line of the block with the whole secret
+// replaced by one placeholder; line prefixes and the line count are kept.
+func (b *secretBlock) appendRedacted(dst []byte) []byte {
+	first := true
+	for _, l := range b.lines {
+		data := l.seg.data
+		if l.maskEnd == 0 {
+			dst = append(dst, data...)
+		} else {
+			dst = append(dst, data[:l.maskStart]...)
+			if first {
+				dst = append(dst, RedactionPlaceholder(b.name)...)
+				first = false
+			}
+			dst = append(dst, data[l.maskEnd:]...)
+		}
+		dst = append(dst, l.seg.eol...)
+	}
+	return dst
+}
+
+func lastToken(text []byte) (int, []byte) {
+	stripped := bytes.TrimRight(text, " \t")
+	start := bytes.LastIndexAny(stripped, " \t") + 1
+	return start, stripped[start:]
+}
+
+func isPEMBody(token []byte) bool {
+	for _, c := range token {
+		switch {
+		case c >= 'A' && c <= 'Z', c >= 'a' && c <= 'z', c >= '0' && c <= '9':
+		case c == '+', c == '/', c == '=':
+		default:
+			return false
+		}
+	}
+	return len(token) > 0
+}
+
+type pemBlock struct {
+	label     []byte
+	endMarker []byte
+	// Body lines carry the same prefix (timestamp, indentation) as the BEGIN
+	// line, so their payload starts at the same column.
+	column int
+	body   []byte
+	short  bool
+}
+
+func newPEMBlock(label []byte, column int) *pemBlock {
+	return &pemBlock{
+		label:     append([]byte(nil), label...),
+		endMarker: []byte("-----END " + string(label) + "-----"),
+		column:    column,
+	}
+}
+
+// add returns the step and the span of text that belongs to the key.
+func (p *pemBlock) add(text []byte) (blockStep, int, int) {
+	if pos := bytes.Index(text, p.endMarker); pos >= 0 {
+		return blockClosed, pos, pos + len(p.endMarker)
+	}
+	start, token := lastToken(text)
+	if len(token) == 0 {
+		return blockOpen, 0, 0
+	}
+	if p.short {
+		// A short body line must be the last one before END.
+		return blockRejected, 0, 0
+	}
+	if start == p.column && isPEMBody(token) {
+		p.body = append(p.body, token...)
+		p.short = len(token) < pemMinBodyBytes
+		return blockOpen, start, start + len(token)
+	}
+	if len(p.body) == 0 && bytes.IndexByte(text, ':') >= 0 {
+		// RFC 1421 headers of encrypted keys (Proc-Type, DEK-Info).
+		return blockOpen, 0, 0
+	}
+	return blockRejected, 0, 0
+}
+
+func (p *pemBlock) ready() bool { return len(p.body) > 0 }
+
+func (p *pemBlock) value() []byte {
+	v := make([]byte, 0, len(p.body)+2*len(p.endMarker)+4)
+	v = append(v, "-----BEGIN "...)
+	v = append(v, p.label...)
+	v = append(v, "-----\n"...)
+	v = append(v, p.body...)
+	v = append(v, '\n')
+	return append(v, p.endMarker...)
+}
+
+type serviceAccountBlock struct {
+	key []byte
+}
+
+func (s *serviceAccountBlock) add(text []byte) (blockStep, int, int) {
+	var start, end int
+	if m := saKeyRe.FindSubmatchIndex(text); m != nil {
+		s.key = jsonUnescape(text[m[2]:m[3]])
+		start, end = m[2], m[3]
+	}
+	if _, token := lastToken(text); len(token) > 0 && token[0] == '}' {
+		return blockClosed, start, end
+	}
+	return blockOpen, start, end
+}
+
+func (s *serviceAccountBlock) ready() bool { return s.key != nil }
+
+func (s *serviceAccountBlock) value() []byte { return canonicalPrivateKey(s.key) }
+
+func jsonUnescape(raw []byte) []byte {
+	quoted := make([]byte, 0, len(raw)+2)
+	quoted = append(append(append(quoted, '"'), raw...), '"')
+	var s string
+	if err := json.Unmarshal(quoted, &s); err != nil {
+		return append([]byte{}, raw...)
+	}
+	return []byte(s)
+}
+
+// canonicalPrivateKey brings a PEM key embedded in other text (e.g. a JSON
+// string) to the form of a PEM block read from a log, so both get the same
+// fingerprint.
+func canonicalPrivateKey(text []byte) []byte {
+	lines := bytes.Split(text, []byte("\n"))
+	for i, line := range lines {
+		m := pemBeginRe.FindSubmatchIndex(line)
+		if m == nil {
+			continue
+		}
+		pem := newPEMBlock(line[m[2]:m[3]], m[0])
+		for _, rest := range lines[i+1:] {
+			step, _, _ := pem.add(rest)
+			if step == blockClosed {
+				if pem.ready() {
+					return pem.value()
+				}
+				return text
+			}
+			if step == blockRejected {
+				break
+			}
+		}
+		break
+	}
+	return text
+}
+
+// blockTracker is a streaming state machine for secrets spanning several
+// lines. Whole lines are fed in order; while a block may be open they are held
+// back, then either returned as one secretBlock (and must not be scanned
+// again) or released as ordinary lines.
+type blockTracker struct {
+	pem       *pemBlock
+	sa        *serviceAccountBlock
+	name      string
+	firstLine int
+	held      []heldLine
+	size      int
+	// Last line that opened a JSON object (0: none): a service account starts
+	// there.
+	braceLine int
+}
+
+func (t *blockTracker) holding() bool {
+	return t.pem != nil || t.sa != nil
+}
+
+// ordinary is the fast path: true when no block is open and the line cannot
+// open one; it is then scanned as usual without going through feed.
+func (t *blockTracker) ordinary(lineNo int, text []byte) bool {
+	if t.holding() || bytes.Contains(text, pemBeginMarker) || bytes.Contains(text, saMarker) {
+		return false
+	}
+	if opensObject(text) {
+		t.braceLine = lineNo
+	}
+	return true
+}
+
+func opensObject(text []byte) bool {
+	stripped := bytes.TrimRight(text, " \t")
+	return len(stripped) > 0 && stripped[len(stripped)-1] == '{'
+}
+
+// feed returns the lines released for ordinary scanning, which may include
+// seg itself (still aliasing the reader buffer), and the block seg completed.
+func (t *blockTracker) feed(seg lineSegment, started time.Time) ([]heldLine, *secretBlock) {
+	var released []heldLine
+	if t.holding() {
+		step, start, end := blockRejected, 0, 0
+		if len(seg.data) <= blockMaxLineBytes && len(t.held) < blockMaxLines && t.size+len(seg.data) <= blockMaxBytes {
+			if t.pem != nil {
+				step, start, end = t.pem.add(seg.data)
+			} else {
+				step, start, end = t.sa.add(seg.data)
+			}
+		}
+		switch step {
+		case blockOpen:
+			t.hold(seg, started, start, end)
+			return nil, nil
+		case blockClosed:
+			t.hold(seg, started, start, end)
+			if (t.pem != nil && t.pem.ready()) || (t.sa != nil && t.sa.ready()) {
+				return nil, t.complete(seg.lineNo)
+			}
+			return t.flush(), nil
+		}
+		released = t.flush()
+	}
+	if t.start(seg, started) {
+		return released, nil
+	}
+	return append(released, heldLine{seg: seg, started: started}), nil
+}
+
+// finish ends the stream: an unterminated service account still has its key;
+// a PEM block without its END line is not reported as a whole.
+func (t *blockTracker) finish() ([]heldLine, *secretBlock) {
+	if t.sa != nil && t.sa.ready() {
+		return nil, t.complete(t.held[len(t.held)-1].seg.lineNo)
+	}
+	return t.flush(), nil
+}
+
+// flush gives up the open block; its lines are to be scanned as usual.
+func (t *blockTracker) flush() []heldLine {
+	held := t.held
+	t.reset()
+	for i := range held {
+		held[i].maskStart, held[i].maskEnd = 0, 0
+	}
+	return held
+}
+
+func (t *blockTracker) start(seg lineSegment, started time.Time) bool {
+	text := seg.data
+	if len(text) <= blockMaxLineBytes {
+		if bytes.Contains(text, pemBeginMarker) {
+			if m := pemBeginRe.FindSubmatchIndex(text); m != nil {
+				pem := newPEMBlock(text[m[2]:m[3]], m[0])
+				if !bytes.Contains(text, pem.endMarker) {
+					t.pem, t.name, t.firstLine = pem, pemSecretName, seg.lineNo
+					t.hold(seg, started, m[0], len(text))
+					return true
+				}
+			}
+		}
+		if bytes.Contains(text, saMarker) &&
+			saTypeRe.Match(text) &&
+			!bytes.Contains(text, saKeyField) &&
+			bytes.IndexByte(text, '}') < 0 {
+			first := seg.lineNo
+			if t.braceLine > 0 && t.braceLine == seg.lineNo-1 {
+				first = t.braceLine
+			}
+			t.sa, t.name, t.firstLine = &serviceAccountBlock{}, serviceAccountSecretName, first
+			t.hold(seg, started, 0, 0)
+			return true
+		}
+	}
+	if opensObject(text) {
+		t.braceLine = seg.lineNo
+	}
+	return false
+}
+
+func (t *blockTracker) hold(seg lineSegment, started time.Time, maskStart, maskEnd int) {
+	seg.data = append([]byte(nil), seg.data...)
+	seg.eol = append([]byte(nil), seg.eol...)
+	t.held = append(t.held, heldLine{seg: seg, started: started, maskStart: maskStart, maskEnd: maskEnd})
+	t.size += len(seg.data)
+}
+
+func (t *blockTracker) complete(lastLine int) *secretBlock {
+	b := &secretBlock{
+		name:      t.name,
+		firstLine: t.firstLine,
+		lastLine:  lastLine,
+		lines:     t.held,
+	}
+	if t.pem != nil {
+		b.value = t.pem.value()
+	} else {
+		b.value = t.sa.value()
+	}
+	t.reset()
+	return b
+}
+
+func (t *blockTracker) reset() {
+	t.pem, t.sa = nil, nil
+	t.held = nil
+	t.size = 0
+}
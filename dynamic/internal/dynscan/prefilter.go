@@ -0,0 +1,352 @@
+package dynscan
+
+import (
+	"regexp/syntax"
+	"sort"
+	"unicode/utf8"
+)
+
+const (
+	// Small character classes are expanded into literal anchors only while the
+	// anchor set stays this small.
+	maxClassSize = 8
+	maxAnchors   = 64
+)
+
+// asciiLower folds ASCII letters; every other byte maps to itself.
+var asciiLower = func() [256]byte {
+	var t [256]byte
+	for i := range t {
+		b := byte(i)
+		if 'A' <= b && b <= 'Z' {
+			b += 'a' - 'A'
+		}
+		t[i] = b
+	}
+	return t
+}()
+
+// RequiredLiterals returns literals (ASCII-lowercased) such that every match of
+// expr contains at least one of them, and whether expr uses case folding.
+// An empty result means the pattern cannot be prefiltered.
+func RequiredLiterals(expr string) ([]string, bool) {
+	re, err := syntax.Parse(expr, syntax.Perl)
+	if err != nil {
+		return nil, false
+	}
+	set, ok := requiredSet(re)
+	if !ok || len(set) == 0 {
+		return nil, hasFoldCase(re)
+	}
+	out := make([]string, 0, len(set))
+	for s := range set {
+		if s == "" {
+			return nil, hasFoldCase(re)
+		}
+		out = append(out, s)
+	}
+	sort.Strings(out)
+	return out, hasFoldCase(re)
+}
+
+func hasFoldCase(re *syntax.Regexp) bool {
+	if re.Flags&syntax.FoldCase != 0 {
+		return true
+	}
+	for _, sub := range re.Sub {
+		if hasFoldCase(sub) {
+			return true
+		}
+	}
+	return false
+}
+
+type literalSet map[string]struct{}
+
+func lowerString(runes []rune) (string, bool) {
+	buf := make([]byte, 0, len(runes))
+	for _, r := range runes {
+		if r >= utf8.RuneSelf {
+			return "", false
+		}
+		buf = append(buf, asciiLower[byte(r)])
+	}
+	return string(buf), true
+}
+
+func classLiterals(re *syntax.Regexp) (literalSet, bool) {
+	out := literalSet{}
+	for i := 0; i+1 < len(re.Rune); i += 2 {
+		lo, hi := re.Rune[i], re.Rune[i+1]
+		if hi >= utf8.RuneSelf || hi-lo >= maxClassSize {
+			return nil, false
+		}
+		for r := lo; r <= hi; r++ {
+			out[string(asciiLower[byte(r)])] = struct{}{}
+		}
+		if len(out) > maxClassSize {
+			return nil, false
+		}
+	}
+	return out, len(out) > 0
+}
+
+func score(s literalSet) (int, int) {
+	minLen := -1
+	for k := range s {
+		if minLen < 0 || len(k) < minLen {
+			minLen = len(k)
+		}
+	}
+	return minLen, -len(s)
+}
+
+func better(a, b literalSet) bool {
+	al, ac := score(a)
+	bl, bc := score(b)
+	if al != bl {
+		return al > bl
+	}
+	return ac > bc
+}
+
+func requiredSet(re *syntax.Regexp) (literalSet, bool) {
+	switch re.Op {
+	case syntax.OpLiteral:
+		s, ok := lowerString(re.Rune)
+		if !ok {
+			return nil, false
+		}
+		return literalSet{s: {}}, true
+	case syntax.OpCharClass:
+		return classLiterals(re)
+	case syntax.OpCapture, syntax.OpPlus:
+		return requiredSet(re.Sub[0])
+	case syntax.OpRepeat:
+		if re.Min >= 1 {
+			return requiredSet(re.Sub[0])
+		}
+		return nil, false
+	case syntax.OpAlternate:
+		union := literalSet{}
+		for _, sub := range re.Sub {
+			s, ok := requiredSet(sub)
+			if !ok {
+				return nil, false
+			}
+			for k := range s {
+				union[k] = struct{}{}
+			}
+		}
+		if len(union) > maxAnchors {
+			return nil, false
+		}
+		return union, true
+	case syntax.OpConcat:
+		return concatRequired(re.Sub)
+	default:
+		return nil, false
+	}
+}
+
+func concatRequired(subs []*syntax.Regexp) (literalSet, bool) {
+	var best literalSet
+	var run literalSet
+
+	consider := func(s literalSet) {
+		if len(s) > 0 && (best == nil || better(s, best)) {
+			best = s
+		}
+	}
+
+	for _, sub := range subs {
+		var chars literalSet
+		switch sub.Op {
+		case syntax.OpLiteral:
+			if s, ok := lowerString(sub.Rune); ok {
+				chars = literalSet{s: {}}
+			}
+		case syntax.OpCharClass:
+			chars, _ = classLiterals(sub)
+		}
+
+		if chars != nil {
+			switch {
+			case run == nil:
+				run = chars
+			case len(run)*len(chars) <= maxAnchors:
+				next := literalSet{}
+				for r := range run {
+					for c := range chars {
+						next[r+c] = struct{}{}
+					}
+				}
+				run = next
+			default:
+				consider(run)
+				run = chars
+			}
+			continue
+		}
+
+		consider(run)
+		run = nil
+		if s, ok := requiredSet(sub); ok {
+			consider(s)
+		}
+	}
+	consider(run)
+	return best, best != nil
+}
+
+// anchorMatcher is an Aho-Corasick automaton over ASCII-folded anchors, compiled
+// into a dense DFA so that scanning costs one table lookup per input byte.
+type anchorMatcher struct {
+	delta []int32
+	out   [][]int
+}
+
+func newAnchorMatcher(anchors map[string][]int) *anchorMatcher {
+	type node struct {
+		next map[byte]int32
+		fail int32
+		out  []int
+	}
+	nodes := []node{{next: map[byte]int32{}}}
+
+	keys := make([]string, 0, len(anchors))
+	for k := range anchors {
+		keys = append(keys, k)
+	}
+	sort.Strings(keys)
+
+	for _, k := range keys {
+		cur := int32(0)
+		for i := 0; i < len(k); i++ {
+			b := k[i]
+			nxt, ok := nodes[cur].next[b]
+			if !ok {
+				nodes = append(nodes, node{next: map[byte]int32{}})
+				nxt = int32(len(nodes) - 1)
+				nodes[cur].next[b] = nxt
+			}
+			cur = nxt
+		}
+		nodes[cur].out = append(nodes[cur].out, anchors[k]...)
+	}
+
+	m := &anchorMatcher{
+		delta: make([]int32, len(nodes)*256),
+		out:   make([][]int, len(nodes)),
+	}
+
+	// BFS: fill failure links and the full transition table.
+	queue := make([]int32, 0, len(nodes))
+	for c := 0; c < 256; c++ {
+		if nxt, ok := nodes[0].next[byte(c)]; ok {
+			nodes[nxt].fail = 0
+			m.delta[c] = nxt
+			queue = append(queue, nxt)
+		}
+	}
+	for len(queue) > 0 {
+		s := queue[0]
+		queue = queue[1:]
+		f := nodes[s].fail
+		nodes[s].out = append(nodes[s].out, nodes[f].out...)
+		for c := 0; c < 256; c++ {
+			if nxt, ok := nodes[s].next[byte(c)]; ok {
+				nodes[nxt].fail = m.delta[int(f)*256+c]
+				m.delta[int(s)*256+c] = nxt
+				queue = append(queue, nxt)
+			} else {
+				m.delta[int(s)*256+c] = m.delta[int(f)*256+c]
+			}
+		}
+	}
+	for i := range nodes {
+		m.out[i] = dedupInts(nodes[i].out)
+	}
+	return m
+}
+
+func dedupInts(in []int) []int {
+	if len(in) < 2 {
+		return in
+	}
+	sort.Ints(in)
+	out := in[:1]
+	for _, v := range in[1:] {
+		if v != out[len(out)-1] {
+			out = append(out, v)
+		}
+	}
+	return out
+}
+
+// Matcher runs a pattern set over a line in a single pass: an anchor automaton
+// selects candidate patterns and only those regexes are executed.
+// A Matcher keeps scratch state and must not be shared between goroutines.
+type Matcher struct {
+	patterns   []SecretPattern
+	anchors    *anchorMatcher
+	unanchored []bool
+	foldCase   []bool
+	hit        []bool
+}
+
+func NewMatcher(patterns []SecretPattern) *Matcher {
+	m := &Matcher{
+		patterns:   patterns,
+		unanchored: make([]bool, len(patterns)),
+		foldCase:   make([]bool, len(patterns)),
+		hit:        make([]bool, len(patterns)),
+	}
+	anchors := map[string][]int{}
+	for i, p := range patterns {
+		lits, fold := RequiredLiterals(p.Re.String())
+		m.foldCase[i] = fold
+		if len(lits) == 0 {
+			m.unanchored[i] = true
+			continue
+		}
+		for _, l := range lits {
+			anchors[l] = append(anchors[l], i)
+		}
+	}
+	m.anchors = newAnchorMatcher(anchors)
+	return m
+}
+
+// Match calls fn for every match in line, pattern by pattern in pattern order.
+// line is not retained.
+func (m *Matcher) Match(line []byte, fn func(p *SecretPattern, start, end int)) {
+	for i := range m.hit {
+		m.hit[i] = false
+	}
+
+	nonASCII := false
+	delta, out := m.anchors.delta, m.anchors.out
+	state := int32(0)
+	for _, b := range line {
+		if b >= utf8.RuneSelf {
+			nonASCII = true
+		}
+		state = delta[int(state)*256+int(asciiLower[b])]
+		for _, pi := range out[state] {
+			m.hit[pi] = true
+		}
+	}
+
+	for i := range m.patterns {
+		// Unicode case folding (e.g. U+212A KELVIN SIGN ~ 'k') is invisible to the
+		// ASCII-folded automaton, so case-insensitive patterns run on such lines.
+		if !m.hit[i] && !m.unanchored[i] && !(nonASCII && m.foldCase[i]) {
+			continue
+		}
+		p := &m.patterns[i]
+		for _, loc := range p.Re.FindAllIndex(line, -1) {
+			fn(p, loc[0], loc[1])
+		}
+	}
+}
@@ -3,10 +3,8 @@
 package dynscan
 
 import (
-	"bufio"
 	"encoding/hex"
 	"net"
-	"os"
 	"strconv"
 	"strings"
 	"unsafe"
@@ -18,52 +16,20 @@ var nativeLittleEndian = func() bool {
 	return b[0] == 0x1
 }()
 
-func LinuxRemoteEndpoints() map[string]struct{} {
-	out := map[string]struct{}{}
-	readProcNet("/proc/net/tcp", out)
-	readProcNet("/proc/net/tcp6", out)
-	readProcNet("/proc/net/udp", out)
-	readProcNet("/proc/net/udp6", out)
-	return out
-}
-
-func readProcNet(path string, out map[string]struct{}) {
-	f, err := os.Open(path)
-	if err != nil {
-		return
+func remoteEndpoint(remote string) (string, bool) {
+	ipPort, ok := parseProcNetAddr(remote)
+	if !ok {
+		return "", false
 	}
-	defer f.Close()
-
-	s := bufio.NewScanner(f)
-	first := true
-	for s.Scan() {
-		line := strings.TrimSpace(s.Text())
-		if line == "" {
-			continue
-		}
-		if first {
-			first = false
-			continue // header
-		}
-		fields := strings.Fields(line)
-		if len(fields) < 3 {
-			continue
-		}
-		remote := fields[2] // rem_address
-		ipPort, ok := parseProcNetAddr(remote)
-		if !ok {
-			continue
-		}
-		// ignore unspecified/loopback/empty remote
-		if strings.HasSuffix(ipPort, ":0") ||
-			strings.HasPrefix(ipPort, "0.0.0.0:") ||
-			strings.HasPrefix(ipPort, "127.0.0.1:") ||
-			strings.HasPrefix(ipPort, "[::]:") ||
-			strings.HasPrefix(ipPort, "[::1]:") {
-			continue
-		}
-		out[ipPort] = struct{}{}
+	// ignore unspecified/loopback/empty remote
+	if strings.HasSuffix(ipPort, ":0") ||
+		strings.HasPrefix(ipPort, "0.0.0.0:") ||
+		strings.HasPrefix(ipPort, "127.0.0.1:") ||
+		strings.HasPrefix(ipPort, "[::]:") ||
+		strings.HasPrefix(ipPort, "[::1]:") {
+		return "", false
 	}
+	return ipPort, true
 }
 
 func parseProcNetAddr(v string) (string, bool) {
@@ -0,0 +1,123 @@
+package dynscan
+
+import (
+	"encoding/json"
+	"io"
+	"sort"
+	"sync"
+	"sync/atomic"
+)
+
+type StreamOptions struct {
+	// Passthrough receives every scanned line (with its original line ending)
+	// right after it is scanned; nil disables forwarding.
+	Passthrough io.Writer
+	// Redact replaces detected secrets in the forwarded output.
+	Redact bool
+	// OnFinding is called synchronously from the scanning goroutine as soon as a
+	// finding is detected; it must not block.
+	OnFinding func(Finding)
+	// Latency, if set, records the time spent on each line from the moment it
+	// is read until it has been scanned and forwarded.
+	Latency *LatencyHistogram
+}
+
+func RedactionPlaceholder(name string) string {
+	return "***" + name + "***"
+}
+
+type redactSpan struct {
+	start, end int
+	// Pattern index; lower is more specific.
+	rank int
+	name string
+}
+
+// appendRedacted appends the owned part of seg to dst with spans replaced by
+// placeholders. Overlapping spans are masked as one, named after the most
+// specific pattern. skip is the number of leading bytes still covered by a
+// placeholder written for the previous window; the returned value is the same
+// for the next window.
+func appendRedacted(dst []byte, seg lineSegment, spans []redactSpan, skip int) ([]byte, int) {
+	sort.Slice(spans, func(i, j int) bool { return spans[i].start < spans[j].start })
+	pos := skip
+	if pos < 0 {
+		pos = 0
+	}
+	for i := 0; i < len(spans); {
+		start, end, best := spans[i].start, spans[i].end, spans[i]
+		for i++; i < len(spans) && spans[i].start < end; i++ {
+			if spans[i].end > end {
+				end = spans[i].end
+			}
+			if spans[i].rank < best.rank {
+				best = spans[i]
+			}
+		}
+		if end <= pos {
+			continue
+		}
+		if start >= pos {
+			dst = append(dst, seg.data[pos:start]...)
+			dst = append(dst, RedactionPlaceholder(best.name)...)
+		}
+		pos = end
+	}
+	if pos < seg.owned {
+		dst = append(dst, seg.data[pos:seg.owned]...)
+	}
+	return dst, pos - seg.owned
+}
+
+// NDJSONSink writes findings as newline-delimited JSON from a dedicated
+// goroutine. TrySend never blocks: when the buffer is full the finding is
+// counted as dropped, so a slow consumer cannot stall the scanned process.
+type NDJSONSink struct {
+	ch      chan Finding
+	enc     *json.Encoder
+	dropped atomic.Int64
+	done    chan struct{}
+	once    sync.Once
+}
+
+func NewNDJSONSink(w io.Writer, capacity int) *NDJSONSink {
+	s := &NDJSONSink{
+		ch:   make(chan Finding, capacity),
+		enc:  json.NewEncoder(w),
+		done: make(chan struct{}),
+	}
+	s.enc.SetEscapeHTML(false)
+	go func() {
+		defer close(s.done)
+		for f := range s.ch {
+			// A broken consumer must not stop the drain loop.
+			_ = s.enc.Encode(WithFingerprint(f))
+		}
+	}()
+	return s
+}
+
+func (s *NDJSONSink) TrySend(f Finding) bool {
+	select {
+	case s.ch <- f:
+		return true
+	default:
+		s.dropped.Add(1)
+		return false
+	}
+}
+
+// Send blocks until the finding is queued; for the final findings of a run.
+func (s *NDJSONSink) Send(f Finding) {
+	s.ch <- f
+}
+
+func (s *NDJSONSink) Dropped() int64 {
+	return s.dropped.Load()
+}
+
+// Close flushes queued findings and waits for the writer goroutine.
+func (s *NDJSONSink) Close() {
+	s.once.Do(func() { close(s.ch) })
+	<-s.done
+}
@@ -1,5 +1,10 @@
 package dynscan
 
+import "time"
+
+// SchemaVersion of the JSON/NDJSON report format shared with the static module.
+const SchemaVersion = 1
+
 type Severity string
 
 const (
@@ -16,4 +21,30 @@ type Finding struct {
 	Location       string   `json:"location"`
 	Recommendation string   `json:"recommendation"`
 	Evidence       string   `json:"evidence,omitempty"`
+	// Process that caused the finding and when it was first observed, when
+	// known (egress).
+	Process   *ProcessInfo `json:"process,omitempty"`
+	FirstSeen *time.Time   `json:"firstSeen,omitempty"`
+	// Same identity as in the static module: HMAC of the secret value for
+	// secrets, otherwise a hash of rule, location (without line) and evidence.
+	Fingerprint string `json:"fingerprint,omitempty"`
+	RuleID      string `json:"rule_id,omitempty"`
+	// Occurrences the finding stands for; omitted means 1. Every secret seen in
+	// a log is reported as its own finding, so the count is always 1 here,
+	// while the static module folds repeats into one finding with their count.
+	Occurrences int `json:"occurrences,omitempty"`
+}
+
+type ProcessInfo struct {
+	PID     int    `json:"pid"`
+	Exe     string `json:"exe,omitempty"`
+	Cmdline string `json:"cmdline,omitempty"`
+}
+
+// EgressConnection is a remote endpoint first observed on a socket owned by a
+// process of the monitored tree.
+type EgressConnection struct {
+	Endpoint  string
+	Process   ProcessInfo
+	FirstSeen time.Time
 }
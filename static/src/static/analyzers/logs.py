@@ -1,7 +1,57 @@
 from __future__ import annotations
 
-from static.models import Finding, Severity
-from static.secrets import SecretDetectionEngine
+import time
+from collections.abc import Iterable, Iterator
+
+from static.fingerprint import SecretDeduplicator, SecretOccurrences, collapse_overlapping
+from static.latency import LatencyHistogram
+from static.models import Finding, FindingKind, Severity
+from static.multiline import BlockLine, BlockTracker, SecretBlock
+from static.secrets import SecretDetectionEngine, SecretMatch
+
+
+_LOG_SECRET_RECOMMENDATION = "Секрет попал в лог: срочно ротируйте секрет и исправьте шаг, который его печатает."
+
+SECRET_IN_LOGS = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Logs",
+    description="Обнаружен секрет типа '{secret_type}' в логах выполнения.",
+    recommendation=_LOG_SECRET_RECOMMENDATION,
+)
+
+REPEATED_SECRET_IN_LOGS = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Logs",
+    description=(
+        "Обнаружен секрет типа '{secret_type}' в логах выполнения. "
+        "Встречается {count} раз (строки {first_line}–{last_line})."
+    ),
+    recommendation=_LOG_SECRET_RECOMMENDATION,
+)
+
+SECRET_BLOCK_IN_LOGS = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Logs",
+    description=(
+        "Обнаружен многострочный секрет типа '{secret_type}' в логах выполнения "
+        "(строки {first_line}–{end_line})."
+    ),
+    recommendation=_LOG_SECRET_RECOMMENDATION,
+)
+
+REPEATED_SECRET_BLOCK_IN_LOGS = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Logs",
+    description=(
+        "Обнаружен многострочный секрет типа '{secret_type}' в логах выполнения. "
+        "Встречается {count} раз (строки {first_line}–{last_line})."
+    ),
+    recommendation=_LOG_SECRET_RECOMMENDATION,
+)
+
+
+def redaction_placeholder(secret_type: str) -> str:
+    return f"***{secret_type}***"
 
 
 class LogAnalyzer:
@@ -10,34 +60,129 @@ class LogAnalyzer:
 
     def analyze_text(
         self, log_content: str, log_source: str = "workflow.log"
+    ) -> list[Finding]:
+        return self.analyze_lines(log_content.splitlines(), log_source)
+
+    def analyze_lines(
+        self, lines: Iterable[str], log_source: str = "workflow.log"
     ) -> list[Finding]:
         findings: list[Finding] = []
+        rank = self.secret_engine.pattern_rank
+        dedup = SecretDeduplicator(rank)
+        blocks: BlockTracker[None] = BlockTracker()
+
+        def scan_events(events: Iterable[BlockLine[None] | SecretBlock[None]]) -> None:
+            for event in events:
+                if isinstance(event, SecretBlock):
+                    dedup.add(event.match(), event.first_line, event.last_line)
+                    continue
+                matches = self.secret_engine.detect_in_text(event.text)
+                for secret in collapse_overlapping(matches, rank):
+                    dedup.add(secret, event.line_num)
+
+        for line_num, line in enumerate(lines, 1):
+            if blocks.ordinary(line_num, line):
+                matches = self.secret_engine.detect_in_text(line)
+                if not matches:
+                    continue
+                for secret in collapse_overlapping(matches, rank):
+                    dedup.add(secret, line_num)
+            else:
+                scan_events(blocks.feed(line_num, line, None))
+            for occ in dedup.drain_flushed():
+                findings.append(self._finding(occ, log_source))
+        scan_events(blocks.finish())
 
-        matches = self.secret_engine.detect_in_text(log_content)
-        if not matches:
-            return findings
-
-        lines = log_content.splitlines()
-        for secret in matches:
-            line_num = 0
-            for i, line in enumerate(lines, 1):
-                if secret.value in line:
-                    line_num = i
-                    break
-
-            findings.append(
-                Finding(
-                    severity=Severity.CRITICAL,
-                    category="Secret in Logs",
-                    description=f"Обнаружен секрет типа '{secret.secret_type}' в логах выполнения.",
-                    location=f"{log_source}:line {line_num}"
-                    if line_num
-                    else log_source,
-                    recommendation="Секрет попал в лог: срочно ротируйте секрет и исправьте шаг, который его печатает.",
-                    evidence=(secret.value[:20] + "...")
-                    if len(secret.value) > 20
-                    else secret.value,
-                )
-            )
+        for occ in dedup.finish():
+            findings.append(self._finding(occ, log_source))
 
         return findings
+
+    def redact_stream(
+        self,
+        lines: Iterable[str],
+        *,
+        histogram: LatencyHistogram | None = None,
+    ) -> Iterator[str]:
+        # Lines are yielded one by one as they are scanned, keeping their line
+        # endings, so memory stays constant. Only a possible multi-line secret
+        # holds lines back, up to the tracker's bound, until it is resolved.
+        blocks: BlockTracker[tuple[str, float]] = BlockTracker()
+
+        def redact(line: str, body: str, started: float) -> str:
+            matches = self.secret_engine.detect_in_text(body)
+            if matches:
+                line = self.redact_text(body, matches) + line[len(body) :]
+            if histogram is not None:
+                histogram.observe(time.perf_counter() - started)
+            return line
+
+        def emit(
+            events: Iterable[BlockLine[tuple[str, float]] | SecretBlock[tuple[str, float]]],
+        ) -> Iterator[str]:
+            for event in events:
+                if not isinstance(event, SecretBlock):
+                    line, started = event.item
+                    yield redact(line, event.text, started)
+                    continue
+                placeholder = redaction_placeholder(event.secret_type)
+                for held, text in event.redacted(placeholder):
+                    line, started = held.item
+                    if histogram is not None:
+                        histogram.observe(time.perf_counter() - started)
+                    yield text + line[len(held.text) :]
+
+        for line_num, line in enumerate(lines, 1):
+            started = time.perf_counter() if histogram is not None else 0.0
+            body = line.rstrip("\r\n")
+            if blocks.ordinary(line_num, body):
+                yield redact(line, body, started)
+            else:
+                yield from emit(blocks.feed(line_num, body, (line, started)))
+        yield from emit(blocks.finish())
+
+    def redact_text(self, text: str, matches: list[SecretMatch]) -> str:
+        # Overlapping matches are masked as one span named after the most specific
+        # pattern, so no fragment of either secret leaks.
+        rank = self.secret_engine.pattern_rank
+        spans = sorted((m for m in matches if m.start >= 0), key=lambda m: m.start)
+        parts: list[str] = []
+        pos = 0
+        i = 0
+        while i < len(spans):
+            start, end = spans[i].start, spans[i].end
+            best = spans[i]
+            i += 1
+            while i < len(spans) and spans[i].start < end:
+                end = max(end, spans[i].end)
+                if rank(spans[i].secret_type) < rank(best.secret_type):
+                    best = spans[i]
+                i += 1
+            parts.append(text[pos:start])
+            parts.append(redaction_placeholder(best.secret_type))
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+    @staticmethod
+    def _finding(occ: SecretOccurrences, log_source: str) -> Finding:
+        if occ.end_line > occ.first_line and occ.count > 1:
+            kind = REPEATED_SECRET_BLOCK_IN_LOGS
+        elif occ.end_line > occ.first_line:
+            kind = SECRET_BLOCK_IN_LOGS
+        elif occ.count > 1:
+            kind = REPEATED_SECRET_IN_LOGS
+        else:
+            kind = SECRET_IN_LOGS
+        return kind.at(
+            f"{log_source}:line {occ.first_line}" if occ.first_line else log_source,
+            evidence=occ.evidence,
+            fingerprint=occ.fingerprint,
+            occurrences=occ.count,
+            rule_id="logs",
+            secret_type=occ.label,
+            count=occ.count,
+            first_line=occ.first_line,
+            last_line=occ.last_line,
+            end_line=occ.end_line,
+        )
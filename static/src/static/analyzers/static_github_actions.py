@@ -1,14 +1,53 @@
 from __future__ import annotations
 
+import copy
+from collections import deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import replace
 from pathlib import Path
+from typing import Any
 
 import yaml  # type: ignore[import-untyped]
 
-from static.models import Finding, Severity
+from static.custom_rules import CustomRule, CustomRuleSet
+from static.executor import map_documents, run_rules
+from static.models import Finding, FindingKind, Severity
 from static.rules import default_workflow_rules
+from static.rules.base import Feature, WorkflowRule, workflow_features
 from static.secrets import SecretDetectionEngine
 
 
+READ_ERROR = FindingKind(
+    severity=Severity.HIGH,
+    category="IO Error",
+    description="Не удалось прочитать файл: {error}",
+    recommendation="Проверьте путь и права доступа к файлу.",
+)
+
+YAML_ERROR = FindingKind(
+    severity=Severity.HIGH,
+    category="Parse Error",
+    description="Не удалось разобрать YAML файл: {error}",
+    recommendation="Проверьте синтаксис YAML файла.",
+)
+
+NOT_A_MAPPING = FindingKind(
+    severity=Severity.HIGH,
+    category="Parse Error",
+    description="YAML разобран, но корневой объект не является словарём.",
+    recommendation="Проверьте формат workflow (ожидается mapping).",
+)
+
+
+def _plain(value: Any) -> Any:
+    # Rules expect what yaml.safe_load produces: dicts and lists.
+    if isinstance(value, Mapping):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
 class StaticGithubActionsAnalyzer:
     def __init__(
         self,
@@ -16,33 +55,29 @@ class StaticGithubActionsAnalyzer:
         *,
         enabled_rules: set[str] | None = None,
         disabled_rules: set[str] | None = None,
+        jobs: int = 1,
+        backend: str = "auto",
+        custom_rules: Sequence[CustomRule] = (),
     ):
         self.secret_engine = secret_engine
         self.enabled_rules = enabled_rules
         self.disabled_rules = disabled_rules
-
-    @staticmethod
-    def _rule_id(rule: object) -> str:
-        module = getattr(rule.__class__, "__module__", "")
-        return module.split(".")[-1] if isinstance(module, str) and module else ""
-
-    @staticmethod
-    def _rule_fqn(rule: object) -> str:
-        module = getattr(rule.__class__, "__module__", "")
-        name = getattr(rule.__class__, "__name__", "")
-        if (
-            not isinstance(module, str)
-            or not isinstance(name, str)
-            or not module
-            or not name
-        ):
-            return ""
-        return f"{module}.{name}"
-
-    def _is_rule_enabled(self, rule: object) -> bool:
-        rule_id = self._rule_id(rule)
-        rule_fqn = self._rule_fqn(rule)
-
+        self.jobs = jobs
+        self.backend = backend
+        # Rule selection is fixed for the analyzer's lifetime; per workflow only
+        # the feature check remains, memoized by feature set.
+        self.rules = [
+            r
+            for r in default_workflow_rules()
+            if self._is_rule_enabled(r.rule_id, r.fqn())
+        ]
+        # Custom rules share one traversal, so they run as a single rule.
+        custom = [r for r in custom_rules if self._is_rule_enabled(r.rule_id, r.fqn())]
+        if custom:
+            self.rules.append(CustomRuleSet(custom))
+        self._by_features: dict[Feature, list[WorkflowRule]] = {}
+
+    def _is_rule_enabled(self, rule_id: str, rule_fqn: str) -> bool:
         if self.enabled_rules is not None and len(self.enabled_rules) > 0:
             if rule_id not in self.enabled_rules and rule_fqn not in self.enabled_rules:
                 return False
@@ -53,50 +88,105 @@ class StaticGithubActionsAnalyzer:
 
         return True
 
-    def analyze_workflow_file(self, workflow_path: Path) -> list[Finding]:
-        findings: list[Finding] = []
+    def rules_for(self, features: Feature) -> list[WorkflowRule]:
+        rules = self._by_features.get(features)
+        if rules is None:
+            rules = [r for r in self.rules if r.requires & features == r.requires]
+            self._by_features[features] = rules
+        return rules
 
+    def analyze_workflow_file(self, workflow_path: Path) -> list[Finding]:
         try:
             workflow_text = workflow_path.read_text(encoding="utf-8")
         except Exception as exc:
-            return [
-                Finding(
-                    severity=Severity.HIGH,
-                    category="IO Error",
-                    description=f"Не удалось прочитать файл: {exc}",
-                    location=str(workflow_path),
-                    recommendation="Проверьте путь и права доступа к файлу.",
-                )
-            ]
+            return [READ_ERROR.at(str(workflow_path), error=str(exc))]
+        return self.analyze_workflow_text(workflow_text, workflow_path)
 
+    def analyze_workflow_bytes(
+        self, data: bytes, source_name: str | Path
+    ) -> list[Finding]:
+        try:
+            workflow_text = data.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            return [READ_ERROR.at(str(source_name), error=str(exc))]
+        return self.analyze_workflow_text(workflow_text, source_name)
+
+    def analyze_workflow_text(
+        self, workflow_text: str, source_name: str | Path
+    ) -> list[Finding]:
+        # source_name only labels locations (a path, "git:<sha>:<path>", ...);
+        # nothing is read from disk.
         try:
             workflow = yaml.safe_load(workflow_text)
         except Exception as exc:
-            return [
-                Finding(
-                    severity=Severity.HIGH,
-                    category="Parse Error",
-                    description=f"Не удалось разобрать YAML файл: {exc}",
-                    location=str(workflow_path),
-                    recommendation="Проверьте синтаксис YAML файла.",
-                )
-            ]
+            return [YAML_ERROR.at(str(Path(source_name)), error=str(exc))]
+        return self.analyze_workflow_obj(workflow, source_name)
+
+    def analyze_workflow_obj(
+        self, workflow: object, source_name: str | Path
+    ) -> list[Finding]:
+        # An already parsed workflow, e.g. from yaml.safe_load or a JSON API.
+        workflow_path = Path(source_name)
+        findings: list[Finding] = []
 
         if not isinstance(workflow, dict):
-            return [
-                Finding(
-                    severity=Severity.HIGH,
-                    category="Parse Error",
-                    description="YAML разобран, но корневой объект не является словарём.",
-                    location=str(workflow_path),
-                    recommendation="Проверьте формат workflow (ожидается mapping).",
-                )
-            ]
-
-        for rule in default_workflow_rules():
-            if self._is_rule_enabled(rule):
-                findings.extend(
-                    rule.evaluate(workflow, workflow_path, self.secret_engine)
-                )
+            if not isinstance(workflow, Mapping):
+                return [NOT_A_MAPPING.at(str(workflow_path))]
+            # Read-only or custom mappings, e.g. from an API client.
+            workflow = _plain(workflow)
+
+        rules = self.rules_for(workflow_features(workflow))
+        results = run_rules(
+            rules,
+            workflow,
+            workflow_path,
+            self.secret_engine,
+            jobs=self.jobs,
+            backend=self.backend,
+        )
+        for rule, rule_findings in zip(rules, results):
+            rule_id = rule.rule_id
+            for f in rule_findings:
+                findings.append(f if f.rule_id else replace(f, rule_id=rule_id))
 
         return findings
+
+    def analyze_source(
+        self, content: str | bytes | Mapping[str, Any], source_name: str | Path
+    ) -> list[Finding]:
+        if isinstance(content, bytes):
+            return self.analyze_workflow_bytes(content, source_name)
+        if isinstance(content, str):
+            return self.analyze_workflow_text(content, source_name)
+        return self.analyze_workflow_obj(content, source_name)
+
+    def analyze_many(
+        self, items: Iterable[tuple[str | Path, str | bytes | Mapping[str, Any]]]
+    ) -> Iterator[tuple[str | Path, list[Finding]]]:
+        # Lazily yields (source_name, findings) per (source_name, content) in
+        # input order. Patterns are compiled once and, with jobs > 1, documents
+        # rather than rules are spread over a single pool for the whole stream.
+        self.secret_engine.warm()
+        serial = copy.copy(self)
+        serial.jobs = 1
+
+        names: deque[str | Path] = deque()
+
+        def feed() -> Iterator[tuple[str | Path, str | bytes | Mapping[str, Any]]]:
+            for item in items:
+                names.append(item[0])
+                yield item
+
+        results = map_documents(
+            lambda item: serial.analyze_source(item[1], item[0]),
+            feed(),
+            self.secret_engine,
+            jobs=self.jobs,
+            backend=self.backend,
+        )
+        try:
+            for findings in results:
+                yield names.popleft(), findings
+        finally:
+            # Shut the pool down before the caller's input is finalized.
+            results.close()
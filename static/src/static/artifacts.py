@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+import zlib
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+from static.fingerprint import SecretDeduplicator, SecretOccurrences, collapse_overlapping
+from static.models import Finding, FindingKind, Severity
+from static.multiline import BlockLine, BlockTracker, SecretBlock
+from static.secrets import SecretDetectionEngine
+
+
+_ARTIFACT_RECOMMENDATION = (
+    "Секрет попал в артефакт сборки: ротируйте секрет и исключите файл из "
+    "upload-artifact (сузьте path или добавьте исключение)."
+)
+
+SECRET_IN_ARTIFACT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Artifact",
+    description="Обнаружен секрет типа '{secret_type}' в файле артефакта.",
+    recommendation=_ARTIFACT_RECOMMENDATION,
+)
+
+REPEATED_SECRET_IN_ARTIFACT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Artifact",
+    description=(
+        "Обнаружен секрет типа '{secret_type}' в файле артефакта. "
+        "Встречается {count} раз (строки {first_line}–{last_line})."
+    ),
+    recommendation=_ARTIFACT_RECOMMENDATION,
+)
+
+SECRET_BLOCK_IN_ARTIFACT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Artifact",
+    description=(
+        "Обнаружен многострочный секрет типа '{secret_type}' в файле артефакта "
+        "(строки {first_line}–{end_line})."
+    ),
+    recommendation=_ARTIFACT_RECOMMENDATION,
+)
+
+REPEATED_SECRET_BLOCK_IN_ARTIFACT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Artifact",
+    description=(
+        "Обнаружен многострочный секрет типа '{secret_type}' в файле артефакта. "
+        "Встречается {count} раз (строки {first_line}–{last_line})."
+    ),
+    recommendation=_ARTIFACT_RECOMMENDATION,
+)
+
+ARTIFACT_READ_ERROR = FindingKind(
+    severity=Severity.HIGH,
+    category="IO Error",
+    description="Не удалось прочитать файл артефакта: {error}",
+    recommendation="Проверьте, что файл или архив не повреждён и доступен для чтения.",
+)
+
+# Separates an archive from a path inside it: "dist.zip!app/config.json".
+ARCHIVE_SEPARATOR = "!"
+
+DEFAULT_MAX_FILE_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_ARCHIVE_SIZE = 512 * 1024 * 1024
+DEFAULT_MAX_DEPTH = 3
+
+_HEAD_SIZE = 8192
+# Text is scanned in chunks of at most this many characters; a chunk that ends
+# mid-line is rescanned from its last _OVERLAP characters so secrets spanning
+# the boundary are still found.
+_CHUNK_CHARS = 1024 * 1024
+_OVERLAP = 1024
+
+_BINARY_MAGIC = (
+    b"\x7fELF",
+    b"MZ",
+    b"\xfe\xed\xfa\xce",
+    b"\xfe\xed\xfa\xcf",
+    b"\xce\xfa\xed\xfe",
+    b"\xcf\xfa\xed\xfe",
+    b"\xca\xfe\xba\xbe",
+    b"\x89PNG",
+    b"\xff\xd8\xff",
+    b"GIF8",
+    b"%PDF",
+    b"\x00asm",
+    b"BZh",
+    b"\xfd7zXZ",
+    b"\x28\xb5\x2f\xfd",
+    b"7z\xbc\xaf\x27\x1c",
+    b"SQLite format 3\x00",
+    b"RIFF",
+    b"OggS",
+    b"wOFF",
+    b"wOF2",
+)
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _is_tar(head: bytes) -> bool:
+    return head[257:262] == b"ustar"
+
+
+def _is_binary(head: bytes) -> bool:
+    return head.startswith(_BINARY_MAGIC) or b"\x00" in head
+
+
+@dataclass
+class ArtifactStats:
+    files: int = 0
+    archives: int = 0
+    skipped_binary: int = 0
+    skipped_size: int = 0
+    skipped_depth: int = 0
+    truncated: int = 0
+    errors: int = 0
+
+    def add(self, other: ArtifactStats) -> None:
+        self.files += other.files
+        self.archives += other.archives
+        self.skipped_binary += other.skipped_binary
+        self.skipped_size += other.skipped_size
+        self.skipped_depth += other.skipped_depth
+        self.truncated += other.truncated
+        self.errors += other.errors
+
+
+@dataclass
+class FileResult:
+    source: str
+    findings: list[Finding] = field(default_factory=list)
+    stats: ArtifactStats = field(default_factory=ArtifactStats)
+
+
+class _Rewound(io.RawIOBase):
+    # Replays the already consumed head of a non-seekable stream before the rest.
+    def __init__(self, head: bytes, rest: IO[bytes]):
+        self._head = memoryview(head)
+        self._rest = rest
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._rest.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+class _Capped(io.RawIOBase):
+    # Stops after `limit` bytes of a stream whose size is not known up front.
+    def __init__(self, raw: IO[bytes], limit: int):
+        self._raw = raw
+        self._left = limit
+        self.hit_limit = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._left <= 0:
+            self.hit_limit = self.hit_limit or bool(self._raw.read(1))
+            return 0
+        data = self._raw.read(min(len(b), self._left))
+        self._left -= len(data)
+        b[: len(data)] = data
+        return len(data)
+
+
+def _peek(raw: IO[bytes]) -> tuple[bytes, IO[bytes]]:
+    head = raw.read(_HEAD_SIZE)
+    return head, io.BufferedReader(_Rewound(head, raw))
+
+
+def iter_chunks(raw: IO[bytes]) -> Iterator[tuple[int, str, int]]:
+    # (line number, text, fresh_from): matches ending at or before fresh_from
+    # were already reported from the previous chunk of the same line.
+    text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+    line_num = 1
+    carry = ""
+    while True:
+        chunk = text.readline(_CHUNK_CHARS)
+        if not chunk:
+            return
+        ended = chunk.endswith(("\n", "\r"))
+        body = chunk.rstrip("\r\n")
+        yield line_num, carry + body, len(carry)
+        if ended:
+            line_num += 1
+            carry = ""
+        else:
+            carry = body[-_OVERLAP:]
+
+
+class ArtifactScanner:
+    def __init__(
+        self,
+        secret_engine: SecretDetectionEngine,
+        *,
+        max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+        max_archive_size: int = DEFAULT_MAX_ARCHIVE_SIZE,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        jobs: int = 1,
+    ):
+        self.secret_engine = secret_engine
+        self.max_file_size = max_file_size
+        self.max_archive_size = max_archive_size
+        self.max_depth = max_depth
+        self.jobs = max(1, jobs)
+
+    def scan_text(self, raw: IO[bytes], source: str) -> list[Finding]:
+        findings: list[Finding] = []
+        engine = self.secret_engine
+        rank = engine.pattern_rank
+        dedup = SecretDeduplicator(rank)
+        blocks: BlockTracker[None] = BlockTracker()
+
+        def scan_events(events: Iterator[BlockLine[None] | SecretBlock[None]]) -> None:
+            for event in events:
+                if isinstance(event, SecretBlock):
+                    dedup.add(event.match(), event.first_line, event.last_line)
+                    continue
+                matches = engine.detect_in_text(event.text)
+                for secret in collapse_overlapping(matches, rank):
+                    dedup.add(secret, event.line_num)
+
+        for line_num, text, fresh_from in iter_chunks(raw):
+            # Continuation chunks of a long line never belong to a block.
+            if fresh_from or blocks.ordinary(line_num, text):
+                matches = engine.detect_in_text(text)
+                if not matches:
+                    continue
+                for secret in collapse_overlapping(matches, rank):
+                    if fresh_from and 0 <= secret.end <= fresh_from:
+                        continue
+                    dedup.add(secret, line_num)
+            else:
+                scan_events(blocks.feed(line_num, text, None))
+            for occ in dedup.drain_flushed():
+                findings.append(self._finding(occ, source))
+        scan_events(blocks.finish())
+        for occ in dedup.finish():
+            findings.append(self._finding(occ, source))
+        return findings
+
+    @staticmethod
+    def _finding(occ: SecretOccurrences, source: str) -> Finding:
+        if occ.end_line > occ.first_line and occ.count > 1:
+            kind = REPEATED_SECRET_BLOCK_IN_ARTIFACT
+        elif occ.end_line > occ.first_line:
+            kind = SECRET_BLOCK_IN_ARTIFACT
+        elif occ.count > 1:
+            kind = REPEATED_SECRET_IN_ARTIFACT
+        else:
+            kind = SECRET_IN_ARTIFACT
+        return kind.at(
+            f"{source}:line {occ.first_line}" if occ.first_line else source,
+            evidence=occ.evidence,
+            fingerprint=occ.fingerprint,
+            occurrences=occ.count,
+            rule_id="artifacts",
+            secret_type=occ.label,
+            count=occ.count,
+            first_line=occ.first_line,
+            last_line=occ.last_line,
+            end_line=occ.end_line,
+        )
+
+    def _error(self, result: FileResult, source: str, exc: BaseException) -> None:
+        result.stats.errors += 1
+        result.findings.append(ARTIFACT_READ_ERROR.at(source, error=str(exc)))
+
+    def _scan_stream(
+        self,
+        raw: IO[bytes],
+        source: str,
+        size: int | None,
+        depth: int,
+        result: FileResult,
+        *,
+        path: Path | None = None,
+        gunzipped: bool = False,
+    ) -> None:
+        # `path` is set for files on disk, which zipfile can read in place;
+        # nested zips are read into memory (never to disk), up to
+        # max_archive_size.
+        head, stream = _peek(raw)
+        if head.startswith(_ZIP_MAGIC):
+            if depth >= self.max_depth:
+                result.stats.skipped_depth += 1
+                return
+            if path is None:
+                if size is not None and size > self.max_archive_size:
+                    result.stats.skipped_size += 1
+                    return
+                data = stream.read(self.max_archive_size + 1)
+                if len(data) > self.max_archive_size:
+                    result.stats.skipped_size += 1
+                    return
+                with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                    self._scan_zip(zf, source, depth, result)
+            else:
+                with zipfile.ZipFile(path) as zf:
+                    self._scan_zip(zf, source, depth, result)
+            return
+        if head.startswith(_GZIP_MAGIC) and not gunzipped:
+            # .tar.gz or a single gzipped file (e.g. a compressed log).
+            with gzip.GzipFile(fileobj=stream) as gz:
+                self._scan_stream(gz, source, None, depth, result, gunzipped=True)
+            return
+        if _is_tar(head):
+            if depth >= self.max_depth:
+                result.stats.skipped_depth += 1
+                return
+            self._scan_tar(stream, source, depth, result)
+            return
+        if size is not None and size > self.max_file_size:
+            result.stats.skipped_size += 1
+            return
+        if _is_binary(head):
+            result.stats.skipped_binary += 1
+            return
+
+        result.stats.files += 1
+        if size is None:
+            capped = _Capped(stream, self.max_file_size)
+            result.findings.extend(self.scan_text(io.BufferedReader(capped), source))
+            if capped.hit_limit:
+                result.stats.truncated += 1
+        else:
+            result.findings.extend(self.scan_text(stream, source))
+
+    def _scan_zip(
+        self, zf: zipfile.ZipFile, source: str, depth: int, result: FileResult
+    ) -> None:
+        result.stats.archives += 1
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            member = f"{source}{ARCHIVE_SEPARATOR}{info.filename}"
+            try:
+                with zf.open(info) as f:
+                    self._scan_stream(f, member, info.file_size, depth + 1, result)
+            except (OSError, EOFError, RuntimeError, zlib.error, zipfile.BadZipFile, tarfile.TarError) as e:
+                self._error(result, member, e)
+
+    def _scan_tar(
+        self, stream: IO[bytes], source: str, depth: int, result: FileResult
+    ) -> None:
+        # Streaming mode: members are read in order straight from the stream.
+        result.stats.archives += 1
+        with tarfile.open(fileobj=stream, mode="r|") as tf:
+            for info in tf:
+                if not info.isfile():
+                    continue
+                f = tf.extractfile(info)
+                if f is None:
+                    continue
+                member = f"{source}{ARCHIVE_SEPARATOR}{info.name}"
+                self._scan_stream(f, member, info.size, depth + 1, result)
+
+    def scan_file(self, path: Path, source: str | None = None) -> FileResult:
+        source = source if source is not None else str(path)
+        result = FileResult(source)
+        try:
+            size = path.stat().st_size
+            with path.open("rb") as f:
+                self._scan_stream(f, source, size, 0, result, path=path)
+        except (OSError, EOFError, RuntimeError, zlib.error, zipfile.BadZipFile, tarfile.TarError) as e:
+            self._error(result, source, e)
+        return result
+
+    def scan(self, root: Path) -> Iterator[FileResult]:
+        # Per-file results in path order; files are scanned concurrently.
+        self.secret_engine.warm()
+        files = list(iter_files(root))
+        if self.jobs <= 1 or len(files) <= 1:
+            for path in files:
+                yield self.scan_file(path)
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            yield from pool.map(self.scan_file, files)
+
+
+def iter_files(root: Path) -> Iterator[Path]:
+    if not root.is_dir():
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            p = Path(dirpath) / name
+            # Symlinks may point outside the artifact.
+            if p.is_file() and not p.is_symlink():
+                yield p
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from static.fingerprint import finding_fingerprint, stable_location
+from static.models import Finding
+
+
+BASELINE_VERSION = 1
+
+_FIELDS = ("rule", "location", "fingerprint")
+
+
+@dataclass(frozen=True)
+class Suppression:
+    rule: str | None = None
+    location: str | None = None
+    fingerprint: str | None = None
+
+
+def finding_key(finding: Finding) -> tuple[str, str, str]:
+    return (
+        finding.rule_id or finding.category,
+        stable_location(finding.location),
+        finding_fingerprint(finding),
+    )
+
+
+class Baseline:
+    def __init__(self, suppressions: Iterable[Suppression]):
+        # One hash set per combination of fields an entry specifies; a missing
+        # field is a wildcard. Lookup is a handful of set probes per finding.
+        self._index: dict[tuple[bool, bool, bool], set[tuple[str, ...]]] = {}
+        self.size = 0
+        for s in suppressions:
+            values = (s.rule, s.location, s.fingerprint)
+            shape = tuple(v is not None for v in values)
+            if not any(shape):
+                continue
+            key = tuple(v for v in values if v is not None)
+            self._index.setdefault(shape, set()).add(key)  # type: ignore[arg-type]
+            self.size += 1
+
+    @classmethod
+    def load(cls, path: Path) -> Baseline:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        items = data.get("suppressions") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            raise ValueError("ожидается объект с массивом 'suppressions'")
+
+        suppressions: list[Suppression] = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            values = {
+                f: item[f] for f in _FIELDS if isinstance(item.get(f), str) and item[f]
+            }
+            suppressions.append(Suppression(**values))
+        return cls(suppressions)
+
+    def is_suppressed(self, finding: Finding) -> bool:
+        if not self._index:
+            return False
+        key = finding_key(finding)
+        for shape, entries in self._index.items():
+            if tuple(v for v, used in zip(key, shape) if used) in entries:
+                return True
+        return False
+
+    def apply(self, findings: Iterable[Finding]) -> tuple[list[Finding], int]:
+        kept: list[Finding] = []
+        suppressed = 0
+        for f in findings:
+            if self.is_suppressed(f):
+                suppressed += f.occurrences
+            else:
+                kept.append(f)
+        return kept, suppressed
+
+
+def write_baseline(path: Path, findings: Iterable[Finding]) -> int:
+    seen: set[tuple[str, str, str]] = set()
+    entries: list[dict[str, str]] = []
+    for f in findings:
+        key = finding_key(f)
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append(dict(zip(_FIELDS, key)))
+    entries.sort(key=lambda e: (e["rule"], e["location"], e["fingerprint"]))
+    path.write_text(
+        json.dumps(
+            {"version": BASELINE_VERSION, "suppressions": entries},
+            ensure_ascii=False,
+            indent=2,
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    return len(entries)
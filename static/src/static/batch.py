@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+
+class BatchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    path: str
+    repo: str | None = None
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    # "i/N" with 0 <= i < N.
+    index, sep, total = value.partition("/")
+    try:
+        i, n = int(index), int(total)
+    except ValueError:
+        raise BatchError(f"ожидается формат i/N: {value}") from None
+    if not sep or n <= 0 or not 0 <= i < n:
+        raise BatchError(f"ожидается 0 <= i < N: {value}")
+    return i, n
+
+
+def shard_of(path: str, total: int) -> int:
+    # Stable across machines and Python runs (unlike hash()), so N workers split
+    # a manifest without coordinating.
+    digest = hashlib.sha1(path.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % total
+
+
+def read_manifest(f: IO[str]) -> Iterator[ManifestEntry]:
+    # One workflow path per line, optionally "repo<TAB>path"; blank lines and
+    # lines starting with '#' are ignored.
+    for line in f:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        repo, sep, path = line.partition("\t")
+        if sep:
+            yield ManifestEntry(path=path.strip(), repo=repo.strip() or None)
+        else:
+            yield ManifestEntry(path=line.strip())
+
+
+class Journal:
+    # Append-only NDJSON checkpoint. The first line identifies the shard; every
+    # other line records one finished manifest entry together with the size of
+    # the output file after its findings were written. On resume the output is
+    # truncated back to the last recorded size, dropping findings of an entry
+    # that was interrupted before it was journaled. Records are buffered and
+    # written by sync(), which the caller invokes only after the output itself
+    # has been flushed to disk.
+    def __init__(self, path: Path, shard: str):
+        self.path = path
+        self.shard = shard
+        self.done: set[str] = set()
+        self.offset = 0
+        self.critical = 0
+        self.findings = 0
+        self._f: IO[str] | None = None
+        self._pending: list[dict[str, object]] = []
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            f = self.path.open(encoding="utf-8")
+        except FileNotFoundError:
+            return
+        valid = 0
+        with f:
+            header = True
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # torn write of the last record
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if header:
+                    header = False
+                    if item.get("shard") != self.shard:
+                        raise BatchError(
+                            f"журнал {self.path} относится к шарду {item.get('shard')}, "
+                            f"а не {self.shard}"
+                        )
+                else:
+                    self.done.add(item["path"])
+                    self.offset = item["offset"]
+                    self.findings += item.get("findings", 0)
+                    self.critical += item.get("critical", 0)
+                valid += len(line.encode("utf-8"))
+        # Drop a torn tail so new records start on a clean line.
+        with self.path.open("r+b") as raw:
+            raw.truncate(valid)
+
+    def open(self) -> None:
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        self._f = self.path.open("a", encoding="utf-8")
+        if new:
+            self._pending.append({"shard": self.shard})
+            self.sync()
+
+    def record(self, path: str, *, offset: int, findings: int, critical: int) -> None:
+        self._pending.append(
+            {"path": path, "offset": offset, "findings": findings, "critical": critical}
+        )
+        self.done.add(path)
+        self.offset = offset
+        self.findings += findings
+        self.critical += critical
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def sync(self) -> None:
+        if not self._pending:
+            return
+        assert self._f is not None
+        for item in self._pending:
+            self._f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
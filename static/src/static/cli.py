@@ -1,22 +1,93 @@
 from __future__ import annotations
 
 import argparse
+import sqlite3
+import sys
+from collections.abc import Callable, Iterator
 from pathlib import Path
 
 from static.analyzers.logs import LogAnalyzer
 from static.analyzers.static_github_actions import StaticGithubActionsAnalyzer
-from static.models import Finding, Severity
+from static.baseline import Baseline, write_baseline
+from static.commands import (
+    artifacts_main,
+    batch_main,
+    history_main,
+    merge_main,
+    patterns_main,
+    query_main,
+    redact_main,
+    watch_main,
+)
+from static.custom_rules import RuleFileError, load_rule_files
+from static.decoding import DEFAULT_MAX_DEPTH, EncodedSecretDecoder
+from static.entropy import DEFAULT_THRESHOLDS, EntropyDetector
+from static.executor import BACKENDS
+from static.models import Finding, FindingKind, Severity
 from static.reporting.console import render_console_report
 from static.reporting.json_report import render_json
 from static.secrets import SecretDetectionEngine
+from static.git import GitError, repo_root
+from static.staged import analyze_staged
+from static.store import FindingStore, StoreError, guess_repo
 from static.rules.registry import default_workflow_rules
 
 
-def _read_text_file(path: Path) -> str:
-    return path.read_text(encoding="utf-8", errors="replace")
+_SUBCOMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "artifacts": artifacts_main,
+    "batch": batch_main,
+    "history": history_main,
+    "merge": merge_main,
+    "patterns": patterns_main,
+    "query": query_main,
+    "redact": redact_main,
+    "watch": watch_main,
+}
+
+WORKFLOW_NOT_FOUND = FindingKind(
+    severity=Severity.HIGH,
+    category="IO Error",
+    description="Файл не найден: {path}",
+    recommendation="Укажите корректный путь к workflow.yml.",
+)
+
+LOG_NOT_FOUND = FindingKind(
+    severity=Severity.MEDIUM,
+    category="IO Warning",
+    description="Файл лога не найден: {path}",
+    recommendation="Либо укажите существующий файл лога, либо уберите --log.",
+)
+
+PATTERN_BUDGET = FindingKind(
+    severity=Severity.LOW,
+    category="Pattern Budget",
+    description="Паттерн '{name}' превысил бюджет времени и был пропущен на {skipped} строках.",
+    recommendation=(
+        "Проверьте паттерн командой `pipesec patterns check` и упростите его, "
+        "либо увеличьте --pattern-budget-ms."
+    ),
+)
+
+BASELINE_ERROR = FindingKind(
+    severity=Severity.MEDIUM,
+    category="IO Warning",
+    description="Не удалось загрузить baseline: {error}",
+    recommendation="Проверьте путь к baseline или пересоздайте его через --write-baseline.",
+)
+
+
+def _iter_text_lines(path: Path) -> Iterator[str]:
+    with path.open(encoding="utf-8", errors="replace", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
 
 
 def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser(
         prog="pipesec",
         description="PipeSec: гибридный анализатор безопасности CI/CD workflow",
@@ -57,6 +128,67 @@ def main(argv: list[str] | None = None) -> int:
         ),
     )
 
+    parser.add_argument(
+        "--pattern-budget-ms",
+        dest="pattern_budget_ms",
+        type=float,
+        default=None,
+        help=(
+            "Бюджет времени (мс) на один паттерн для одной строки. Паттерн, превысивший бюджет, "
+            "пропускает строки не короче патологической (опционально)."
+        ),
+    )
+
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно искать секреты без известного префикса по энтропии строк",
+    )
+    parser.add_argument(
+        "--entropy-threshold",
+        dest="entropy_thresholds",
+        action="append",
+        default=[],
+        metavar="CHARSET=BITS",
+        help=(
+            "Порог энтропии (бит/символ) для набора символов (можно повторять). "
+            f"Наборы: {', '.join(DEFAULT_THRESHOLDS)}. Например: base64=4.8."
+        ),
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    parser.add_argument(
+        "--decode-depth",
+        type=int,
+        default=None,
+        metavar="N",
+        help=(
+            "Сколько вложенных кодировок снимать при --decode "
+            f"(по умолчанию {DEFAULT_MAX_DEPTH}; задание включает --decode)"
+        ),
+    )
+
+    parser.add_argument(
+        "--baseline",
+        dest="baseline_path",
+        type=Path,
+        default=None,
+        help=(
+            "JSON-файл baseline: находки из него (по rule id, местоположению и отпечатку) "
+            "не попадают в отчёт, а учитываются только в счётчике подавленных"
+        ),
+    )
+    parser.add_argument(
+        "--write-baseline",
+        dest="write_baseline_path",
+        type=Path,
+        default=None,
+        help="Записать все текущие находки в baseline-файл и выйти",
+    )
+
     parser.add_argument(
         "--list-rules",
         action="store_true",
@@ -83,35 +215,135 @@ def main(argv: list[str] | None = None) -> int:
             "Значение: rule id или полное имя класса."
         ),
     )
+    parser.add_argument(
+        "--rules-file",
+        dest="rules_files",
+        type=Path,
+        action="append",
+        default=[],
+        help=(
+            "YAML/JSON-файл с декларативными правилами (можно повторять); "
+            "их id можно указывать в --enable-rule/--disable-rule"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Число параллельных исполнителей правил (по умолчанию 1 — последовательно, "
+            "0 — по числу CPU). Порядок находок от этого не зависит."
+        ),
+    )
+    parser.add_argument(
+        "--jobs-backend",
+        choices=BACKENDS,
+        default="auto",
+        help=(
+            "Чем исполнять правила при --jobs > 1: thread — потоки (масштабируются "
+            "на free-threaded Python 3.13t), process — процессы (fork), "
+            "auto — потоки без GIL, иначе процессы."
+        ),
+    )
+
+    parser.add_argument(
+        "--store",
+        dest="store_path",
+        type=Path,
+        default=None,
+        help=(
+            "SQLite-хранилище находок: результаты скана добавляются/обновляются в нём "
+            "(см. pipesec query)"
+        ),
+    )
+    parser.add_argument(
+        "--repo",
+        default=None,
+        help="Имя репозитория для --store (по умолчанию — каталог git-репозитория workflow)",
+    )
+
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help=(
+            "Проверить workflow из индекса git (то, что будет закоммичено), "
+            "не читая рабочее дерево; для pre-commit"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Остановить анализ на первой CRITICAL-находке",
+    )
 
     args = parser.parse_args(argv)
 
-    if args.workflow is None and not args.list_rules:
+    entropy_thresholds: dict[str, float] = {}
+    for item in args.entropy_thresholds:
+        charset, _, bits = item.partition("=")
+        if charset not in DEFAULT_THRESHOLDS:
+            parser.error(f"неизвестный набор символов для --entropy-threshold: {charset}")
+        try:
+            entropy_thresholds[charset] = float(bits)
+        except ValueError:
+            parser.error(f"некорректный порог для --entropy-threshold: {item}")
+
+    if args.decode_depth is not None and args.decode_depth < 1:
+        parser.error("--decode-depth должен быть не меньше 1")
+
+    if args.staged:
+        if args.workflow is not None:
+            parser.error("--staged нельзя совмещать с путём к workflow")
+        if args.store_path is not None:
+            parser.error("--store не поддерживается с --staged")
+    elif args.workflow is None and not args.list_rules:
         parser.print_help()
         return 0
 
+    rules = default_workflow_rules()
+    try:
+        custom_rules = load_rule_files(args.rules_files)
+    except RuleFileError as exc:
+        print(f"pipesec: {exc}", file=sys.stderr)
+        return 2
+
     if args.list_rules:
-        rules = default_workflow_rules()
-        for rule in rules:
-            rule_id = StaticGithubActionsAnalyzer._rule_id(rule)
-            rule_fqn = StaticGithubActionsAnalyzer._rule_fqn(rule)
-            print(f" - id: {rule_id}, fqdn: {rule_fqn}")
+        for rule in [*rules, *custom_rules]:
+            severities = "/".join(s.value for s in rule.severities())
+            print(
+                f" - id: {rule.rule_id}, fqdn: {rule.fqn()}"
+                + (f", severity: {severities}" if severities else "")
+            )
         return 0
 
     findings: list[Finding] = []
+    # Log findings are stored under the log's own file key: a later scan without
+    # --log must not mark them closed.
+    log_findings: list[Finding] | None = None
 
-    if not args.workflow.exists():
+    if not args.staged and not args.workflow.exists():
         findings.append(
-            Finding(
-                severity=Severity.HIGH,
-                category="IO Error",
-                description=f"Файл не найден: {args.workflow}",
-                location=str(args.workflow),
-                recommendation="Укажите корректный путь к workflow.yml.",
-            )
+            WORKFLOW_NOT_FOUND.at(str(args.workflow), path=str(args.workflow))
         )
     else:
-        secret_engine = SecretDetectionEngine(patterns_path=args.patterns_path)
+        secret_engine = SecretDetectionEngine(
+            patterns_path=args.patterns_path,
+            pattern_budget=(
+                args.pattern_budget_ms / 1000.0
+                if args.pattern_budget_ms is not None
+                else None
+            ),
+            entropy_detector=(
+                EntropyDetector(thresholds=entropy_thresholds)
+                if args.entropy or entropy_thresholds
+                else None
+            ),
+            decoder=(
+                EncodedSecretDecoder(max_depth=args.decode_depth or DEFAULT_MAX_DEPTH)
+                if args.decode or args.decode_depth is not None
+                else None
+            ),
+        )
         enabled = {
             r.strip() for r in args.enable_rules if isinstance(r, str) and r.strip()
         }
@@ -122,32 +354,79 @@ def main(argv: list[str] | None = None) -> int:
             secret_engine,
             enabled_rules=enabled if enabled else None,
             disabled_rules=disabled if disabled else None,
+            jobs=args.jobs,
+            backend=args.jobs_backend,
+            custom_rules=custom_rules,
         )
-        findings.extend(static_analyzer.analyze_workflow_file(args.workflow))
+        if args.staged:
+            try:
+                findings.extend(
+                    analyze_staged(
+                        static_analyzer,
+                        repo_root(Path.cwd()),
+                        fail_fast=args.fail_fast,
+                    )
+                )
+            except GitError as exc:
+                print(f"pipesec: {exc}", file=sys.stderr)
+                return 2
+        else:
+            findings.extend(static_analyzer.analyze_workflow_file(args.workflow))
 
-        if args.log_path is not None:
+        stop = args.fail_fast and any(f.severity == Severity.CRITICAL for f in findings)
+        if args.log_path is not None and not stop:
             if args.log_path.exists():
                 log_analyzer = LogAnalyzer(secret_engine)
-                findings.extend(
-                    log_analyzer.analyze_text(
-                        _read_text_file(args.log_path), str(args.log_path)
-                    )
+                log_findings = log_analyzer.analyze_lines(
+                    _iter_text_lines(args.log_path), str(args.log_path)
                 )
+                findings.extend(log_findings)
             else:
                 findings.append(
-                    Finding(
-                        severity=Severity.MEDIUM,
-                        category="IO Warning",
-                        description=f"Файл лога не найден: {args.log_path}",
-                        location=str(args.log_path),
-                        recommendation="Либо укажите существующий файл лога, либо уберите --log.",
-                    )
+                    LOG_NOT_FOUND.at(str(args.log_path), path=str(args.log_path))
                 )
 
+        for name, skipped in sorted(secret_engine.budget_skips.items()):
+            findings.append(PATTERN_BUDGET.at(name, name=name, skipped=skipped))
+
+    if args.write_baseline_path is not None:
+        written = write_baseline(args.write_baseline_path, findings)
+        print(f"Baseline записан: {args.write_baseline_path} ({written} записей)")
+        return 0
+
+    if args.store_path is not None:
+        # Stored before the baseline is applied: suppressed findings are still
+        # open, not fixed.
+        repo = args.repo if args.repo is not None else guess_repo(args.workflow)
+        log_ids = {id(f) for f in log_findings or ()}
+        try:
+            with FindingStore(args.store_path) as store, store.transaction():
+                store.record_scan(
+                    repo,
+                    str(args.workflow),
+                    [f for f in findings if id(f) not in log_ids],
+                )
+                if log_findings is not None:
+                    store.record_scan(repo, str(args.log_path), log_findings)
+        except (StoreError, sqlite3.Error) as exc:
+            print(f"pipesec: не удалось записать в хранилище: {exc}", file=sys.stderr)
+            return 2
+
+    suppressed: int | None = None
+    if args.baseline_path is not None:
+        try:
+            baseline = Baseline.load(args.baseline_path)
+        except (OSError, ValueError) as exc:
+            findings.append(
+                BASELINE_ERROR.at(str(args.baseline_path), error=str(exc))
+            )
+        else:
+            findings, suppressed = baseline.apply(findings)
+
     if args.format == "json":
-        report = render_json(findings)
+        report = render_json(findings, suppressed=suppressed)
     else:
-        report = render_console_report(findings)
+        report = render_console_report(findings, suppressed=suppressed)
 
     if args.out_path is not None:
         args.out_path.write_text(report + "\n", encoding="utf-8")
@@ -0,0 +1,19 @@
+from .artifacts import main as artifacts_main
+from .batch import main as batch_main
+from .history import main as history_main
+from .merge import main as merge_main
+from .patterns import main as patterns_main
+from .query import main as query_main
+from .redact import main as redact_main
+from .watch import main as watch_main
+
+__all__ = [
+    "artifacts_main",
+    "batch_main",
+    "history_main",
+    "merge_main",
+    "patterns_main",
+    "query_main",
+    "redact_main",
+    "watch_main",
+]
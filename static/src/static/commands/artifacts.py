@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from static.artifacts import (
+    DEFAULT_MAX_ARCHIVE_SIZE,
+    DEFAULT_MAX_DEPTH,
+    DEFAULT_MAX_FILE_SIZE,
+    ArtifactScanner,
+    ArtifactStats,
+)
+from static.decoding import EncodedSecretDecoder
+from static.entropy import EntropyDetector
+from static.executor import resolve_jobs
+from static.models import Finding, Severity
+from static.reporting.console import render_console_report
+from static.reporting.json_report import render_json
+from static.secrets import SecretDetectionEngine
+
+
+_MIB = 1024 * 1024
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec artifacts",
+        description=(
+            "Поиск секретов в артефактах сборки: каталоги, zip и tar(.gz), "
+            "включая вложенные архивы (без распаковки на диск)"
+        ),
+    )
+    parser.add_argument(
+        "paths",
+        type=Path,
+        nargs="+",
+        help="Каталоги или архивы артефактов",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["console", "json"],
+        default="console",
+        help="Формат отчёта",
+    )
+    parser.add_argument(
+        "--out",
+        dest="out_path",
+        type=Path,
+        default=None,
+        help="Записать отчёт в файл вместо stdout",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Число потоков (по умолчанию 0 — по числу CPU)",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=float,
+        default=DEFAULT_MAX_FILE_SIZE / _MIB,
+        help="Пропускать файлы крупнее N МиБ (по умолчанию 64)",
+    )
+    parser.add_argument(
+        "--max-archive-size",
+        type=float,
+        default=DEFAULT_MAX_ARCHIVE_SIZE / _MIB,
+        help="Максимальный размер вложенного zip, читаемого в память, МиБ (по умолчанию 512)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=DEFAULT_MAX_DEPTH,
+        help="Максимальная глубина вложенности архивов (по умолчанию 3)",
+    )
+    parser.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно искать секреты без известного префикса по энтропии строк",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.paths if not p.exists()]
+    if missing:
+        print(f"pipesec artifacts: не найдено: {', '.join(map(str, missing))}", file=sys.stderr)
+        return 2
+
+    scanner = ArtifactScanner(
+        SecretDetectionEngine(
+            patterns_path=args.patterns_path,
+            entropy_detector=EntropyDetector() if args.entropy else None,
+            decoder=EncodedSecretDecoder() if args.decode else None,
+        ),
+        max_file_size=int(args.max_file_size * _MIB),
+        max_archive_size=int(args.max_archive_size * _MIB),
+        max_depth=args.max_depth,
+        jobs=resolve_jobs(args.jobs),
+    )
+
+    findings: list[Finding] = []
+    stats = ArtifactStats()
+    for root in args.paths:
+        for result in scanner.scan(root):
+            findings.extend(result.findings)
+            stats.add(result.stats)
+
+    print(
+        f"pipesec artifacts: проверено файлов {stats.files}, архивов {stats.archives}; "
+        f"пропущено бинарных {stats.skipped_binary}, по размеру {stats.skipped_size}, "
+        f"по глубине {stats.skipped_depth}; обрезано {stats.truncated}, ошибок {stats.errors}",
+        file=sys.stderr,
+    )
+
+    if args.format == "json":
+        report = render_json(findings)
+    else:
+        report = render_console_report(findings)
+
+    if args.out_path is not None:
+        args.out_path.write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+
+    return 1 if any(f.severity == Severity.CRITICAL for f in findings) else 0
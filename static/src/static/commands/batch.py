@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from types import FrameType
+
+from static.analyzers.static_github_actions import StaticGithubActionsAnalyzer
+from static.batch import BatchError, Journal, parse_shard, read_manifest, shard_of
+from static.custom_rules import RuleFileError, load_rule_files
+from static.decoding import EncodedSecretDecoder
+from static.entropy import EntropyDetector
+from static.models import Finding, Severity
+from static.reporting.json_report import finding_to_dict
+from static.secrets import SecretDetectionEngine
+from static.store import FindingStore, StoreError, guess_repo
+
+
+def _terminate(signum: int, frame: FrameType | None) -> None:
+    # Preemption usually arrives as SIGTERM; unwind so the last completed
+    # entries are checkpointed.
+    raise SystemExit(128 + signum)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec batch",
+        description=(
+            "Пакетный статический анализ workflow по манифесту с шардированием "
+            "и возобновлением с контрольной точки"
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        required=True,
+        help="Файл со списком workflow: по одному пути в строке или 'repo<TAB>путь'",
+    )
+    parser.add_argument(
+        "--shard",
+        default="0/1",
+        help="Шард i/N (0 <= i < N): обрабатываются пути, чей хэш по модулю N равен i",
+    )
+    parser.add_argument(
+        "--out",
+        dest="out_path",
+        type=Path,
+        required=True,
+        help="NDJSON-файл с находками шарда (дописывается при возобновлении)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Журнал завершённых записей (по умолчанию <out>.journal)",
+    )
+    parser.add_argument(
+        "--sync-every",
+        type=int,
+        default=32,
+        help="Сбрасывать на диск результаты и журнал каждые N записей (по умолчанию 32)",
+    )
+    parser.add_argument(
+        "--store",
+        dest="store_path",
+        type=Path,
+        default=None,
+        help="Дополнительно записывать находки в SQLite-хранилище (см. pipesec query)",
+    )
+    parser.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно искать секреты без известного префикса по энтропии строк",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    parser.add_argument(
+        "--enable-rule",
+        dest="enable_rules",
+        action="append",
+        default=[],
+        help="Включить только указанные правила (rule id или полное имя класса; можно повторять)",
+    )
+    parser.add_argument(
+        "--disable-rule",
+        dest="disable_rules",
+        action="append",
+        default=[],
+        help="Отключить указанные правила (rule id или полное имя класса; можно повторять)",
+    )
+    parser.add_argument(
+        "--rules-file",
+        dest="rules_files",
+        type=Path,
+        action="append",
+        default=[],
+        help="YAML/JSON-файл с декларативными правилами (можно повторять)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        index, total = parse_shard(args.shard)
+    except BatchError as e:
+        parser.error(str(e))
+    shard = f"{index}/{total}"
+    try:
+        custom_rules = load_rule_files(args.rules_files)
+    except RuleFileError as e:
+        print(f"pipesec batch: {e}", file=sys.stderr)
+        return 2
+    journal_path = args.checkpoint or args.out_path.with_name(
+        args.out_path.name + ".journal"
+    )
+
+    analyzer = StaticGithubActionsAnalyzer(
+        SecretDetectionEngine(
+            patterns_path=args.patterns_path,
+            entropy_detector=EntropyDetector() if args.entropy else None,
+            decoder=EncodedSecretDecoder() if args.decode else None,
+        ),
+        enabled_rules={r.strip() for r in args.enable_rules if r.strip()} or None,
+        disabled_rules={r.strip() for r in args.disable_rules if r.strip()} or None,
+        custom_rules=custom_rules,
+    )
+
+    previous = signal.signal(signal.SIGTERM, _terminate)
+    scanned = skipped = 0
+    try:
+        with ExitStack() as stack:
+            journal = Journal(journal_path, shard)
+            stack.callback(journal.close)
+            resumed = len(journal.done)
+
+            out_fd = os.open(args.out_path, os.O_RDWR | os.O_CREAT, 0o644)
+            out = stack.enter_context(os.fdopen(out_fd, "r+b"))
+            # Findings written after the last checkpoint belong to entries that
+            # will be scanned again.
+            out.truncate(journal.offset)
+            out.seek(journal.offset)
+
+            journal.open()
+            store = (
+                stack.enter_context(FindingStore(args.store_path))
+                if args.store_path is not None
+                else None
+            )
+
+            # Scans recorded since the last checkpoint. They reach the store only
+            # after the journal lists them as done, so a resumed run never scans
+            # again what the store already has (at worst, a crash between the two
+            # syncs leaves the last batch out of the store).
+            pending: list[tuple[str, str, list[Finding]]] = []
+
+            def checkpoint() -> None:
+                out.flush()
+                os.fsync(out.fileno())
+                journal.sync()
+                if store is not None and pending:
+                    with store.transaction():
+                        for repo, file, findings in pending:
+                            # Interrupted before journal.record: scanned again.
+                            if file in journal.done:
+                                store.record_scan(repo, file, findings)
+                    pending.clear()
+
+            stack.callback(checkpoint)
+
+            manifest = stack.enter_context(args.manifest.open(encoding="utf-8"))
+            for entry in read_manifest(manifest):
+                if shard_of(entry.path, total) != index:
+                    continue
+                if entry.path in journal.done:
+                    skipped += 1
+                    continue
+
+                path = Path(entry.path)
+                findings = analyzer.analyze_workflow_file(path)
+                for f in findings:
+                    item = finding_to_dict(f)
+                    item["file"] = entry.path
+                    out.write((json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8"))
+                if store is not None:
+                    repo = entry.repo if entry.repo is not None else guess_repo(path)
+                    pending.append((repo, entry.path, findings))
+
+                journal.record(
+                    entry.path,
+                    offset=out.tell(),
+                    findings=len(findings),
+                    critical=sum(1 for f in findings if f.severity == Severity.CRITICAL),
+                )
+                scanned += 1
+                if journal.pending >= args.sync_every:
+                    checkpoint()
+    except (OSError, BatchError, StoreError, sqlite3.Error) as e:
+        print(f"pipesec batch: {e}", file=sys.stderr)
+        return 2
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    print(
+        f"pipesec batch: шард {shard}: обработано {scanned}, "
+        f"уже в журнале {skipped} (было {resumed}), находок всего {journal.findings}",
+        file=sys.stderr,
+    )
+    return 1 if journal.critical else 0
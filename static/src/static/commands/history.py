@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from static.decoding import EncodedSecretDecoder
+from static.entropy import EntropyDetector
+from static.git import GitError, repo_root
+from static.history import HistoryScanner
+from static.reporting.console import render_console_report
+from static.reporting.json_report import render_json
+from static.secrets import SecretDetectionEngine
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec history",
+        description=(
+            "Поиск секретов во всех версиях .github/workflows/* в истории git, "
+            "включая уже удалённые, с коммитом, где секрет появился впервые"
+        ),
+    )
+    parser.add_argument(
+        "repo",
+        type=Path,
+        nargs="?",
+        default=Path("."),
+        help="Путь к локальному git-репозиторию (по умолчанию текущий каталог)",
+    )
+    parser.add_argument(
+        "--rev",
+        dest="revs",
+        action="append",
+        default=[],
+        help="Ревизии или диапазоны для обхода (можно повторять; по умолчанию --all)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["console", "json"],
+        default="console",
+        help="Формат отчёта",
+    )
+    parser.add_argument(
+        "--out",
+        dest="out_path",
+        type=Path,
+        default=None,
+        help="Записать отчёт в файл вместо stdout",
+    )
+    parser.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно искать секреты без известного префикса по энтропии строк",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    args = parser.parse_args(argv)
+
+    scanner = HistoryScanner(
+        SecretDetectionEngine(
+            patterns_path=args.patterns_path,
+            entropy_detector=EntropyDetector() if args.entropy else None,
+            decoder=EncodedSecretDecoder() if args.decode else None,
+        )
+    )
+    try:
+        findings = scanner.scan(repo_root(args.repo), args.revs or None)
+    except GitError as e:
+        print(f"pipesec history: {e}", file=sys.stderr)
+        return 2
+
+    stats = scanner.stats
+    print(
+        f"pipesec history: коммитов с изменениями workflow {stats.commits}, "
+        f"версий файлов {stats.versions}, уникальных блобов {stats.blobs}, "
+        f"секретов {stats.secrets} ({stats.seconds:.1f} с)",
+        file=sys.stderr,
+    )
+
+    if args.format == "json":
+        report = render_json(findings)
+    else:
+        report = render_console_report(findings)
+
+    if args.out_path is not None:
+        args.out_path.write_text(report + "\n", encoding="utf-8")
+    else:
+        print(report)
+
+    return 1 if findings else 0
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from static.merge import ReportFormatError, ReportMerger
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec merge",
+        description="Объединить JSON/NDJSON-отчёты статического и динамического модулей",
+    )
+    parser.add_argument(
+        "reports",
+        nargs="+",
+        help="Пути к отчётам (JSON или NDJSON; '-' — stdin)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Формат объединённого отчёта",
+    )
+    parser.add_argument(
+        "--out",
+        dest="out_path",
+        type=Path,
+        default=None,
+        help="Записать отчёт в файл вместо stdout",
+    )
+    args = parser.parse_args(argv)
+
+    merger = ReportMerger()
+    try:
+        for report in args.reports:
+            try:
+                if report == "-":
+                    merger.add_report(sys.stdin)
+                    continue
+                with open(report, encoding="utf-8") as f:
+                    merger.add_report(f)
+            except (OSError, ReportFormatError) as e:
+                print(f"pipesec merge: {report}: {e}", file=sys.stderr)
+                return 2
+
+        out = (
+            args.out_path.open("w", encoding="utf-8")
+            if args.out_path
+            else sys.stdout
+        )
+        try:
+            if args.format == "ndjson":
+                merger.write_ndjson(out)
+            else:
+                merger.write_json(out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    finally:
+        merger.close()
+
+    if merger.skipped:
+        print(
+            f"pipesec merge: пропущено находок без корректного severity: {merger.skipped}",
+            file=sys.stderr,
+        )
+    return 1 if merger.counts["CRITICAL"] else 0
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from static.pattern_audit import PatternAudit, audit_patterns
+from static.secrets import SecretDetectionEngine
+
+
+def _render_console(audits: list[PatternAudit], patterns_path: Path | None) -> str:
+    lines: list[str] = []
+    lines.append("\n" + "=" * 80)
+    lines.append("🧪 PipeSec - Проверка паттернов секретов")
+    lines.append("=" * 80)
+    if patterns_path is not None:
+        lines.append(f"📄 Файл паттернов: {patterns_path}")
+    lines.append(f"📊 Всего паттернов: {len(audits)}\n")
+
+    for a in audits:
+        worst = a.worst
+        cost = (
+            f"{worst.us_per_kb:.1f} мкс/КБ ({worst.name}, рост x{worst.growth:.1f})"
+            if worst
+            else "-"
+        )
+        mbps = a.corpus_mb_per_s
+        lines.append(f"[{a.status.upper()}] {a.name}")
+        if a.error:
+            lines.append(f"   ❌ Ошибка компиляции: {a.error}")
+            continue
+        if a.exponential:
+            cost = "не замерялся (структура паттерна допускает экспоненциальный бэктрекинг)"
+        elif a.timed_out:
+            cost = "замер прерван по лимиту времени: вероятен катастрофический бэктрекинг"
+        lines.append(f"   ⏱  Худший случай: {cost}")
+        if mbps is not None:
+            lines.append(f"   📈 Реальный корпус: {mbps:.1f} МБ/с")
+        for w in a.warnings:
+            lines.append(f"   ⚠️  {w}")
+        if a.catastrophic and a.adversarial:
+            lines.append(
+                "   🔴 Сверхлинейный рост времени на adversarial-входе: "
+                "риск катастрофического бэктрекинга"
+            )
+
+    lines.append("\n" + "=" * 80 + "\n")
+    return "\n".join(lines)
+
+
+def _check(args: argparse.Namespace) -> int:
+    engine = SecretDetectionEngine(patterns_path=args.patterns_path)
+    resolved = SecretDetectionEngine._resolve_patterns_path(args.patterns_path)
+
+    corpora: list[str] = []
+    for p in args.corpus:
+        try:
+            corpora.append(p.read_text(encoding="utf-8", errors="replace"))
+        except OSError as e:
+            print(f"pipesec patterns: не удалось прочитать корпус {p}: {e}", file=sys.stderr)
+            return 2
+
+    patterns = engine.patterns
+    if resolved is not None:
+        # The engine drops invalid regexes on load; report them here instead.
+        patterns = (
+            SecretDetectionEngine._load_patterns_json(resolved, validate=False)
+            or patterns
+        )
+
+    audits = audit_patterns(patterns, corpora=corpora)
+
+    if args.format == "json":
+        print(
+            json.dumps(
+                {"patterns": [a.to_dict() for a in audits], "count": len(audits)},
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        print(_render_console(audits, resolved))
+
+    return 1 if any(a.error or a.catastrophic for a in audits) else 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec patterns",
+        description="Операции над файлом regex-паттернов секретов",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    check = sub.add_parser(
+        "check",
+        help="Скомпилировать паттерны и оценить их стоимость/риск бэктрекинга",
+    )
+    check.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    check.add_argument(
+        "--corpus",
+        type=Path,
+        action="append",
+        default=[],
+        help="Реальный корпус (например, лог сборки) для замера пропускной способности (можно повторять)",
+    )
+    check.add_argument(
+        "--format",
+        choices=["console", "json"],
+        default="console",
+        help="Формат отчёта",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "check":
+        return _check(args)
+
+    parser.print_help()
+    return 0
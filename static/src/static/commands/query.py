@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from static.store import FindingStore, StoreError
+
+
+_SEVERITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
+
+
+def _table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    cells = [[str(c) for c in headers]] + [[str(c) for c in r] for r in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(headers))]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(r, widths)).rstrip() for r in cells]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def _emit(args: argparse.Namespace, headers: Sequence[str], rows: list[Any]) -> None:
+    if args.format == "json":
+        print(
+            json.dumps(
+                [dict(zip(headers, r)) for r in rows], ensure_ascii=False, indent=2
+            )
+        )
+    elif rows:
+        print(_table(headers, rows))
+    else:
+        print("Нет данных")
+
+
+def _summary(store: FindingStore, args: argparse.Namespace) -> None:
+    order = {s: i for i, s in enumerate(_SEVERITIES)}
+    rows = sorted(store.summary(), key=lambda r: order.get(r[0], len(order)))
+    _emit(args, ["severity", "repos", "findings", "occurrences"], rows)
+
+
+def _rules(store: FindingStore, args: argparse.Namespace) -> None:
+    _emit(args, ["rule_id", "severity", "repos", "findings"], store.rules())
+
+
+def _repos(store: FindingStore, args: argparse.Namespace) -> None:
+    rows = store.repos(rule=args.rule, severity=args.severity)
+    _emit(args, ["repo", "findings"], rows)
+
+
+def _findings(store: FindingStore, args: argparse.Namespace) -> None:
+    items = store.findings(
+        repo=args.repo,
+        rule=args.rule,
+        severity=args.severity,
+        include_closed=args.all,
+        limit=args.limit,
+    )
+    if args.format == "json":
+        print(json.dumps(list(items), ensure_ascii=False, indent=2))
+        return
+    rows = [
+        (
+            f["severity"],
+            f["rule_id"],
+            f["repo"],
+            f["location"],
+            "открыта" if f["open"] else "закрыта",
+        )
+        for f in items
+    ]
+    _emit(args, ["severity", "rule_id", "repo", "location", "status"], rows)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec query",
+        description="Агрегаты по хранилищу находок (--store)",
+    )
+    parser.add_argument("--db", type=Path, required=True, help="Путь к SQLite-хранилищу")
+    parser.add_argument(
+        "--format",
+        choices=["console", "json"],
+        default="console",
+        help="Формат вывода",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("summary", help="Открытые находки по severity: репозитории, находки, вхождения")
+    sub.add_parser("rules", help="Правила по числу затронутых репозиториев")
+
+    repos = sub.add_parser("repos", help="Репозитории с открытыми находками")
+    repos.add_argument("--rule", default=None, help="Только находки правила (rule id)")
+    repos.add_argument("--severity", choices=_SEVERITIES, default=None)
+
+    findings = sub.add_parser("findings", help="Список находок")
+    findings.add_argument("--repo", default=None)
+    findings.add_argument("--rule", default=None, help="rule id")
+    findings.add_argument("--severity", choices=_SEVERITIES, default=None)
+    findings.add_argument(
+        "--all", action="store_true", help="Включая закрытые (исчезнувшие при повторном скане)"
+    )
+    findings.add_argument("--limit", type=int, default=100, help="Максимум строк (по умолчанию 100)")
+
+    args = parser.parse_args(argv)
+    handlers = {
+        "summary": _summary,
+        "rules": _rules,
+        "repos": _repos,
+        "findings": _findings,
+    }
+    if args.command not in handlers:
+        parser.print_help()
+        return 0
+    if not args.db.exists():
+        print(f"pipesec query: хранилище не найдено: {args.db}", file=sys.stderr)
+        return 2
+
+    try:
+        with FindingStore(args.db) as store:
+            handlers[args.command](store, args)
+    except StoreError as e:
+        print(f"pipesec query: {e}", file=sys.stderr)
+        return 2
+    return 0
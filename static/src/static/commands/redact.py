@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO
+
+from static.analyzers.logs import LogAnalyzer
+from static.decoding import EncodedSecretDecoder
+from static.entropy import EntropyDetector
+from static.latency import LatencyHistogram
+from static.secrets import SecretDetectionEngine
+
+
+def _open_text(stack: ExitStack, path: Path | None, mode: str) -> IO[str]:
+    # surrogateescape round-trips bytes that are not valid UTF-8 unchanged.
+    if path is None:
+        raw = sys.stdin.buffer if mode == "r" else sys.stdout.buffer
+        return stack.enter_context(
+            io.TextIOWrapper(
+                raw,
+                encoding="utf-8",
+                errors="surrogateescape",
+                newline="",
+                line_buffering=mode == "w",
+                write_through=mode == "w",
+            )
+        )
+    return stack.enter_context(
+        path.open(mode, encoding="utf-8", errors="surrogateescape", newline="")
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec redact",
+        description="Фильтр логов: заменяет найденные секреты на ***<тип>*** построчно (stdin → stdout)",
+    )
+    parser.add_argument(
+        "--log",
+        dest="log_path",
+        type=Path,
+        default=None,
+        help="Путь к логу (по умолчанию stdin)",
+    )
+    parser.add_argument(
+        "--out",
+        dest="out_path",
+        type=Path,
+        default=None,
+        help="Записать результат в файл вместо stdout",
+    )
+    parser.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно маскировать строки с высокой энтропией",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Вывести в stderr гистограмму задержки на строку",
+    )
+    args = parser.parse_args(argv)
+
+    engine = SecretDetectionEngine(
+        patterns_path=args.patterns_path,
+        entropy_detector=EntropyDetector() if args.entropy else None,
+        decoder=EncodedSecretDecoder() if args.decode else None,
+    )
+    analyzer = LogAnalyzer(engine)
+    histogram = LatencyHistogram() if args.latency else None
+
+    with ExitStack() as stack:
+        try:
+            src = _open_text(stack, args.log_path, "r")
+            dst = _open_text(stack, args.out_path, "w")
+        except OSError as e:
+            print(f"pipesec redact: {e}", file=sys.stderr)
+            return 1
+        for line in analyzer.redact_stream(src, histogram=histogram):
+            dst.write(line)
+
+    if histogram is not None:
+        print(histogram.render(), file=sys.stderr)
+    return 0
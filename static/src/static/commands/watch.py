@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from static.analyzers.static_github_actions import StaticGithubActionsAnalyzer
+from static.custom_rules import RuleFileError, load_rule_files
+from static.decoding import EncodedSecretDecoder
+from static.entropy import EntropyDetector
+from static.models import Finding
+from static.secrets import SecretDetectionEngine
+from static.watch import FileDiff, InotifyWatcher, WatchSession, open_watcher, run
+
+
+def _line(sign: str, f: Finding) -> str:
+    return f"  {sign} [{f.severity.value}] {f.category} — {f.location}\n      {f.description}"
+
+
+def _relative(path: Path, root: Path) -> str:
+    try:
+        return str(path.relative_to(root))
+    except ValueError:
+        return str(path)
+
+
+def _report(root: Path, diffs: list[FileDiff], elapsed: float) -> None:
+    stamp = time.strftime("%H:%M:%S")
+    if not diffs:
+        print(f"[{stamp}] без изменений в находках ({elapsed * 1000:.1f} мс)", flush=True)
+        return
+    lines: list[str] = []
+    for d in diffs:
+        lines.append(
+            f"[{stamp}] {_relative(d.path, root)}: +{len(d.added)} -{len(d.removed)} "
+            f"({elapsed * 1000:.1f} мс)"
+        )
+        lines.extend(_line("+", f) for f in d.added)
+        lines.extend(_line("-", f) for f in d.removed)
+    print("\n".join(lines), flush=True)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pipesec watch",
+        description=(
+            "Следить за .github/workflows и .github/actions и перепроверять изменённые "
+            "workflow, выводя разницу находок"
+        ),
+    )
+    parser.add_argument(
+        "root",
+        type=Path,
+        nargs="?",
+        default=Path("."),
+        help="Корень репозитория (по умолчанию текущий каталог)",
+    )
+    parser.add_argument(
+        "--debounce-ms",
+        type=float,
+        default=20.0,
+        help="Пауза без событий перед перепроверкой, мс (по умолчанию 20)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Опрашивать файлы вместо inotify (например, на сетевых ФС)",
+    )
+    parser.add_argument(
+        "--poll-interval-ms",
+        type=float,
+        default=100.0,
+        help="Интервал опроса для --poll и при недоступном inotify, мс (по умолчанию 100)",
+    )
+    parser.add_argument(
+        "--patterns",
+        dest="patterns_path",
+        type=Path,
+        default=None,
+        help="Путь к JSON с regex-паттернами секретов (по умолчанию data/secret_patterns.json)",
+    )
+    parser.add_argument(
+        "--entropy",
+        action="store_true",
+        help="Дополнительно искать секреты без известного префикса по энтропии строк",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Дополнительно искать секреты внутри base64/hex/URL-кодированных фрагментов",
+    )
+    parser.add_argument(
+        "--enable-rule",
+        dest="enable_rules",
+        action="append",
+        default=[],
+        help="Включить только указанные правила (rule id или полное имя класса; можно повторять)",
+    )
+    parser.add_argument(
+        "--disable-rule",
+        dest="disable_rules",
+        action="append",
+        default=[],
+        help="Отключить указанные правила (rule id или полное имя класса; можно повторять)",
+    )
+    parser.add_argument(
+        "--rules-file",
+        dest="rules_files",
+        type=Path,
+        action="append",
+        default=[],
+        help="YAML/JSON-файл с декларативными правилами (можно повторять)",
+    )
+    args = parser.parse_args(argv)
+
+    root = args.root.resolve()
+    if not root.is_dir():
+        print(f"pipesec watch: каталог не найден: {args.root}", file=sys.stderr)
+        return 2
+    try:
+        custom_rules = load_rule_files(args.rules_files)
+    except RuleFileError as e:
+        print(f"pipesec watch: {e}", file=sys.stderr)
+        return 2
+
+    engine = SecretDetectionEngine(
+        patterns_path=args.patterns_path,
+        entropy_detector=EntropyDetector() if args.entropy else None,
+        decoder=EncodedSecretDecoder() if args.decode else None,
+    )
+    # Compile everything now so the first save is as fast as the rest.
+    engine.warm()
+    analyzer = StaticGithubActionsAnalyzer(
+        engine,
+        enabled_rules={r.strip() for r in args.enable_rules if r.strip()} or None,
+        disabled_rules={r.strip() for r in args.disable_rules if r.strip()} or None,
+        custom_rules=custom_rules,
+    )
+    session = WatchSession(root, analyzer)
+
+    watcher = open_watcher(
+        root, poll=args.poll, interval=args.poll_interval_ms / 1000.0
+    )
+    try:
+        started = time.perf_counter()
+        initial = session.scan_all()
+        total = sum(len(d.added) for d in initial)
+        mode = "inotify" if isinstance(watcher, InotifyWatcher) else "опрос"
+        print(
+            f"👀 Отслеживание {root / '.github'} ({mode}): workflow {len(session.findings)}, "
+            f"находок {total} ({(time.perf_counter() - started) * 1000:.1f} мс). "
+            "Ctrl+C — выход.",
+            flush=True,
+        )
+        if initial:
+            _report(root, initial, time.perf_counter() - started)
+
+        run(
+            session,
+            watcher,
+            debounce=args.debounce_ms / 1000.0,
+            report=lambda diffs, elapsed: _report(root, diffs, elapsed),
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
@@ -0,0 +1,462 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import yaml  # type: ignore[import-untyped]
+
+from static.models import Finding, FindingKind, Severity
+from static.pattern_set import extract_anchors
+from static.rules import default_workflow_rules
+from static.rules.base import Feature, WorkflowRule, workflow_triggers
+from static.rules.utils import get_step_name, iter_jobs, iter_steps
+from static.secrets import SecretDetectionEngine
+
+
+FORMAT_VERSION = 1
+DEFAULT_CATEGORY = "Custom Rule"
+
+SELECTORS = ("uses", "run", "with", "env", "trigger")
+_KEYED = ("with", "env")
+_STEP_SELECTORS = ("uses", "run", "with")
+
+# Template names available per scope in addition to named groups of the
+# rule's positive conditions.
+_SCOPE_PARAMS = {
+    "workflow": {"key", "value"},
+    "env": {"key", "value"},
+    "step": {"job", "step", "key", "value"},
+}
+
+
+class RuleFileError(ValueError):
+    pass
+
+
+class _Predicate:
+    __slots__ = ("index", "regex", "anchors", "ignore_case", "compiled")
+
+    def __init__(self, index: int, regex: str):
+        self.index = index
+        self.regex = regex
+        self.compiled = re.compile(regex)
+        # Literals every match contains; empty means always a candidate.
+        self.anchors, self.ignore_case = extract_anchors(regex)
+
+    def may_match(self, value: str, folded: str) -> bool:
+        if not self.anchors:
+            return True
+        haystack = folded if self.ignore_case else value
+        return any(a in haystack for a in self.anchors)
+
+
+@dataclass(frozen=True)
+class Condition:
+    select: str
+    key: str | None
+    predicate: _Predicate
+    negate: bool = False
+    absent: bool = False
+
+    @property
+    def field(self) -> tuple[str, str | None]:
+        return (self.select, self.key)
+
+
+@dataclass(frozen=True)
+class CustomRule:
+    rule_id: str
+    source: str
+    kind: FindingKind
+    conditions: tuple[Condition, ...]
+    scope: str
+    # Supplies {key}, {value} and evidence: the first positive condition, else
+    # the first negated one (whose field value is reported). None when every
+    # condition is `absent`.
+    primary: Condition | None
+
+    @property
+    def positive(self) -> tuple[Condition, ...]:
+        return tuple(c for c in self.conditions if not c.negate and not c.absent)
+
+    def fqn(self) -> str:
+        return f"{self.source}#{self.rule_id}"
+
+    def severities(self) -> tuple[Severity, ...]:
+        return (self.kind.severity,)
+
+
+def _predicate_regex(spec: dict[str, Any], where: str) -> str | None:
+    given = [k for k in ("regex", "contains", "equals") if k in spec]
+    if len(given) > 1:
+        raise RuleFileError(f"{where}: укажите только одно из regex/contains/equals")
+    if not given:
+        return None
+    value = spec[given[0]]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str):
+        raise RuleFileError(f"{where}: {given[0]} должен быть строкой")
+    flags = "(?i)" if spec.get("ignore_case") else ""
+    if given[0] == "regex":
+        return flags + value
+    if given[0] == "contains":
+        return flags + re.escape(value)
+    return flags + r"\A" + re.escape(value) + r"\Z"
+
+
+def _parse_condition(spec: Any, index: int, where: str) -> Condition:
+    if not isinstance(spec, dict):
+        raise RuleFileError(f"{where}: условие должно быть объектом")
+    unknown = set(spec) - {
+        "select", "key", "regex", "contains", "equals", "ignore_case", "not", "absent"
+    }
+    if unknown:
+        raise RuleFileError(f"{where}: неизвестные поля {', '.join(sorted(unknown))}")
+    select = spec.get("select")
+    if select not in SELECTORS:
+        raise RuleFileError(f"{where}: select должен быть одним из {', '.join(SELECTORS)}")
+    key = spec.get("key")
+    if key is not None:
+        if select not in _KEYED:
+            raise RuleFileError(f"{where}: key допустим только для with и env")
+        if not isinstance(key, str) or not key:
+            raise RuleFileError(f"{where}: key должен быть непустой строкой")
+    negate = bool(spec.get("not", False))
+    absent = bool(spec.get("absent", False))
+    regex = _predicate_regex(spec, where)
+    if absent and (negate or regex is not None):
+        raise RuleFileError(f"{where}: absent нельзя совмещать с not и предикатом")
+    if negate and regex is None:
+        raise RuleFileError(f"{where}: not требует regex, contains или equals")
+    try:
+        predicate = _Predicate(index, regex if regex is not None else "")
+    except re.error as e:
+        raise RuleFileError(f"{where}: некорректный regex: {e}") from None
+    return Condition(select, key, predicate, negate=negate, absent=absent)
+
+
+def _parse_rule(spec: Any, source: str, where: str, next_index: int) -> CustomRule:
+    if not isinstance(spec, dict):
+        raise RuleFileError(f"{where}: правило должно быть объектом")
+    rule_id = spec.get("id")
+    if not isinstance(rule_id, str) or not re.fullmatch(r"[A-Za-z0-9_.-]+", rule_id):
+        raise RuleFileError(f"{where}: id должен состоять из букв, цифр, '_', '.', '-'")
+    where = f"{where} ({rule_id})"
+    try:
+        severity = Severity(str(spec.get("severity", "")).upper())
+    except ValueError:
+        raise RuleFileError(
+            f"{where}: severity должен быть одним из {', '.join(s.value for s in Severity)}"
+        ) from None
+    message = spec.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise RuleFileError(f"{where}: не задан message")
+    category = spec.get("category", DEFAULT_CATEGORY)
+    recommendation = spec.get("recommendation", "")
+    if not isinstance(category, str) or not isinstance(recommendation, str):
+        raise RuleFileError(f"{where}: category и recommendation должны быть строками")
+
+    when = spec.get("when")
+    if not isinstance(when, list) or not when:
+        raise RuleFileError(f"{where}: when должен быть непустым списком условий")
+    conditions = tuple(
+        _parse_condition(c, next_index + i, f"{where}: when[{i}]")
+        for i, c in enumerate(when)
+    )
+
+    selects = {c.select for c in conditions}
+    if selects & set(_STEP_SELECTORS):
+        scope = "step"
+    elif "env" in selects:
+        scope = "env"
+    else:
+        scope = "workflow"
+    if scope == "workflow" and all(c.absent for c in conditions):
+        raise RuleFileError(f"{where}: правило только из absent-условий по trigger")
+
+    positive = [c for c in conditions if not c.negate and not c.absent]
+    negated = [c for c in conditions if c.negate]
+    primary = (positive or negated or [None])[0]
+    try:
+        kind = FindingKind(
+            severity=severity,
+            category=category,
+            description=message,
+            recommendation=recommendation,
+        )
+    except ValueError as e:
+        raise RuleFileError(f"{where}: некорректный шаблон message: {e}") from None
+    available = set(_SCOPE_PARAMS[scope])
+    for c in positive:
+        available |= set(c.predicate.compiled.groupindex)
+    missing = [p for p in kind.params if p not in available]
+    if missing:
+        raise RuleFileError(
+            f"{where}: в message используются недоступные поля: {', '.join(missing)} "
+            f"(доступны: {', '.join(sorted(available))})"
+        )
+    return CustomRule(rule_id, source, kind, conditions, scope, primary)
+
+
+def parse_rules(data: Any, source: str, *, first_index: int = 0) -> list[CustomRule]:
+    if not isinstance(data, dict):
+        raise RuleFileError(f"{source}: ожидается объект с полями version и rules")
+    if data.get("version", FORMAT_VERSION) != FORMAT_VERSION:
+        raise RuleFileError(f"{source}: неподдерживаемая версия {data.get('version')}")
+    items = data.get("rules")
+    if not isinstance(items, list):
+        raise RuleFileError(f"{source}: rules должен быть списком")
+    rules: list[CustomRule] = []
+    index = first_index
+    for i, item in enumerate(items):
+        rule = _parse_rule(item, source, f"{source}: rules[{i}]", index)
+        index += len(rule.conditions)
+        rules.append(rule)
+    return rules
+
+
+def load_rule_files(paths: Iterable[Path]) -> list[CustomRule]:
+    # YAML or JSON (JSON is valid YAML). Rule ids must be unique across files and
+    # must not shadow built-in rules.
+    seen = {r.rule_id for r in default_workflow_rules()}
+    rules: list[CustomRule] = []
+    index = 0
+    for path in paths:
+        try:
+            data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        except OSError as e:
+            raise RuleFileError(f"не удалось прочитать {path}: {e}") from None
+        except (UnicodeDecodeError, yaml.YAMLError) as e:
+            raise RuleFileError(f"не удалось разобрать {path}: {e}") from None
+        loaded = parse_rules(data, str(path), first_index=index)
+        for rule in loaded:
+            if rule.rule_id in seen:
+                raise RuleFileError(f"{path}: правило {rule.rule_id} уже определено")
+            seen.add(rule.rule_id)
+            index += len(rule.conditions)
+        rules.extend(loaded)
+    return rules
+
+
+class _FieldMatcher:
+    # Every predicate applied to one selector (e.g. run, or with.<key>). A single
+    # regex over all anchors rejects most values before any predicate runs.
+    def __init__(self, predicates: Sequence[_Predicate]):
+        self.anchored = [p for p in predicates if p.anchors]
+        self.unanchored = [p for p in predicates if not p.anchors]
+        # Casefolding both sides keeps the prefilter sound for case-sensitive
+        # anchors too; exact anchors are checked per predicate afterwards.
+        anchors = sorted(
+            {a.casefold() for p in self.anchored for a in p.anchors},
+            key=len,
+            reverse=True,
+        )
+        self.prefilter = (
+            re.compile("|".join(re.escape(a) for a in anchors)) if anchors else None
+        )
+
+    def match(
+        self, key: str, value: str, hits: dict[int, tuple[str, str, re.Match[str]]]
+    ) -> None:
+        candidates = self.unanchored
+        if self.prefilter is not None:
+            folded = value.casefold()
+            if self.prefilter.search(folded):
+                candidates = candidates + [
+                    p for p in self.anchored if p.may_match(value, folded)
+                ]
+        for p in candidates:
+            if p.index in hits:
+                continue
+            m = p.compiled.search(value)
+            if m is not None:
+                hits[p.index] = (key, value, m)
+
+
+def _scalar(value: Any) -> str | None:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def _mapping(obj: Any) -> dict[str, str]:
+    if not isinstance(obj, dict):
+        return {}
+    out: dict[str, str] = {}
+    for k, v in obj.items():
+        s = _scalar(v)
+        if isinstance(k, str) and s is not None:
+            out[k] = s
+    return out
+
+
+_Hits = dict[int, tuple[str, str, re.Match[str]]]
+# First (key, value) seen per selector field present in the current unit.
+_Present = dict[tuple[str, str | None], tuple[str, str]]
+
+
+class CustomRuleSet(WorkflowRule):
+    # All custom rules compiled together and evaluated in one traversal of the
+    # workflow; findings carry the rule_id of the custom rule that produced them.
+    rule_id = "custom_rules"
+    requires = Feature.NONE
+
+    def __init__(self, rules: Sequence[CustomRule]):
+        self.custom = list(rules)
+        by_field: dict[tuple[str, str | None], list[_Predicate]] = {}
+        # Rules worth checking once a predicate hits; rules made only of negated
+        # or absent conditions are checked on every unit of their scope.
+        self._watchers: dict[int, list[int]] = {}
+        self._always: dict[str, list[int]] = {"workflow": [], "env": [], "step": []}
+        for r_idx, rule in enumerate(self.custom):
+            positive = False
+            for cond in rule.conditions:
+                if cond.absent:
+                    continue
+                by_field.setdefault(cond.field, []).append(cond.predicate)
+                if not cond.negate:
+                    positive = True
+                    self._watchers.setdefault(cond.predicate.index, []).append(r_idx)
+            if not positive:
+                self._always[rule.scope].append(r_idx)
+        self._fields = {f: _FieldMatcher(preds) for f, preds in by_field.items()}
+        self._scopes = {rule.scope for rule in self.custom}
+        self._has_triggers = ("trigger", None) in self._fields
+
+    def _match_mapping(
+        self, select: str, mapping: dict[str, str], hits: _Hits, present: _Present
+    ) -> None:
+        if not mapping:
+            return
+        present.setdefault((select, None), next(iter(mapping.items())))
+        any_key = self._fields.get((select, None))
+        for k, v in mapping.items():
+            present.setdefault((select, k), (k, v))
+            keyed = self._fields.get((select, k))
+            if keyed is not None:
+                keyed.match(k, v, hits)
+            if any_key is not None:
+                any_key.match(k, v, hits)
+
+    def _holds(self, cond: Condition, hits: _Hits, present: _Present) -> bool:
+        if cond.absent:
+            return cond.field not in present
+        if cond.field not in present:
+            return False
+        return (cond.predicate.index in hits) != cond.negate
+
+    def _report(
+        self,
+        scope: str,
+        hits: _Hits,
+        present: _Present,
+        location: str,
+        params: dict[str, str],
+        out: list[Finding],
+    ) -> None:
+        candidates = set(self._always[scope])
+        for index in hits:
+            candidates.update(self._watchers.get(index, ()))
+        for r_idx in sorted(candidates):
+            rule = self.custom[r_idx]
+            if rule.scope != scope:
+                continue
+            if not all(self._holds(c, hits, present) for c in rule.conditions):
+                continue
+            values = dict(params, key="", value="")
+            evidence = ""
+            for cond in reversed(rule.positive):
+                _, _, m = hits[cond.predicate.index]
+                values.update({k: v or "" for k, v in m.groupdict().items()})
+            primary = rule.primary
+            if primary is not None and not primary.negate:
+                key, value, m = hits[primary.predicate.index]
+                values.update(key=key, value=value)
+                evidence = m.group(0) or value
+            elif primary is not None:
+                key, value = present[primary.field]
+                values.update(key=key, value=value)
+                evidence = value
+            out.append(
+                rule.kind.at(
+                    location, evidence=evidence, rule_id=rule.rule_id, **values
+                )
+            )
+
+    def evaluate(
+        self,
+        workflow: dict[str, Any],
+        path: Path,
+        secret_engine: SecretDetectionEngine,
+    ) -> list[Finding]:
+        out: list[Finding] = []
+
+        # Trigger hits are workflow-wide and shared by every scope.
+        base_hits: _Hits = {}
+        base_present: _Present = {}
+        if self._has_triggers:
+            triggers = sorted(workflow_triggers(workflow))
+            if triggers:
+                base_present[("trigger", None)] = ("", triggers[0])
+            matcher = self._fields[("trigger", None)]
+            for t in triggers:
+                matcher.match("", t, base_hits)
+        if "workflow" in self._scopes:
+            self._report("workflow", base_hits, base_present, f"{path}:on", {}, out)
+
+        check_env = "env" in self._scopes
+        check_steps = "step" in self._scopes
+
+        def env_scope(mapping: dict[str, str], location: str) -> None:
+            if not mapping:
+                return
+            hits = dict(base_hits)
+            present = dict(base_present)
+            self._match_mapping("env", mapping, hits, present)
+            self._report("env", hits, present, location, {}, out)
+
+        workflow_env = _mapping(workflow.get("env"))
+        if check_env:
+            env_scope(workflow_env, f"{path}:env")
+
+        for job_name, job_config in iter_jobs(workflow):
+            job_env = _mapping(job_config.get("env"))
+            if check_env:
+                env_scope(job_env, f"{path}:jobs.{job_name}.env")
+            for idx, step in iter_steps(job_config):
+                step_env = _mapping(step.get("env"))
+                if check_env:
+                    env_scope(step_env, f"{path}:jobs.{job_name}.steps[{idx}].env")
+                if not check_steps:
+                    continue
+
+                hits = dict(base_hits)
+                present = dict(base_present)
+                for select in ("uses", "run"):
+                    value = step.get(select)
+                    if not isinstance(value, str):
+                        continue
+                    present[(select, None)] = ("", value)
+                    matcher = self._fields.get((select, None))
+                    if matcher is not None:
+                        matcher.match("", value, hits)
+                self._match_mapping("with", _mapping(step.get("with")), hits, present)
+                # Steps see the effective environment: workflow, job, then step.
+                effective = {**workflow_env, **job_env, **step_env}
+                self._match_mapping("env", effective, hits, present)
+                self._report(
+                    "step",
+                    hits,
+                    present,
+                    f"{path}:jobs.{job_name}.steps[{idx}]",
+                    {"job": job_name, "step": get_step_name(step, idx)},
+                    out,
+                )
+
+        return out
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import binascii
+import re
+from collections.abc import Callable, Iterator
+
+from static.secrets import SecretMatch
+
+
+ENCODINGS = ("base64", "hex", "url")
+
+DEFAULT_MAX_DEPTH = 2
+
+# Non-text control characters; a decoded span containing any is treated as binary.
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_RUN_CHARS = r"A-Za-z0-9+/_\-"
+_URL_UNRESERVED = r"A-Za-z0-9._~+\-"
+_ESCAPE_RE = re.compile(r"%([0-9A-Fa-f]{2})")
+
+
+class _Layer:
+    # One decoded span of the enclosing text: [start, end) in that text, the
+    # decoded string, and a map from decoded offsets back to enclosing ones.
+    __slots__ = ("encoding", "start", "end", "encoded", "text", "_byte_pos")
+
+    def __init__(self, encoding: str, start: int, end: int, encoded: str, text: str):
+        self.encoding = encoding
+        self.start = start
+        self.end = end
+        self.encoded = encoded
+        self.text = text
+        self._byte_pos: list[int] | None = None
+
+    def outer(self, index: int, *, end: bool) -> int:
+        # Spans are widened to whole encoding units so redaction never leaves a
+        # decodable fragment of the secret behind.
+        text = self.text
+        b = index if text.isascii() else len(text[:index].encode("utf-8"))
+        n = len(self.encoded)
+        if self.encoding == "hex":
+            pos = 2 * b
+        elif self.encoding == "base64":
+            pos = -(-b // 3) * 4 if end else b // 3 * 4
+        else:
+            positions = self._url_positions()
+            pos = positions[b] if b < len(positions) else n
+        return self.start + min(pos, n)
+
+    def _url_positions(self) -> list[int]:
+        if self._byte_pos is None:
+            positions: list[int] = []
+            encoded = self.encoded
+            i = 0
+            while i < len(encoded):
+                positions.append(i)
+                if encoded[i] == "%" and _ESCAPE_RE.match(encoded, i):
+                    i += 3
+                else:
+                    i += 1
+            self._byte_pos = positions
+        return self._byte_pos
+
+
+class EncodedSecretDecoder:
+    def __init__(
+        self,
+        *,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        min_length: int = 20,
+        max_length: int = 64 * 1024,
+        encodings: tuple[str, ...] = ENCODINGS,
+    ):
+        unknown = set(encodings) - set(ENCODINGS)
+        if unknown:
+            raise ValueError(f"неизвестные кодировки: {', '.join(sorted(unknown))}")
+        self.max_depth = max(1, max_depth)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.encodings = encodings
+        self._base64 = "base64" in encodings
+        self._hex = "hex" in encodings
+        self._url = "url" in encodings
+        # Decoded text starts with ASCII (JSON, "user:token", key=value), so the
+        # first 8 encoded bytes are checked right in the regex: each hex byte
+        # starts with 2-7 and each base64 quantum with A-Za-f. Hashes, paths and
+        # identifiers are then rejected without leaving C.
+        rest = max(1, min_length - 16)
+        alternatives: list[str] = []
+        if self._hex:
+            alternatives.append(
+                r"(?P<hex>(?:[2-7][0-9a-fA-F]){8}(?:[0-9a-fA-F]{2}){%d,})" % -(-rest // 2)
+            )
+        if self._base64:
+            alternatives.append(
+                r"(?P<base64>(?:[A-Za-f][%s]{3}){4}[%s]{%d,}={0,2})"
+                % (_RUN_CHARS, _RUN_CHARS, rest)
+            )
+        self._run_re = (
+            re.compile(
+                r"(?<![%s])(?:%s)(?![%s=])"
+                % (_RUN_CHARS, "|".join(alternatives), _RUN_CHARS)
+            )
+            if alternatives
+            else None
+        )
+        self._url_re = re.compile(
+            r"[%s]*(?:%%[0-9A-Fa-f]{2}[%s]*)+" % (_URL_UNRESERVED, _URL_UNRESERVED)
+        )
+
+    def detect(
+        self, text: str, detect: Callable[[str], list[SecretMatch]]
+    ) -> list[SecretMatch]:
+        # `detect` is the plain pattern scan, re-run on every decoded span; its
+        # matches are reported at the encoded span, with the chain of encodings
+        # to peel off (outermost first).
+        if not (self._url and "%" in text) and (
+            self._run_re is None or self._run_re.search(text) is None
+        ):
+            return []
+        return self._detect(text, detect, 1)
+
+    def _detect(
+        self, text: str, detect: Callable[[str], list[SecretMatch]], depth: int
+    ) -> list[SecretMatch]:
+        out: list[SecretMatch] = []
+        for layer in self._layers(text):
+            matches = detect(layer.text)
+            if depth < self.max_depth:
+                matches.extend(self._detect(layer.text, detect, depth + 1))
+            for m in matches:
+                out.append(
+                    SecretMatch(
+                        secret_type=m.secret_type,
+                        value=m.value,
+                        start=layer.outer(m.start, end=False),
+                        end=layer.outer(m.end, end=True),
+                        encoding=(layer.encoding, *m.encoding),
+                    )
+                )
+        return out
+
+    def _layers(self, text: str) -> Iterator[_Layer]:
+        # Candidates are cheap charset runs; only those are decoded, and only
+        # spans that decode to readable text are scanned further. Base64/hex
+        # inside a URL-encoded run is left to the next level, so the reported
+        # chain follows the actual nesting.
+        url_spans: list[tuple[int, int]] = []
+        if self._url and "%" in text:
+            for m in self._url_re.finditer(text):
+                run = m.group(0)
+                if not (self.min_length <= len(run) <= self.max_length):
+                    continue
+                data = _ESCAPE_RE.sub(lambda e: chr(int(e.group(1), 16)), run)
+                decoded = _as_text(data.encode("latin-1"))
+                if decoded is not None:
+                    url_spans.append((m.start(), m.end()))
+                    yield _Layer("url", m.start(), m.end(), run, decoded)
+        if self._run_re is not None:
+            for m in self._run_re.finditer(text):
+                encoding = m.lastgroup or "base64"
+                run = m.group(0)
+                if len(run) > self.max_length:
+                    continue
+                if encoding == "hex":
+                    data = bytes.fromhex(run)
+                else:
+                    data = _b64decode(run)
+                decoded = _as_text(data)
+                if decoded is None:
+                    continue
+                start, end = m.span()
+                if url_spans and any(s < end and start < e for s, e in url_spans):
+                    continue
+                yield _Layer(encoding, start, end, run, decoded)
+
+
+def _b64decode(run: str) -> bytes | None:
+    body = run.rstrip("=")
+    if len(body) % 4 == 1:
+        return None
+    if "-" in body or "_" in body:
+        body = body.replace("-", "+").replace("_", "/")
+    try:
+        return binascii.a2b_base64(body + "=" * (-len(body) % 4), strict_mode=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _as_text(data: bytes | None) -> str | None:
+    if not data:
+        return None
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if _CONTROL_RE.search(text):
+        return None
+    return text
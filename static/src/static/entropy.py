@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import Any
+
+from static.secrets import SecretMatch
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+
+# Bits per character above which a token of the given charset is reported.
+DEFAULT_THRESHOLDS: dict[str, float] = {
+    "hex": 3.0,
+    "base64": 4.5,
+    "alnum": 4.0,
+}
+
+# Minimum number of character classes (lower, upper, digit, symbol) a token of the
+# charset must mix; filters out long identifiers and words.
+DEFAULT_MIN_CLASSES: dict[str, int] = {
+    "hex": 2,
+    "base64": 3,
+    "alnum": 3,
+}
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9+/_\-]{16,}={0,2}")
+
+_CLASS_LOWER = 1
+_CLASS_UPPER = 2
+_CLASS_DIGIT = 4
+_CLASS_SYMBOL = 8
+
+# Pinned refs and content digests (`uses: x@<sha>`, `image@sha256:<hex>`) are
+# high-entropy hex by design; tokens right after these markers are not secrets.
+_DIGEST_MARKERS = ("@", "sha1:", "sha256:", "sha512:")
+
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+_BASE64_ONLY = frozenset("+/=")
+
+
+def _char_class(ch: str) -> int:
+    if "a" <= ch <= "z":
+        return _CLASS_LOWER
+    if "A" <= ch <= "Z":
+        return _CLASS_UPPER
+    if "0" <= ch <= "9":
+        return _CLASS_DIGIT
+    return _CLASS_SYMBOL
+
+
+def _build_tables() -> tuple[Any, Any, Any]:
+    if np is None:
+        return None, None, None
+    classes = np.zeros(128, dtype=np.uint8)
+    is_hex = np.zeros(128, dtype=np.uint8)
+    is_b64 = np.zeros(128, dtype=np.uint8)
+    for code in range(128):
+        ch = chr(code)
+        classes[code] = _char_class(ch)
+        is_hex[code] = ch in _HEX_CHARS
+        is_b64[code] = ch in _BASE64_ONLY
+    return classes, is_hex, is_b64
+
+
+_NP_CLASSES, _NP_IS_HEX, _NP_IS_B64 = _build_tables()
+
+
+class EntropyDetector:
+    def __init__(
+        self,
+        *,
+        thresholds: dict[str, float] | None = None,
+        min_classes: dict[str, int] | None = None,
+        min_length: int = 20,
+        max_length: int = 256,
+        batch_size: int = 4096,
+        use_numpy: bool | None = None,
+    ):
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.min_classes = dict(DEFAULT_MIN_CLASSES)
+        if min_classes:
+            self.min_classes.update(min_classes)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.use_numpy = (np is not None) if use_numpy is None else (
+            use_numpy and np is not None
+        )
+
+    @staticmethod
+    def secret_type(charset: str) -> str:
+        return f"High Entropy String ({charset})"
+
+    def detect(self, text: str) -> list[SecretMatch]:
+        out: list[SecretMatch] = []
+        batch: list[tuple[int, int, str]] = []
+        for m in _TOKEN_RE.finditer(text):
+            token = m.group(0)
+            if not (self.min_length <= len(token) <= self.max_length):
+                continue
+            if any(text.endswith(d, 0, m.start()) for d in _DIGEST_MARKERS):
+                continue
+            batch.append((m.start(), m.end(), token))
+            if len(batch) >= self.batch_size:
+                out.extend(self._score_batch(batch))
+                batch = []
+        if batch:
+            out.extend(self._score_batch(batch))
+        return out
+
+    def _score_batch(self, batch: list[tuple[int, int, str]]) -> list[SecretMatch]:
+        tokens = [t for _, _, t in batch]
+        if self.use_numpy:
+            keep = self._select_numpy(tokens)
+        else:
+            keep = []
+            for i, t in enumerate(tokens):
+                entropy, classes, charset = self._stats_python(t)
+                if entropy >= self.thresholds.get(
+                    charset, math.inf
+                ) and classes >= self.min_classes.get(charset, 0):
+                    keep.append((i, charset))
+
+        out: list[SecretMatch] = []
+        for i, charset in keep:
+            start, end, token = batch[i]
+            out.append(
+                SecretMatch(
+                    secret_type=self.secret_type(charset),
+                    value=token,
+                    start=start,
+                    end=end,
+                )
+            )
+        return out
+
+    @staticmethod
+    def _charset(all_hex: bool, has_b64: bool) -> str:
+        if all_hex:
+            return "hex"
+        if has_b64:
+            return "base64"
+        return "alnum"
+
+    @classmethod
+    def _stats_python(cls, token: str) -> tuple[float, int, str]:
+        n = len(token)
+        counts = Counter(token)
+        entropy = -sum(c / n * math.log2(c / n) for c in counts.values())
+        mask = 0
+        for ch in counts:
+            mask |= _char_class(ch)
+        charset = cls._charset(
+            counts.keys() <= _HEX_CHARS, not _BASE64_ONLY.isdisjoint(counts)
+        )
+        return entropy, bin(mask).count("1"), charset
+
+    def _select_numpy(self, tokens: list[str]) -> list[tuple[int, str]]:
+        assert np is not None
+        n = len(tokens)
+        # Tokens come from an ASCII-only regex, so every char is a single byte < 128.
+        lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=n)
+        data = np.frombuffer("".join(tokens).encode("ascii"), dtype=np.uint8)
+        offsets = np.zeros(n, dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+        seg = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+        counts = np.bincount(seg * 128 + data, minlength=n * 128).reshape(n, 128)
+        p = counts / lengths[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logs = np.where(p > 0, np.log2(p), 0.0)
+        entropy = -(p * logs).sum(axis=1)
+
+        masks = np.bitwise_or.reduceat(_NP_CLASSES[data], offsets)
+        n_classes = (
+            (masks & _CLASS_LOWER > 0).astype(np.int64)
+            + (masks & _CLASS_UPPER > 0)
+            + (masks & _CLASS_DIGIT > 0)
+            + (masks & _CLASS_SYMBOL > 0)
+        )
+        all_hex = np.minimum.reduceat(_NP_IS_HEX[data], offsets).astype(bool)
+        has_b64 = np.maximum.reduceat(_NP_IS_B64[data], offsets).astype(bool)
+
+        # 0 = hex, 1 = base64, 2 = alnum; same precedence as _charset().
+        codes = np.where(all_hex, 0, np.where(has_b64, 1, 2))
+        names = ("hex", "base64", "alnum")
+        thresholds = np.array([self.thresholds.get(c, math.inf) for c in names])
+        min_classes = np.array([self.min_classes.get(c, 0) for c in names])
+        selected = np.flatnonzero(
+            (entropy >= thresholds[codes]) & (n_classes >= min_classes[codes])
+        )
+        return [(int(i), names[codes[i]]) for i in selected]
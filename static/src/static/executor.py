@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from static.models import Finding
+from static.rules.base import WorkflowRule
+from static.secrets import SecretDetectionEngine
+
+
+BACKENDS = ("auto", "thread", "process")
+
+# State handed to forked workers by inheritance instead of pickling the parsed
+# workflow for every task; only set while a process pool is alive.
+_ForkState = tuple[
+    Sequence[WorkflowRule], dict[str, Any], Path, SecretDetectionEngine
+]
+_FORK_STATE: _ForkState | None = None
+# Same for map_documents: the per-document callable and the engine it uses.
+_FORK_ANALYZE: tuple[Callable[[Any], list[Finding]], SecretDetectionEngine] | None = None
+
+T = TypeVar("T")
+
+
+def gil_disabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check is not None and not check()
+
+
+def resolve_jobs(jobs: int) -> int:
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def _pick_backend(backend: str) -> str:
+    if backend != "auto":
+        return backend
+    # Rules are CPU-bound pure Python: threads only scale without the GIL
+    # (3.13t free-threaded builds); otherwise forked processes do.
+    if gil_disabled():
+        return "thread"
+    return "process" if "fork" in multiprocessing.get_all_start_methods() else "thread"
+
+
+def _budget_delta(engine: SecretDetectionEngine, before: dict[str, int]) -> dict[str, int]:
+    # Budget skips counted in a worker would otherwise be lost with it.
+    return {
+        name: count - before.get(name, 0)
+        for name, count in engine.budget_skips.items()
+        if count != before.get(name, 0)
+    }
+
+
+def _merge_budget(engine: SecretDetectionEngine, delta: dict[str, int]) -> None:
+    for name, count in delta.items():
+        engine.budget_skips[name] = engine.budget_skips.get(name, 0) + count
+
+
+def _evaluate_forked(index: int) -> tuple[list[Finding], dict[str, int]]:
+    assert _FORK_STATE is not None
+    rules, workflow, path, engine = _FORK_STATE
+    before = dict(engine.budget_skips)
+    findings = rules[index].evaluate(workflow, path, engine)
+    return findings, _budget_delta(engine, before)
+
+
+def _analyze_forked(item: Any) -> tuple[list[Finding], dict[str, int]]:
+    assert _FORK_ANALYZE is not None
+    analyze, engine = _FORK_ANALYZE
+    before = dict(engine.budget_skips)
+    findings = analyze(item)
+    return findings, _budget_delta(engine, before)
+
+
+def run_rules(
+    rules: Sequence[WorkflowRule],
+    workflow: dict[str, Any],
+    path: Path,
+    secret_engine: SecretDetectionEngine,
+    *,
+    jobs: int = 1,
+    backend: str = "auto",
+) -> list[list[Finding]]:
+    # Returns findings per rule, in the order of `rules` regardless of which
+    # rule finishes first.
+    jobs = min(resolve_jobs(jobs), len(rules))
+    if jobs <= 1:
+        return [r.evaluate(workflow, path, secret_engine) for r in rules]
+
+    if _pick_backend(backend) == "thread":
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(r.evaluate, workflow, path, secret_engine) for r in rules
+            ]
+            return [f.result() for f in futures]
+
+    global _FORK_STATE
+    # Compile every pattern once in the parent so workers inherit them.
+    secret_engine.warm()
+    _FORK_STATE = (rules, workflow, path, secret_engine)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            futures = [pool.submit(_evaluate_forked, i) for i in range(len(rules))]
+            results = [f.result() for f in futures]
+    finally:
+        _FORK_STATE = None
+
+    out: list[list[Finding]] = []
+    for findings, delta in results:
+        _merge_budget(secret_engine, delta)
+        out.append(findings)
+    return out
+
+
+def _bounded_map(
+    pool: Executor, fn: Callable[[T], Any], items: Iterable[T], window: int
+) -> Iterator[Any]:
+    # Ordered map that keeps at most `window` items in flight, so a long (or
+    # endless) input stream is not materialized up front.
+    pending: deque[Future[Any]] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def map_documents(
+    analyze: Callable[[T], list[Finding]],
+    items: Iterable[T],
+    secret_engine: SecretDetectionEngine,
+    *,
+    jobs: int = 1,
+    backend: str = "auto",
+) -> Iterator[list[Finding]]:
+    # Findings per document, in input order. Parallelism is across documents
+    # with one pool for the whole stream; `analyze` itself should run its rules
+    # sequentially.
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1:
+        for item in items:
+            yield analyze(item)
+        return
+
+    window = jobs * 4
+    if _pick_backend(backend) == "thread":
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            yield from _bounded_map(pool, analyze, items, window)
+        return
+
+    global _FORK_ANALYZE
+    secret_engine.warm()
+    _FORK_ANALYZE = (analyze, secret_engine)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            for findings, delta in _bounded_map(pool, _analyze_forked, items, window):
+                _merge_budget(secret_engine, delta)
+                yield findings
+    finally:
+        _FORK_ANALYZE = None
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+from static.models import Finding
+from static.secrets import SecretMatch
+
+
+FINGERPRINT_KEY_ENV = "PIPESEC_FINGERPRINT_KEY"
+_DEFAULT_KEY = b"pipesec-fingerprint-v1"
+
+# Distinct secrets tracked at once; the least recently seen one is flushed when
+# the limit is hit, so memory stays bounded on arbitrarily long streams.
+DEFAULT_MAX_TRACKED = 100_000
+
+
+def fingerprint_key() -> bytes:
+    env = os.environ.get(FINGERPRINT_KEY_ENV)
+    return env.encode("utf-8") if env else _DEFAULT_KEY
+
+
+def fingerprint_secret(value: str, *, key: bytes | None = None) -> str:
+    # Keyed hash, so reports can be shared without exposing a guessable digest of
+    # the secret itself.
+    k = key if key is not None else fingerprint_key()
+    return hmac.new(k, value.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+_LINE_SUFFIX_RE = re.compile(r":line \d+$")
+
+
+def stable_location(location: str) -> str:
+    # Line numbers shift with unrelated edits; drop them from identity keys.
+    return _LINE_SUFFIX_RE.sub("", location)
+
+
+def finding_fingerprint(finding: Finding) -> str:
+    if finding.fingerprint:
+        return finding.fingerprint
+    return location_fingerprint(
+        finding.rule_id or finding.category, finding.location, finding.evidence
+    )
+
+
+def location_fingerprint(rule: str, location: str, evidence: str) -> str:
+    # Kept in sync with FindingFingerprint in the dynamic module.
+    h = hashlib.sha256()
+    for part in (rule, stable_location(location), evidence):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:32]
+
+
+def collapse_overlapping(
+    matches: list[SecretMatch], rank: Callable[[str], int]
+) -> list[SecretMatch]:
+    # Overlapping matches (e.g. "Generic Secret" around a Stripe key) describe one
+    # secret: keep the most specific pattern (as redaction does), ties broken by
+    # the narrowest span. Only that match's value is fingerprinted.
+    positioned = [m for m in matches if m.start >= 0]
+    out = [m for m in matches if m.start < 0]
+    if not positioned:
+        return out
+
+    positioned.sort(key=lambda m: (m.start, -m.end))
+    group: list[SecretMatch] = [positioned[0]]
+    group_end = positioned[0].end
+    for m in positioned[1:]:
+        if m.start < group_end:
+            group.append(m)
+            group_end = max(group_end, m.end)
+            continue
+        out.append(_most_specific(group, rank))
+        group = [m]
+        group_end = m.end
+    out.append(_most_specific(group, rank))
+    return out
+
+
+def _most_specific(
+    group: list[SecretMatch], rank: Callable[[str], int]
+) -> SecretMatch:
+    return min(group, key=lambda m: (rank(m.secret_type), m.end - m.start))
+
+
+class SecretOccurrences:
+    __slots__ = (
+        "fingerprint",
+        "secret_type",
+        "type_rank",
+        "encodings",
+        "evidence",
+        "count",
+        "first_line",
+        "last_line",
+        "end_line",
+    )
+
+    def __init__(
+        self,
+        fingerprint: str,
+        secret_type: str,
+        type_rank: int,
+        evidence: str,
+        line: int,
+        encoding: tuple[str, ...] = (),
+        end_line: int | None = None,
+    ):
+        self.fingerprint = fingerprint
+        self.secret_type = secret_type
+        self.type_rank = type_rank
+        # Every encoding chain the secret was seen under, in first-seen order.
+        self.encodings = [encoding]
+        self.evidence = evidence
+        self.count = 1
+        self.first_line = line
+        # Where the first occurrence ends; past first_line for multi-line secrets.
+        self.end_line = line if end_line is None else end_line
+        # Where the last occurrence ends.
+        self.last_line = self.end_line
+
+    @property
+    def label(self) -> str:
+        if self.encodings == [()]:
+            return self.secret_type
+        chains = ", ".join(" → ".join(c) or "без кодировки" for c in self.encodings)
+        return f"{self.secret_type} (кодировка: {chains})"
+
+
+class SecretDeduplicator:
+    def __init__(
+        self,
+        rank: Callable[[str], int],
+        *,
+        max_tracked: int = DEFAULT_MAX_TRACKED,
+        key: bytes | None = None,
+    ):
+        self._rank = rank
+        self._max_tracked = max_tracked
+        self._key = key if key is not None else fingerprint_key()
+        self._tracked: OrderedDict[str, SecretOccurrences] = OrderedDict()
+        self._flushed: list[SecretOccurrences] = []
+
+    def add(
+        self, match: SecretMatch, line: int = 0, end_line: int | None = None
+    ) -> None:
+        fp = fingerprint_secret(match.value, key=self._key)
+        rank = self._rank(match.secret_type)
+        occ = self._tracked.get(fp)
+        if occ is not None:
+            occ.count += 1
+            occ.last_line = line if end_line is None else end_line
+            if rank < occ.type_rank:
+                occ.secret_type = match.secret_type
+                occ.type_rank = rank
+            if match.encoding not in occ.encodings:
+                occ.encodings.append(match.encoding)
+            self._tracked.move_to_end(fp)
+            return
+
+        self._tracked[fp] = SecretOccurrences(
+            fp,
+            match.secret_type,
+            rank,
+            _evidence(match.value),
+            line,
+            match.encoding,
+            end_line,
+        )
+        if len(self._tracked) > self._max_tracked:
+            _, evicted = self._tracked.popitem(last=False)
+            self._flushed.append(evicted)
+
+    def drain_flushed(self) -> list[SecretOccurrences]:
+        out, self._flushed = self._flushed, []
+        return out
+
+    def finish(self) -> Iterator[SecretOccurrences]:
+        yield from self.drain_flushed()
+        items = sorted(self._tracked.values(), key=lambda o: o.first_line)
+        self._tracked.clear()
+        yield from items
+
+
+def _evidence(value: str) -> str:
+    return (value[:20] + "...") if len(value) > 20 else value
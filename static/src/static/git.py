@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import IO
+
+
+WORKFLOWS_DIR = ".github/workflows"
+
+_YAML_SUFFIXES = (".yml", ".yaml")
+# Gitlinks (submodules) and symlinks have no workflow content of their own.
+SKIP_MODES = ("160000", "120000")
+NULL_OID = "0" * 40
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def git(root: Path, *args: str) -> bytes:
+    try:
+        proc = subprocess.run(
+            ["git", *args], cwd=root, capture_output=True, check=False
+        )
+    except OSError as e:
+        raise GitError(f"не удалось запустить git: {e}") from None
+    if proc.returncode != 0:
+        msg = proc.stderr.decode("utf-8", "replace").strip()
+        raise GitError(f"git {args[0]}: {msg or f'код {proc.returncode}'}")
+    return proc.stdout
+
+
+def repo_root(cwd: Path) -> Path:
+    return Path(git(cwd, "rev-parse", "--show-toplevel").decode().strip())
+
+
+def is_workflow_path(path: str) -> bool:
+    parent, _, name = path.rpartition("/")
+    return parent == WORKFLOWS_DIR and name.endswith(_YAML_SUFFIXES)
+
+
+class CatFile:
+    # One long-lived `git cat-file --batch` serving every blob request.
+    def __init__(self, root: Path):
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise GitError(f"не удалось запустить git: {e}") from None
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        self._in: IO[bytes] = self._proc.stdin
+        self._out: IO[bytes] = self._proc.stdout
+
+    def __enter__(self) -> CatFile:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def read(self, object_id: str) -> bytes:
+        self._in.write(object_id.encode() + b"\n")
+        self._in.flush()
+        header = self._out.readline().split()
+        if len(header) != 3:
+            raise GitError(f"объект не найден: {object_id}")
+        size = int(header[2])
+        data = self._out.read(size)
+        self._out.read(1)  # trailing LF
+        return data
+
+    def read_many(self, object_ids: Iterable[str]) -> Iterator[tuple[str, bytes]]:
+        # Requests are written from a separate thread so git never stalls on a
+        # full pipe while we are still reading earlier answers.
+        ids = list(object_ids)
+        error: list[BaseException] = []
+
+        def feed() -> None:
+            try:
+                for chunk_start in range(0, len(ids), 512):
+                    chunk = ids[chunk_start : chunk_start + 512]
+                    self._in.write(b"".join(i.encode() + b"\n" for i in chunk))
+                self._in.flush()
+            except BaseException as e:  # broken pipe when git exits early
+                error.append(e)
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        finished = False
+        try:
+            for object_id in ids:
+                header = self._out.readline().split()
+                if len(header) != 3:
+                    raise GitError(f"объект не найден: {object_id}")
+                data = self._out.read(int(header[2]))
+                self._out.read(1)
+                yield object_id, data
+            finished = True
+        finally:
+            if not finished:
+                # Abandoned midway: unblock the writer by stopping git.
+                self._proc.kill()
+            writer.join()
+        if error:
+            raise GitError(f"git cat-file: {error[0]}")
+
+    def close(self) -> None:
+        try:
+            self._in.close()
+        except OSError:
+            pass
+        self._out.close()
+        self._proc.wait()
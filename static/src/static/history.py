@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import subprocess
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO
+
+from static.fingerprint import SecretDeduplicator, SecretOccurrences, collapse_overlapping
+from static.git import (
+    NULL_OID,
+    SKIP_MODES,
+    WORKFLOWS_DIR,
+    CatFile,
+    GitError,
+    git,
+    is_workflow_path,
+)
+from static.models import Finding, FindingKind, Severity
+from static.multiline import BlockLine, BlockTracker, SecretBlock
+from static.secrets import SecretDetectionEngine
+
+
+_HISTORY_RECOMMENDATION = (
+    "Ротируйте секрет: удаление из файла не убирает его из истории git, форков и "
+    "клонов. Храните значение в GitHub Secrets; при необходимости перепишите "
+    "историю (git filter-repo)."
+)
+
+SECRET_IN_HISTORY = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Git History",
+    description=(
+        "Секрет типа '{secret_type}' был закоммичен в {commit} ({date}, {author}) "
+        "и позже удалён из workflow, но остаётся в истории git."
+    ),
+    recommendation=_HISTORY_RECOMMENDATION,
+)
+
+SECRET_IN_HISTORY_CURRENT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret in Git History",
+    description=(
+        "Секрет типа '{secret_type}' закоммичен в {commit} ({date}, {author}) "
+        "и всё ещё присутствует в текущих workflow."
+    ),
+    recommendation=_HISTORY_RECOMMENDATION,
+)
+
+# Commit header in `git log --format`; \x01 cannot appear in a raw diff entry.
+_COMMIT_MARK = b"\x01"
+_LOG_FORMAT = "%x01%H %ct %an"
+_READ_SIZE = 1 << 16
+
+
+@dataclass(frozen=True)
+class BlobEvent:
+    # A workflow file version as it first appears in one commit.
+    commit: str
+    timestamp: int
+    author: str
+    path: str
+    blob: str
+
+
+@dataclass
+class HistoryStats:
+    commits: int = 0
+    versions: int = 0
+    blobs: int = 0
+    secrets: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class _Introduced:
+    event: BlobEvent
+    occurrence: SecretOccurrences
+    blobs: set[str] = field(default_factory=set)
+
+
+def _tokens(stream: IO[bytes]) -> Iterator[bytes]:
+    rest = b""
+    while True:
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            break
+        parts = (rest + chunk).split(b"\0")
+        rest = parts.pop()
+        yield from parts
+    if rest:
+        yield rest
+
+
+def iter_blob_events(root: Path, revs: list[str]) -> Iterator[BlobEvent]:
+    # Every added or modified workflow blob in every commit reachable from
+    # `revs`, parents before children. --full-history keeps side branches that
+    # history simplification would drop, and -m diffs merges against each
+    # parent so blobs created while resolving conflicts are seen too.
+    cmd = [
+        "git",
+        "log",
+        *revs,
+        "--date-order",
+        "--reverse",
+        "--full-history",
+        "-m",
+        "--raw",
+        "-z",
+        "--no-abbrev",
+        "--no-renames",
+        f"--format={_LOG_FORMAT}",
+        "--",
+        WORKFLOWS_DIR,
+    ]
+    try:
+        proc = subprocess.Popen(
+            cmd, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise GitError(f"не удалось запустить git: {e}") from None
+    assert proc.stdout is not None and proc.stderr is not None
+
+    commit, timestamp, author = "", 0, ""
+    tokens = _tokens(proc.stdout)
+    try:
+        for token in tokens:
+            token = token.lstrip(b"\n")
+            if token.startswith(_COMMIT_MARK):
+                sha, ts, name = token[1:].decode("utf-8", "replace").split(" ", 2)
+                commit, timestamp, author = sha, int(ts), name
+                continue
+            if not token.startswith(b":"):
+                continue
+            _, new_mode, _, new_sha, _ = token[1:].decode().split()
+            path = next(tokens, b"").decode("utf-8", "surrogateescape")
+            if new_sha == NULL_OID or new_mode in SKIP_MODES:
+                continue
+            if is_workflow_path(path):
+                yield BlobEvent(commit, timestamp, author, path, new_sha)
+    finally:
+        proc.stdout.close()
+        err = proc.stderr.read()
+        proc.stderr.close()
+        if proc.wait() != 0 and err:
+            raise GitError(f"git log: {err.decode('utf-8', 'replace').strip()}")
+
+
+def current_blobs(root: Path) -> set[str]:
+    try:
+        out = git(root, "ls-tree", "-r", "-z", "HEAD", "--", WORKFLOWS_DIR)
+    except GitError:
+        return set()  # no commits yet
+    blobs: set[str] = set()
+    for entry in out.split(b"\0"):
+        meta, _, path = entry.partition(b"\t")
+        parts = meta.split()
+        if len(parts) == 3 and parts[1] == b"blob" and is_workflow_path(path.decode()):
+            blobs.add(parts[2].decode())
+    return blobs
+
+
+class HistoryScanner:
+    def __init__(self, secret_engine: SecretDetectionEngine):
+        self.secret_engine = secret_engine
+        self.stats = HistoryStats()
+
+    def scan_blob(self, data: bytes) -> list[SecretOccurrences]:
+        if b"\0" in data[:8192]:
+            return []
+        engine = self.secret_engine
+        rank = engine.pattern_rank
+        dedup = SecretDeduplicator(rank)
+        blocks: BlockTracker[None] = BlockTracker()
+        text = data.decode("utf-8", "replace")
+
+        def scan_events(events: Iterable[BlockLine[None] | SecretBlock[None]]) -> None:
+            for event in events:
+                if isinstance(event, SecretBlock):
+                    dedup.add(event.match(), event.first_line, event.last_line)
+                    continue
+                matches = engine.detect_in_text(event.text)
+                for secret in collapse_overlapping(matches, rank):
+                    dedup.add(secret, event.line_num)
+
+        for line_num, line in enumerate(text.splitlines(), 1):
+            scan_events(blocks.feed(line_num, line, None))
+        scan_events(blocks.finish())
+        return list(dedup.finish())
+
+    def scan(self, root: Path, revs: list[str] | None = None) -> list[Finding]:
+        started = time.perf_counter()
+        self.secret_engine.warm()
+
+        events: list[BlobEvent] = []
+        order: dict[str, None] = {}
+        commits: set[str] = set()
+        for event in iter_blob_events(root, revs or ["--all"]):
+            events.append(event)
+            commits.add(event.commit)
+            order.setdefault(event.blob)
+        head = current_blobs(root)
+        for blob in head:
+            order.setdefault(blob)
+
+        # Each distinct content is scanned once, however many commits and paths
+        # share it.
+        secrets: dict[str, list[SecretOccurrences]] = {}
+        with CatFile(root) as cat:
+            for blob, data in cat.read_many(order):
+                found = self.scan_blob(data)
+                if found:
+                    secrets[blob] = found
+
+        introduced: dict[str, _Introduced] = {}
+        for event in events:
+            for occ in secrets.get(event.blob, ()):
+                first = introduced.get(occ.fingerprint)
+                if first is None:
+                    first = introduced[occ.fingerprint] = _Introduced(event, occ)
+                first.blobs.add(event.blob)
+        in_head = {occ.fingerprint for blob in head for occ in secrets.get(blob, ())}
+
+        findings = [
+            self._finding(item, item.occurrence.fingerprint in in_head)
+            for item in introduced.values()
+        ]
+        self.stats = HistoryStats(
+            commits=len(commits),
+            versions=len(events),
+            blobs=len(order),
+            secrets=len(findings),
+            seconds=time.perf_counter() - started,
+        )
+        return findings
+
+    @staticmethod
+    def _finding(item: _Introduced, current: bool) -> Finding:
+        event, occ = item.event, item.occurrence
+        kind = SECRET_IN_HISTORY_CURRENT if current else SECRET_IN_HISTORY
+        date = datetime.fromtimestamp(event.timestamp, timezone.utc)
+        return kind.at(
+            f"{event.commit[:12]}:{event.path}:line {occ.first_line}",
+            evidence=occ.evidence,
+            fingerprint=occ.fingerprint,
+            occurrences=len(item.blobs),
+            rule_id="history",
+            secret_type=occ.label,
+            commit=event.commit,
+            date=date.strftime("%Y-%m-%d"),
+            author=event.author,
+        )
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+# Bucket 0 holds latencies under 1 µs, bucket i (i > 0) holds [2^(i-1), 2^i) µs.
+_BUCKETS = 32
+
+
+class LatencyHistogram:
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        i = min(int(seconds * 1e6).bit_length(), _BUCKETS - 1)
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: LatencyHistogram) -> None:
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @staticmethod
+    def bucket_upper_us(i: int) -> int:
+        return 1 << i
+
+    def quantile_us(self, q: float) -> int:
+        # Upper bound of the bucket containing the q-th quantile.
+        if not self.count:
+            return 0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return self.bucket_upper_us(i)
+        return int(self.max * 1e6)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "meanUs": (self.total / self.count * 1e6) if self.count else 0.0,
+            "p50Us": self.quantile_us(0.5),
+            "p99Us": self.quantile_us(0.99),
+            "maxUs": self.max * 1e6,
+            "buckets": {
+                f"<{self.bucket_upper_us(i)}us": n
+                for i, n in enumerate(self.buckets)
+                if n
+            },
+        }
+
+    def render(self) -> str:
+        if not self.count:
+            return "⏱  Задержка на строку: нет данных"
+        lines = [
+            f"⏱  Задержка на строку: строк={self.count}, "
+            f"среднее={self.total / self.count * 1e6:.1f}мкс, "
+            f"p50≤{self.quantile_us(0.5)}мкс, p99≤{self.quantile_us(0.99)}мкс, "
+            f"max={self.max * 1e6:.1f}мкс"
+        ]
+        peak = max(self.buckets)
+        for i, n in enumerate(self.buckets):
+            if not n:
+                continue
+            bar = "#" * max(1, n * 40 // peak)
+            lines.append(f"   <{self.bucket_upper_us(i)}мкс".ljust(16) + f"{n:>10} {bar}")
+        return "\n".join(lines)
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import tempfile
+from collections.abc import Iterator
+from typing import IO, Any
+
+from static.fingerprint import location_fingerprint
+from static.reporting.json_report import SCHEMA_VERSION
+
+
+SEVERITY_ORDER = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+_CHUNK = 64 * 1024
+_SNIFF_LIMIT = 1024 * 1024
+# Per-severity buckets stay in memory up to this size, then spill to disk.
+_SPOOL_MAX = 4 * 1024 * 1024
+# Merge keys of distinct findings kept in memory before they spill to disk.
+_SEEN_MAX = 200_000
+
+_WS = " \t\r\n"
+
+
+class ReportFormatError(ValueError):
+    pass
+
+
+class _JSONStream:
+    # Incremental reader for one JSON document: values are decoded one at a time
+    # with raw_decode, refilling the buffer as needed, so a large `findings`
+    # array is never held in memory at once.
+    def __init__(self, f: IO[str], buf: str = ""):
+        self._f = f
+        self._buf = buf
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ReportFormatError(f"ожидался '{ch}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        decoder = json.JSONDecoder()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ReportFormatError(str(e)) from None
+            # A scalar cut by the buffer edge ("12" read as "1") would decode
+            # too early; make sure something follows it.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _iter_document(stream: _JSONStream) -> Iterator[tuple[str, Any]]:
+    # Yields ("meta", {key: value}) for top-level scalars and ("finding", obj)
+    # for every element of the `findings` array.
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "findings" and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield "finding", stream.value()
+                    if stream.peek() == ",":
+                        stream.expect(",")
+                        continue
+                    stream.expect("]")
+                    break
+        else:
+            yield "meta", {key: stream.value()}
+        if stream.peek() == ",":
+            stream.expect(",")
+            continue
+        stream.expect("}")
+        return
+
+
+def iter_report_findings(f: IO[str]) -> Iterator[dict[str, Any]]:
+    # Accepts a JSON report ({"findings": [...]}) or NDJSON (one finding per line)
+    # from either engine.
+    first = ""
+    while True:
+        # Bounded: a compact JSON report is a single (possibly huge) line.
+        line = f.readline(_SNIFF_LIMIT)
+        if not line:
+            return
+        if line.strip():
+            first = line
+            break
+
+    obj = None
+    if first.endswith("\n") or len(first) < _SNIFF_LIMIT:
+        try:
+            obj = json.loads(first)
+        except json.JSONDecodeError:
+            pass
+
+    if isinstance(obj, dict) and "findings" not in obj and "severity" in obj:
+        yield obj
+        for lineno, line in enumerate(f, 2):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ReportFormatError(f"строка {lineno}: {e}") from None
+            if isinstance(item, dict):
+                yield item
+        return
+
+    for kind, value in _iter_document(_JSONStream(f, first)):
+        if kind == "meta":
+            version = value.get("schemaVersion")
+            if isinstance(version, int) and version > SCHEMA_VERSION:
+                raise ReportFormatError(
+                    f"неподдерживаемая версия схемы {version} (максимум {SCHEMA_VERSION})"
+                )
+        elif isinstance(value, dict):
+            yield value
+
+
+def _fingerprint(finding: dict[str, Any]) -> str:
+    fp = finding.get("fingerprint")
+    if isinstance(fp, str) and fp:
+        return fp
+    return location_fingerprint(
+        str(finding.get("rule_id") or finding.get("category") or ""),
+        str(finding.get("location") or ""),
+        str(finding.get("evidence") or ""),
+    )
+
+
+def _merge_key(finding: dict[str, Any], fp: str) -> str:
+    # Secret fingerprints identify the value, not the finding: the same key
+    # hardcoded in a workflow and leaked in a log are two findings, and so are
+    # copies in different files of a batch scan (`file` is set by pipesec batch).
+    rule = finding.get("rule_id") or finding.get("category") or ""
+    return f"{rule}\0{finding.get('file') or ''}\0{fp}"
+
+
+def _occurrences(value: Any) -> int:
+    return value if isinstance(value, int) and value > 0 else 1
+
+
+# Representative copy of a merge key: (occurrences, sequence number, severity).
+_Copy = tuple[int, int, str]
+
+
+class _SeenKeys:
+    # Merge key -> its representative copy. Keys are stored as 16-byte digests
+    # in a dict up to max_memory entries, then moved to a temporary on-disk
+    # SQLite table whose page cache is bounded, so memory does not grow with
+    # the number of distinct findings.
+    def __init__(self, max_memory: int = _SEEN_MAX):
+        self.max_memory = max_memory
+        self._memory: dict[bytes, _Copy] = {}
+        self._db: sqlite3.Connection | None = None
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def add(self, key: str, copy: _Copy) -> _Copy | None:
+        # Returns the previous representative (None for a new key); copy
+        # replaces it if it has a higher occurrence count.
+        digest = self._digest(key)
+        if self._db is None:
+            old = self._memory.get(digest)
+            if old is None or copy[0] > old[0]:
+                self._memory[digest] = copy
+            if old is None and len(self._memory) > self.max_memory:
+                self._spill()
+            return old
+        row = self._db.execute(
+            "SELECT occ, seq, severity FROM seen WHERE key = ?", (digest,)
+        ).fetchone()
+        if row is None or copy[0] > row[0]:
+            self._db.execute(
+                "INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?)", (digest, *copy)
+            )
+        return None if row is None else (row[0], row[1], row[2])
+
+    def get(self, key: str) -> _Copy:
+        digest = self._digest(key)
+        if self._db is None:
+            return self._memory[digest]
+        row = self._db.execute(
+            "SELECT occ, seq, severity FROM seen WHERE key = ?", (digest,)
+        ).fetchone()
+        return (row[0], row[1], row[2])
+
+    def _spill(self) -> None:
+        # "" opens a private temporary database on disk, deleted on close.
+        db = sqlite3.connect("")
+        db.execute("PRAGMA cache_size = -4096")
+        db.execute(
+            "CREATE TABLE seen (key BLOB PRIMARY KEY, occ INTEGER, seq INTEGER,"
+            " severity TEXT) WITHOUT ROWID"
+        )
+        db.executemany(
+            "INSERT INTO seen VALUES (?, ?, ?, ?)",
+            ((k, *v) for k, v in self._memory.items()),
+        )
+        self._memory = {}
+        self._db = db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class ReportMerger:
+    def __init__(self, *, max_keys_in_memory: int = _SEEN_MAX) -> None:
+        # merge key -> the copy with the highest occurrence count, which is the
+        # one reported: its description matches its count. Engines scanning the
+        # same log see the same occurrences, so counts are not summed.
+        self._seen = _SeenKeys(max_keys_in_memory)
+        self._seq = 0
+        self._buckets = {
+            sev: tempfile.SpooledTemporaryFile(
+                max_size=_SPOOL_MAX, mode="w+", encoding="utf-8"
+            )
+            for sev in SEVERITY_ORDER
+        }
+        self.counts = {sev: 0 for sev in SEVERITY_ORDER}
+        self.duplicates = 0
+        self.skipped = 0
+
+    def add(self, finding: dict[str, Any]) -> None:
+        severity = str(finding.get("severity", "")).upper()
+        if severity not in self._buckets:
+            self.skipped += 1
+            return
+        fp = _fingerprint(finding)
+        key = _merge_key(finding, fp)
+        occurrences = _occurrences(finding.get("occurrences"))
+        seq = self._seq
+        self._seq += 1
+        previous = self._seen.add(key, (occurrences, seq, severity))
+        if previous is not None:
+            self.duplicates += 1
+            if occurrences <= previous[0]:
+                return
+            # The earlier copy stays in its bucket and is skipped on output.
+            self.counts[previous[2]] -= 1
+        finding["fingerprint"] = fp
+        finding["severity"] = severity
+        self._buckets[severity].write(
+            f"{seq}\t{json.dumps(finding, ensure_ascii=False)}\n"
+        )
+        self.counts[severity] += 1
+
+    def add_report(self, f: IO[str]) -> None:
+        for finding in iter_report_findings(f):
+            self.add(finding)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def iter_merged(self) -> Iterator[dict[str, Any]]:
+        # Severity buckets give the ordering; within a bucket input order is kept.
+        for sev in SEVERITY_ORDER:
+            bucket = self._buckets[sev]
+            bucket.seek(0)
+            for line in bucket:
+                seq, _, data = line.partition("\t")
+                finding = json.loads(data)
+                _, chosen, _ = self._seen.get(_merge_key(finding, finding["fingerprint"]))
+                if chosen == int(seq):
+                    yield finding
+
+    def write_json(self, out: IO[str]) -> None:
+        out.write("{\n")
+        out.write(f'  "schemaVersion": {SCHEMA_VERSION},\n')
+        out.write('  "engine": "merge",\n')
+        out.write('  "findings": [')
+        first = True
+        for finding in self.iter_merged():
+            out.write("\n    " if first else ",\n    ")
+            out.write(json.dumps(finding, ensure_ascii=False))
+            first = False
+        out.write("],\n" if first else "\n  ],\n")
+        out.write(f'  "count": {self.count},\n')
+        out.write(f'  "countsBySeverity": {json.dumps(self.counts)},\n')
+        out.write(f'  "duplicates": {self.duplicates}\n')
+        out.write("}\n")
+
+    def write_ndjson(self, out: IO[str]) -> None:
+        for finding in self.iter_merged():
+            out.write(json.dumps(finding, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        for bucket in self._buckets.values():
+            bucket.close()
+        self._seen.close()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from string import Formatter
+from typing import Any
 
 
 class Severity(str, Enum):
@@ -11,11 +13,82 @@ class Severity(str, Enum):
     LOW = "LOW"
 
 
-@dataclass(frozen=True)
-class Finding:
+@dataclass(frozen=True, slots=True)
+class FindingKind:
+    # Static metadata shared by every finding of one kind, defined once per rule.
+    # `description` is a str.format template over named params supplied per
+    # finding; it is rendered only when a reporter reads it.
     severity: Severity
     category: str
     description: str
-    location: str
     recommendation: str
+    params: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        names = (name for _, name, _, _ in Formatter().parse(self.description) if name)
+        object.__setattr__(self, "params", tuple(dict.fromkeys(names)))
+
+    def at(
+        self,
+        location: str,
+        *,
+        evidence: str = "",
+        fingerprint: str = "",
+        occurrences: int = 1,
+        rule_id: str = "",
+        **params: Any,
+    ) -> Finding:
+        return Finding(
+            kind=self,
+            location=location,
+            params=tuple(params[name] for name in self.params),
+            evidence=evidence,
+            fingerprint=fingerprint,
+            occurrences=occurrences,
+            rule_id=rule_id,
+        )
+
+    def render(self, values: tuple[Any, ...]) -> str:
+        if not values:
+            return self.description
+        return self.description.format_map(dict(zip(self.params, values)))
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    kind: FindingKind
+    location: str
+    params: tuple[Any, ...] = ()
     evidence: str = ""
+    fingerprint: str = ""
+    occurrences: int = 1
+    rule_id: str = ""
+
+    @property
+    def severity(self) -> Severity:
+        return self.kind.severity
+
+    @property
+    def category(self) -> str:
+        return self.kind.category
+
+    @property
+    def description(self) -> str:
+        return self.kind.render(self.params)
+
+    @property
+    def recommendation(self) -> str:
+        return self.kind.recommendation
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "severity": self.kind.severity,
+            "category": self.kind.category,
+            "description": self.description,
+            "location": self.location,
+            "recommendation": self.kind.recommendation,
+            "evidence": self.evidence,
+            "fingerprint": self.fingerprint,
+            "occurrences": self.occurrences,
+            "rule_id": self.rule_id,
+        }
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from static.secrets import SecretMatch
+
+
+T = TypeVar("T")
+
+PEM_SECRET_TYPE = "Private Key"
+SERVICE_ACCOUNT_SECRET_TYPE = "GCP Service Account Key"
+
+# Lines held while a block is open; past either limit the block is given up and
+# its lines are scanned as ordinary lines. A 8192-bit RSA key is ~100 lines.
+DEFAULT_MAX_LINES = 128
+DEFAULT_MAX_CHARS = 64 * 1024
+# Longer lines never belong to a block.
+MAX_LINE_CHARS = 4096
+# Body lines are 64 characters (70 for OpenSSH); only the last one is shorter.
+_MIN_BODY_CHARS = 16
+
+_PEM_BEGIN = "-----BEGIN "
+_PEM_BEGIN_RE = re.compile(r"-----BEGIN ((?:[A-Z0-9]+ )*PRIVATE KEY)-----")
+_PEM_BODY_RE = re.compile(r"[A-Za-z0-9+/=]+")
+_SA_MARKER = "service_account"
+_SA_TYPE_RE = re.compile(r'"type"\s*:\s*"service_account"')
+_SA_KEY_RE = re.compile(r'"private_key"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+@dataclass
+class BlockLine(Generic[T]):
+    line_num: int
+    text: str
+    item: T
+    # Part of the line that belongs to the secret, masked on redaction.
+    mask: tuple[int, int] | None = None
+
+
+@dataclass
+class SecretBlock(Generic[T]):
+    secret_type: str
+    # Canonical form of the secret: fingerprints do not depend on line
+    # prefixes, wrapping or the surrounding format.
+    value: str
+    first_line: int
+    last_line: int
+    lines: list[BlockLine[T]] = field(default_factory=list)
+
+    def match(self) -> SecretMatch:
+        return SecretMatch(secret_type=self.secret_type, value=self.value)
+
+    def redacted(self, placeholder: str) -> Iterator[tuple[BlockLine[T], str]]:
+        # The whole block is replaced by one placeholder; line prefixes (e.g.
+        # timestamps) and the line count are kept.
+        first = True
+        for line in self.lines:
+            if line.mask is None:
+                yield line, line.text
+                continue
+            start, end = line.mask
+            yield line, line.text[:start] + (placeholder if first else "") + line.text[end:]
+            first = False
+
+
+def _last_token(text: str) -> tuple[int, str]:
+    stripped = text.rstrip(" \t")
+    start = max(stripped.rfind(" "), stripped.rfind("\t")) + 1
+    return start, stripped[start:]
+
+
+class _PemBlock(Generic[T]):
+    def __init__(self, label: str, column: int):
+        self.label = label
+        self.end_marker = f"-----END {label}-----"
+        # Body lines carry the same prefix (timestamp, indentation) as the BEGIN
+        # line, so their payload starts at the same column.
+        self.column = column
+        self.body: list[str] = []
+        self._short = False
+
+    def add(self, line: BlockLine[T]) -> bool | None:
+        # True: block closed; None: still open; False: not a PEM body line.
+        pos = line.text.find(self.end_marker)
+        if pos >= 0:
+            line.mask = (pos, pos + len(self.end_marker))
+            return True
+        start, token = _last_token(line.text)
+        if not token:
+            return None
+        if self._short:
+            # A short body line must be the last one before END.
+            return False
+        if start == self.column and _PEM_BODY_RE.fullmatch(token):
+            self.body.append(token)
+            self._short = len(token) < _MIN_BODY_CHARS
+            line.mask = (start, start + len(token))
+            return None
+        if ":" in line.text and not self.body:
+            # RFC 1421 headers of encrypted keys (Proc-Type, DEK-Info).
+            return None
+        return False
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.body)
+
+    def value(self) -> str:
+        return f"-----BEGIN {self.label}-----\n{''.join(self.body)}\n{self.end_marker}"
+
+
+class _ServiceAccountBlock(Generic[T]):
+    def __init__(self) -> None:
+        self.key: str | None = None
+
+    def add(self, line: BlockLine[T]) -> bool | None:
+        m = _SA_KEY_RE.search(line.text)
+        if m is not None:
+            self.key = _json_unescape(m.group(1))
+            line.mask = m.span(1)
+        if _last_token(line.text)[1].startswith("}"):
+            return True
+        return None
+
+    @property
+    def ready(self) -> bool:
+        return self.key is not None
+
+    def value(self) -> str:
+        assert self.key is not None
+        return canonical_private_key(self.key)
+
+
+def _json_unescape(raw: str) -> str:
+    try:
+        value = json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+    return value if isinstance(value, str) else raw
+
+
+def canonical_private_key(text: str) -> str:
+    # A PEM key embedded in other text (e.g. a JSON string) in the same form as
+    # a PEM block read from a log, so both get the same fingerprint.
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        m = _PEM_BEGIN_RE.search(line)
+        if m is None:
+            continue
+        pem: _PemBlock[None] = _PemBlock(m.group(1), m.start())
+        for rest in lines[i + 1 :]:
+            done = pem.add(BlockLine(0, rest, None))
+            if done:
+                return pem.value() if pem.ready else text
+            if done is False:
+                break
+        break
+    return text
+
+
+class BlockTracker(Generic[T]):
+    # Streaming state machine for secrets spanning several lines: PEM private
+    # keys and pretty-printed GCP service-account JSON. Lines are fed in order;
+    # while a block may be open they are held back, then either returned as one
+    # SecretBlock (and must not be scanned again) or released as ordinary lines.
+    def __init__(
+        self,
+        *,
+        max_lines: int = DEFAULT_MAX_LINES,
+        max_chars: int = DEFAULT_MAX_CHARS,
+    ):
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self._block: _PemBlock[T] | _ServiceAccountBlock[T] | None = None
+        self._secret_type = ""
+        self._first_line = 0
+        self._held: list[BlockLine[T]] = []
+        self._chars = 0
+        # Last line that opened a JSON object: a service account starts there.
+        self._brace_line = -1
+
+    @property
+    def holding(self) -> bool:
+        return self._block is not None
+
+    def ordinary(self, line_num: int, text: str) -> bool:
+        # Fast path: True when no block is open and the line cannot open one; it
+        # is then scanned as usual without going through feed().
+        if self._block is not None or _PEM_BEGIN in text or _SA_MARKER in text:
+            return False
+        if "{" in text and text.rstrip(" \t").endswith("{"):
+            self._brace_line = line_num
+        return True
+
+    def feed(
+        self, line_num: int, text: str, item: T
+    ) -> Iterator[BlockLine[T] | SecretBlock[T]]:
+        block = self._block
+        if block is not None:
+            line = BlockLine(line_num, text, item)
+            if (
+                len(text) > MAX_LINE_CHARS
+                or len(self._held) >= self.max_lines
+                or self._chars + len(text) > self.max_chars
+            ):
+                done: bool | None = False
+            else:
+                done = block.add(line)
+            if done is None:
+                self._hold(line)
+                return
+            if done:
+                self._hold(line)
+                if block.ready:
+                    yield self._complete(line_num)
+                else:
+                    yield from self.flush()
+                return
+            yield from self.flush()
+        yield from self._start(line_num, text, item)
+
+    def finish(self) -> Iterator[BlockLine[T] | SecretBlock[T]]:
+        # An unterminated service account still has its key; a PEM block without
+        # its END line is not reported as a whole.
+        block = self._block
+        if isinstance(block, _ServiceAccountBlock) and block.ready:
+            yield self._complete(self._held[-1].line_num)
+            return
+        yield from self.flush()
+
+    def flush(self) -> Iterator[BlockLine[T]]:
+        # Gives up the open block; its lines are to be scanned as usual.
+        held = self._held
+        self._reset()
+        for line in held:
+            line.mask = None
+            yield line
+
+    def _start(
+        self, line_num: int, text: str, item: T
+    ) -> Iterator[BlockLine[T] | SecretBlock[T]]:
+        if len(text) <= MAX_LINE_CHARS:
+            if _PEM_BEGIN in text:
+                m = _PEM_BEGIN_RE.search(text)
+                if m is not None and f"-----END {m.group(1)}-----" not in text:
+                    self._open(_PemBlock(m.group(1), m.start()), PEM_SECRET_TYPE, line_num)
+                    self._hold(BlockLine(line_num, text, item, (m.start(), len(text))))
+                    return
+            if (
+                _SA_MARKER in text
+                and _SA_TYPE_RE.search(text) is not None
+                and '"private_key"' not in text
+                and "}" not in text
+            ):
+                first = self._brace_line if self._brace_line == line_num - 1 else line_num
+                self._open(_ServiceAccountBlock(), SERVICE_ACCOUNT_SECRET_TYPE, first)
+                self._hold(BlockLine(line_num, text, item))
+                return
+        if text.rstrip(" \t").endswith("{"):
+            self._brace_line = line_num
+        yield BlockLine(line_num, text, item)
+
+    def _open(
+        self,
+        block: _PemBlock[T] | _ServiceAccountBlock[T],
+        secret_type: str,
+        first_line: int,
+    ) -> None:
+        self._block = block
+        self._secret_type = secret_type
+        self._first_line = first_line
+
+    def _hold(self, line: BlockLine[T]) -> None:
+        self._held.append(line)
+        self._chars += len(line.text)
+
+    def _complete(self, last_line: int) -> SecretBlock[T]:
+        assert self._block is not None
+        result = SecretBlock(
+            secret_type=self._secret_type,
+            value=self._block.value(),
+            first_line=self._first_line,
+            last_line=last_line,
+            lines=self._held,
+        )
+        self._reset()
+        return result
+
+    def _reset(self) -> None:
+        self._block = None
+        self._held = []
+        self._chars = 0
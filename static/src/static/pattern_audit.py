@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import multiprocessing
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    from re import _constants as _sre_constants  # type: ignore[attr-defined]
+    from re import _parser as _sre_parser  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    _sre_constants = None
+    _sre_parser = None
+
+
+# Each adversarial input is timed at lengths growing _GROWTH_FACTOR times from
+# _START_LEN up to _GROWTH_FACTOR * _BASE_LEN. Linear matching grows
+# ~_GROWTH_FACTOR per step, quadratic backtracking ~_GROWTH_FACTOR**2; timing
+# stops at the first significant superlinear step or once a single scan takes
+# _STEP_BUDGET_SECONDS, so a bad pattern costs at most a few seconds.
+_START_LEN = 256
+_BASE_LEN = 16 * 1024
+_GROWTH_FACTOR = 4
+_GROWTH_LIMIT = 8.0
+_MIN_SIGNIFICANT_SECONDS = 0.005
+_STEP_BUDGET_SECONDS = 0.25
+# Hard limit on all adversarial timings of one pattern. Ambiguous patterns the
+# structural check misses (e.g. (a|aa)*c) can backtrack exponentially even on
+# the shortest input; they are timed in a child process that is killed here.
+_DEADLINE_SECONDS = 10.0
+
+NESTED_QUANTIFIERS_WARNING = (
+    "вложенные квантификаторы (например, (a+)+): возможен экспоненциальный бэктрекинг"
+)
+
+
+@dataclass(frozen=True)
+class AdversarialResult:
+    name: str
+    seconds: float
+    us_per_kb: float
+    growth: float
+
+
+@dataclass
+class PatternAudit:
+    name: str
+    regex: str
+    error: str = ""
+    warnings: list[str] = field(default_factory=list)
+    adversarial: list[AdversarialResult] = field(default_factory=list)
+    timed_out: bool = False
+    corpus_bytes: int = 0
+    corpus_seconds: float = 0.0
+
+    @property
+    def worst(self) -> AdversarialResult | None:
+        if not self.adversarial:
+            return None
+        return max(self.adversarial, key=lambda r: r.us_per_kb)
+
+    @property
+    def exponential(self) -> bool:
+        # Predicted by structure alone: timing such a pattern on adversarial
+        # input may never finish, so it is not timed.
+        return NESTED_QUANTIFIERS_WARNING in self.warnings
+
+    @property
+    def catastrophic(self) -> bool:
+        if self.exponential or self.timed_out:
+            return True
+        return any(
+            r.growth > _GROWTH_LIMIT and r.seconds >= _MIN_SIGNIFICANT_SECONDS
+            for r in self.adversarial
+        )
+
+    @property
+    def corpus_mb_per_s(self) -> float | None:
+        if self.corpus_bytes == 0:
+            return None
+        if self.corpus_seconds <= 0:
+            return float("inf")
+        return self.corpus_bytes / self.corpus_seconds / (1024 * 1024)
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return "invalid"
+        if self.catastrophic:
+            return "catastrophic"
+        if self.warnings:
+            return "risky"
+        return "ok"
+
+    def to_dict(self) -> dict[str, Any]:
+        worst = self.worst
+        return {
+            "name": self.name,
+            "regex": self.regex,
+            "status": self.status,
+            "error": self.error,
+            "warnings": list(self.warnings),
+            "timedOut": self.timed_out,
+            "adversarial": [
+                {
+                    "input": r.name,
+                    "seconds": round(r.seconds, 6),
+                    "usPerKb": round(r.us_per_kb, 3),
+                    "growth": round(r.growth, 2),
+                }
+                for r in self.adversarial
+            ],
+            "worstUsPerKb": round(worst.us_per_kb, 3) if worst else None,
+            "corpusMbPerSecond": (
+                round(self.corpus_mb_per_s, 3)
+                if self.corpus_mb_per_s is not None
+                and self.corpus_mb_per_s != float("inf")
+                else None
+            ),
+        }
+
+
+def _walk(items: Any) -> Iterable[tuple[Any, Any]]:
+    for op, av in items:
+        yield op, av
+        for sub in _children(op, av):
+            yield from _walk(sub)
+
+
+def _children(op: Any, av: Any) -> list[Any]:
+    c = _sre_constants
+    if c is None:
+        return []
+    if op in (c.MAX_REPEAT, c.MIN_REPEAT, c.POSSESSIVE_REPEAT):
+        return [av[2]]
+    if op is c.SUBPATTERN:
+        return [av[3]]
+    if op is c.BRANCH:
+        return list(av[1])
+    if op in (c.ASSERT, c.ASSERT_NOT):
+        return [av[1]]
+    if op is c.ATOMIC_GROUP:
+        return [av]
+    if op is c.GROUPREF_EXISTS:
+        return [x for x in av[1:] if x is not None]
+    return []
+
+
+def _is_repeat(op: Any) -> bool:
+    c = _sre_constants
+    return c is not None and op in (c.MAX_REPEAT, c.MIN_REPEAT)
+
+
+def structural_warnings(regex: str) -> list[str]:
+    if _sre_parser is None or _sre_constants is None:
+        return []
+    try:
+        parsed = _sre_parser.parse(regex)
+    except Exception:
+        return []
+
+    maxrepeat = _sre_constants.MAXREPEAT
+    warnings: list[str] = []
+
+    for op, av in _walk(list(parsed)):
+        if not _is_repeat(op):
+            continue
+        lo, hi, body = av
+        inner_unbounded = any(
+            _is_repeat(iop) and (iav[1] is maxrepeat or iav[1] > 1)
+            for iop, iav in _walk(list(body))
+        )
+        if inner_unbounded and (hi is maxrepeat or hi > 1):
+            warnings.append(NESTED_QUANTIFIERS_WARNING)
+        elif hi is maxrepeat and any(
+            iop is _sre_constants.ANY for iop, _ in _walk(list(body))
+        ):
+            warnings.append(
+                "неограниченный '.*'/'.+' без якоря: квадратичная стоимость на длинных строках"
+            )
+        elif (
+            lo == 0
+            and hi == 1
+            and any(
+                _is_repeat(iop) and iav[1] is not maxrepeat and iav[1] > 1
+                for iop, iav in _walk(list(body))
+            )
+        ):
+            warnings.append(
+                "необязательная группа с повторением (например, (.{0,20})?): "
+                "лишние попытки сопоставления на каждом вхождении префикса"
+            )
+
+    return list(dict.fromkeys(warnings))
+
+
+def _literals(regex: str) -> list[str]:
+    if _sre_parser is None or _sre_constants is None:
+        return []
+    try:
+        parsed = _sre_parser.parse(regex)
+    except Exception:
+        return []
+
+    out: list[str] = []
+
+    def collect(items: Any) -> None:
+        run: list[str] = []
+        for op, av in items:
+            if op is _sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            if run:
+                out.append("".join(run))
+                run = []
+            for sub in _children(op, av):
+                collect(sub)
+        if run:
+            out.append("".join(run))
+
+    collect(list(parsed))
+    return [s for s in dict.fromkeys(out) if s.strip()]
+
+
+def adversarial_inputs(regex: str, length: int) -> list[tuple[str, str]]:
+    lits = _literals(regex) or ["a"]
+    prefix = max(lits, key=len)
+    inputs: list[tuple[str, str]] = [
+        ("repeat-a", "a" * length),
+        ("whitespace", " " * length),
+        ("minified", ("aB3_x=" * (length // 6 + 1))[:length]),
+        ("prefix-repeat", (prefix * (length // len(prefix) + 1))[:length]),
+        (
+            "prefix-then-run",
+            (prefix + "A" * max(length - len(prefix), 0))[:length],
+        ),
+        (
+            "prefix-quote-run",
+            ((prefix + "=\"" + "A" * 39 + " ") * (length // (len(prefix) + 42) + 1))[
+                :length
+            ],
+        ),
+    ]
+    return inputs
+
+
+def _time_scan(compiled: re.Pattern[str], text: str) -> float:
+    started = time.perf_counter()
+    for _ in compiled.finditer(text):
+        pass
+    return time.perf_counter() - started
+
+
+def _time_adversarial(regex: str, base_len: int) -> list[AdversarialResult]:
+    compiled = re.compile(regex)
+    lengths = [min(_START_LEN, base_len)]
+    while lengths[-1] < base_len * _GROWTH_FACTOR:
+        lengths.append(lengths[-1] * _GROWTH_FACTOR)
+    names = [name for name, _ in adversarial_inputs(regex, 0)]
+
+    results: list[AdversarialResult] = []
+    for i, input_name in enumerate(names):
+        prev = 0.0
+        result: AdversarialResult | None = None
+        for length in lengths:
+            text = adversarial_inputs(regex, length)[i][1]
+            seconds = _time_scan(compiled, text)
+            result = AdversarialResult(
+                name=input_name,
+                seconds=seconds,
+                us_per_kb=seconds * 1e6 / (max(len(text), 1) / 1024),
+                growth=seconds / prev if prev > 0 else 0.0,
+            )
+            prev = seconds
+            if seconds >= _STEP_BUDGET_SECONDS or (
+                result.growth > _GROWTH_LIMIT and seconds >= _MIN_SIGNIFICANT_SECONDS
+            ):
+                break
+        assert result is not None
+        results.append(result)
+    return results
+
+
+def _timing_worker(regex: str, base_len: int, conn: Any) -> None:
+    conn.send(_time_adversarial(regex, base_len))
+    conn.close()
+
+
+def _time_adversarial_with_deadline(
+    regex: str, base_len: int, deadline: float
+) -> list[AdversarialResult] | None:
+    # None when the deadline is exceeded.
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return _time_adversarial(regex, base_len)
+    ctx = multiprocessing.get_context("fork")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_timing_worker, args=(regex, base_len, send), daemon=True)
+    proc.start()
+    send.close()
+    try:
+        if recv.poll(deadline):
+            try:
+                return recv.recv()
+            except EOFError:
+                return None
+        return None
+    finally:
+        recv.close()
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+
+
+def audit_pattern(
+    name: str,
+    regex: str,
+    *,
+    corpora: Iterable[str] = (),
+    base_len: int = _BASE_LEN,
+    deadline: float = _DEADLINE_SECONDS,
+) -> PatternAudit:
+    audit = PatternAudit(name=name, regex=regex)
+    try:
+        compiled = re.compile(regex)
+    except re.error as exc:
+        audit.error = str(exc)
+        return audit
+
+    audit.warnings = structural_warnings(regex)
+    if audit.exponential:
+        return audit
+    timings = _time_adversarial_with_deadline(regex, base_len, deadline)
+    if timings is None:
+        audit.timed_out = True
+        return audit
+    audit.adversarial = timings
+
+    for text in corpora:
+        audit.corpus_bytes += len(text.encode("utf-8", errors="replace"))
+        for line in text.splitlines():
+            audit.corpus_seconds += _time_scan(compiled, line)
+
+    return audit
+
+
+def audit_patterns(
+    patterns: dict[str, str],
+    *,
+    corpora: Iterable[str] = (),
+    base_len: int = _BASE_LEN,
+    deadline: float = _DEADLINE_SECONDS,
+) -> list[PatternAudit]:
+    texts = list(corpora)
+    return [
+        audit_pattern(name, regex, corpora=texts, base_len=base_len, deadline=deadline)
+        for name, regex in patterns.items()
+    ]
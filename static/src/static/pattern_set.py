@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+try:
+    from re import _constants as _sre_constants  # type: ignore[attr-defined]
+    from re import _parser as _sre_parser  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover
+    _sre_constants = None
+    _sre_parser = None
+
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".pipesec-cache.json"
+
+# Cross products of small character classes are expanded into literal anchors
+# only while the anchor set stays this small.
+_MAX_CLASS_SIZE = 8
+_MAX_ANCHORS = 64
+
+# Parsed pattern sets keyed by content hash. Pool workers started via fork inherit
+# this (including already compiled regexes) and never touch the disk.
+_MEMO: dict[str, PatternSet] = {}
+
+
+class SecretPattern:
+    __slots__ = ("name", "regex", "anchors", "ignore_case", "_compiled")
+
+    def __init__(
+        self,
+        name: str,
+        regex: str,
+        anchors: tuple[str, ...] = (),
+        ignore_case: bool = False,
+    ):
+        self.name = name
+        self.regex = regex
+        # Any match of `regex` contains at least one of these literals (casefolded
+        # when ignore_case). Empty means the pattern cannot be prefiltered.
+        self.anchors = anchors
+        self.ignore_case = ignore_case
+        self._compiled: re.Pattern[str] | None = None
+
+    @property
+    def compiled(self) -> re.Pattern[str]:
+        if self._compiled is None:
+            self._compiled = re.compile(self.regex)
+        return self._compiled
+
+    def may_match(self, text: str, folded: str) -> bool:
+        if not self.anchors:
+            return True
+        haystack = folded if self.ignore_case else text
+        return any(a in haystack for a in self.anchors)
+
+
+class PatternSet:
+    def __init__(
+        self,
+        patterns: list[SecretPattern],
+        *,
+        invalid: dict[str, str] | None = None,
+        suspicious_names: Iterable[str] = (),
+        key: str = "",
+    ):
+        self.patterns = patterns
+        self.invalid = dict(invalid or {})
+        self.suspicious_names = tuple(suspicious_names)
+        self.key = key
+        self.rank = {p.name: i for i, p in enumerate(patterns)}
+
+        self.needs_casefold = any(p.ignore_case and p.anchors for p in patterns)
+
+        # A single regex over every anchor: if it finds nothing in a (casefolded)
+        # text, no pattern can match there. Only valid when every pattern is anchored.
+        self.prefilter_source: str | None = None
+        if patterns and all(p.anchors for p in patterns):
+            anchors = sorted(
+                {a.casefold() for p in patterns for a in p.anchors},
+                key=len,
+                reverse=True,
+            )
+            self.prefilter_source = "|".join(re.escape(a) for a in anchors)
+        self.prefilter = (
+            re.compile(self.prefilter_source) if self.prefilter_source else None
+        )
+
+        self.suspicious_source = "|".join(
+            re.escape(s.upper()) for s in self.suspicious_names
+        )
+        self.suspicious = (
+            re.compile(self.suspicious_source) if self.suspicious_source else None
+        )
+
+    def candidates(self, text: str) -> list[SecretPattern]:
+        folded = text.casefold() if self.needs_casefold or self.prefilter else text
+        if self.prefilter is not None and self.prefilter.search(folded) is None:
+            return []
+        return [p for p in self.patterns if p.may_match(text, folded)]
+
+    def warm(self) -> None:
+        for p in self.patterns:
+            _ = p.compiled
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "key": self.key,
+            "patterns": [
+                {
+                    "name": p.name,
+                    "regex": p.regex,
+                    "anchors": list(p.anchors),
+                    "ignoreCase": p.ignore_case,
+                }
+                for p in self.patterns
+            ],
+            "invalid": self.invalid,
+            "prefilter": self.prefilter_source,
+            "suspiciousNames": list(self.suspicious_names),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PatternSet:
+        patterns = [
+            SecretPattern(
+                name=item["name"],
+                regex=item["regex"],
+                anchors=tuple(item.get("anchors", ())),
+                ignore_case=bool(item.get("ignoreCase", False)),
+            )
+            for item in data.get("patterns", [])
+        ]
+        return cls(
+            patterns,
+            invalid=data.get("invalid") or {},
+            suspicious_names=data.get("suspiciousNames") or (),
+            key=str(data.get("key", "")),
+        )
+
+    @classmethod
+    def build(
+        cls,
+        patterns: dict[str, str],
+        *,
+        suspicious_names: Iterable[str] = (),
+        key: str = "",
+    ) -> PatternSet:
+        out: list[SecretPattern] = []
+        invalid: dict[str, str] = {}
+        for name, regex in patterns.items():
+            try:
+                compiled = re.compile(regex)
+            except re.error as exc:
+                invalid[name] = str(exc)
+                continue
+            anchors, ignore_case = extract_anchors(regex)
+            p = SecretPattern(name, regex, anchors, ignore_case)
+            p._compiled = compiled
+            out.append(p)
+        return cls(out, invalid=invalid, suspicious_names=suspicious_names, key=key)
+
+
+def _content_key(raw: bytes, suspicious_names: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0".encode())
+    h.update(raw)
+    h.update("\0".join(suspicious_names).encode("utf-8"))
+    return h.hexdigest()
+
+
+def cache_path_for(patterns_path: Path) -> Path:
+    return patterns_path.with_name(patterns_path.name + CACHE_SUFFIX)
+
+
+def pattern_set_from_mapping(
+    patterns: dict[str, str], *, suspicious_names: Iterable[str] = ()
+) -> PatternSet:
+    names = tuple(suspicious_names)
+    raw = json.dumps(patterns, sort_keys=True).encode("utf-8")
+    key = _content_key(raw, names)
+    cached = _MEMO.get(key)
+    if cached is None:
+        cached = PatternSet.build(patterns, suspicious_names=names, key=key)
+        _MEMO[key] = cached
+    return cached
+
+
+def load_pattern_set(
+    path: Path,
+    parse: Any,
+    *,
+    suspicious_names: Iterable[str] = (),
+    use_cache: bool = True,
+) -> PatternSet | None:
+    names = tuple(suspicious_names)
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+
+    key = _content_key(raw, names)
+    cached = _MEMO.get(key)
+    if cached is not None:
+        return cached
+
+    cache_file = cache_path_for(path)
+    if use_cache:
+        loaded = _read_cache(cache_file, key)
+        if loaded is not None:
+            _MEMO[key] = loaded
+            return loaded
+
+    patterns: dict[str, str] = parse(raw)
+    if not patterns:
+        return None
+    built = PatternSet.build(patterns, suspicious_names=names, key=key)
+    _MEMO[key] = built
+    if use_cache:
+        _write_cache(cache_file, built)
+    return built
+
+
+def _read_cache(cache_file: Path, key: str) -> PatternSet | None:
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if data.get("version") != CACHE_VERSION or data.get("key") != key:
+        return None
+    try:
+        return PatternSet.from_dict(data)
+    except (KeyError, TypeError):
+        return None
+
+
+def _write_cache(cache_file: Path, pattern_set: PatternSet) -> None:
+    # Best effort: a read-only checkout simply runs without the cache.
+    try:
+        fd, tmp = tempfile.mkstemp(
+            prefix=cache_file.name + ".", suffix=".tmp", dir=cache_file.parent
+        )
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pattern_set.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, cache_file)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def extract_anchors(regex: str) -> tuple[tuple[str, ...], bool]:
+    if _sre_parser is None or _sre_constants is None:
+        return (), False
+    try:
+        parsed = _sre_parser.parse(regex)
+    except Exception:
+        return (), False
+
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE) or _has_scoped_ignorecase(
+        list(parsed)
+    )
+    required = _required(list(parsed))
+    if not required or any(not s for s in required):
+        return (), ignore_case
+    if ignore_case:
+        required = {s.casefold() for s in required}
+    return tuple(sorted(required)), ignore_case
+
+
+def _has_scoped_ignorecase(items: list[Any]) -> bool:
+    c = _sre_constants
+    for op, av in items:
+        if op is c.SUBPATTERN:
+            if av[1] & re.IGNORECASE:
+                return True
+            if _has_scoped_ignorecase(list(av[3])):
+                return True
+        elif op in (c.MAX_REPEAT, c.MIN_REPEAT, c.POSSESSIVE_REPEAT):
+            if _has_scoped_ignorecase(list(av[2])):
+                return True
+        elif op is c.BRANCH:
+            if any(_has_scoped_ignorecase(list(alt)) for alt in av[1]):
+                return True
+        elif op is c.ATOMIC_GROUP:
+            if _has_scoped_ignorecase(list(av)):
+                return True
+    return False
+
+
+def _class_literals(av: Any) -> set[str] | None:
+    c = _sre_constants
+    out: set[str] = set()
+    for op, v in av:
+        if op is c.LITERAL:
+            out.add(chr(v))
+        elif op is c.RANGE and v[1] - v[0] < _MAX_CLASS_SIZE:
+            out.update(chr(x) for x in range(v[0], v[1] + 1))
+        else:
+            return None
+        if len(out) > _MAX_CLASS_SIZE:
+            return None
+    return out or None
+
+
+def _score(s: set[str]) -> tuple[int, int]:
+    return (min(len(x) for x in s), -len(s))
+
+
+def _required(items: list[Any]) -> set[str] | None:
+    # Returns a set of literals such that every match of `items` contains at least
+    # one of them, or None when nothing useful is guaranteed.
+    c = _sre_constants
+    factors: list[set[str]] = []
+    run: set[str] | None = None
+
+    def flush() -> None:
+        nonlocal run
+        if run:
+            factors.append(run)
+        run = None
+
+    for op, av in items:
+        chars: set[str] | None = None
+        if op is c.LITERAL:
+            chars = {chr(av)}
+        elif op is c.IN:
+            chars = _class_literals(av)
+
+        if chars is not None:
+            if run is None:
+                run = set(chars)
+            elif len(run) * len(chars) <= _MAX_ANCHORS:
+                run = {r + ch for r in run for ch in chars}
+            else:
+                flush()
+                run = set(chars)
+            continue
+
+        flush()
+        sub: set[str] | None = None
+        if op is c.SUBPATTERN:
+            sub = _required(list(av[3]))
+        elif op in (c.MAX_REPEAT, c.MIN_REPEAT, c.POSSESSIVE_REPEAT) and av[0] >= 1:
+            sub = _required(list(av[2]))
+        elif op is c.ATOMIC_GROUP:
+            sub = _required(list(av))
+        elif op is c.BRANCH:
+            alts = [_required(list(alt)) for alt in av[1]]
+            if all(alts):
+                union: set[str] = set()
+                for a in alts:
+                    union |= a  # type: ignore[operator]
+                if len(union) <= _MAX_ANCHORS:
+                    sub = union
+        if sub:
+            factors.append(sub)
+
+    flush()
+    if not factors:
+        return None
+    return max(factors, key=_score)
@@ -9,8 +9,12 @@ _SEVERITY_ORDER = [Severity.CRITICAL, Severity.HIGH, Severity.MEDIUM, Severity.L
 _SEVERITY_EMOJI = {"CRITICAL": "🔴", "HIGH": "🟠", "MEDIUM": "🟡", "LOW": "🔵"}
 
 
-def render_console_report(findings: list[Finding]) -> str:
+def render_console_report(
+    findings: list[Finding], *, suppressed: int | None = None
+) -> str:
     if not findings:
+        if suppressed:
+            return f"✅ Новых уязвимостей не обнаружено! (подавлено baseline: {suppressed})"
         return "✅ Уязвимостей не обнаружено!"
 
     by_severity: dict[str, list[Finding]] = defaultdict(list)
@@ -27,6 +31,8 @@ def render_console_report(findings: list[Finding]) -> str:
         cnt = len(by_severity.get(sev.value, []))
         if cnt:
             lines.append(f"   {_SEVERITY_EMOJI[sev.value]} {sev.value}: {cnt}")
+    if suppressed is not None:
+        lines.append(f"   🔕 Подавлено baseline: {suppressed}")
 
     for sev in _SEVERITY_ORDER:
         items = by_severity.get(sev.value, [])
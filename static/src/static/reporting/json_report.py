@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
 from typing import Any
 
+from static.fingerprint import finding_fingerprint
 from static.models import Finding
 
 
-def to_json_dict(findings: list[Finding]) -> dict[str, Any]:
-    return {
-        "findings": [asdict(f) for f in findings],
+# Version of the report format shared with the dynamic module (Go); bump on
+# incompatible changes. `pipesec merge` accepts any version up to this one.
+SCHEMA_VERSION = 1
+
+
+def finding_to_dict(f: Finding) -> dict[str, Any]:
+    out = f.to_dict()
+    out["fingerprint"] = finding_fingerprint(f)
+    return out
+
+
+def to_json_dict(
+    findings: list[Finding], *, suppressed: int | None = None
+) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "schemaVersion": SCHEMA_VERSION,
+        "engine": "static",
+        "findings": [finding_to_dict(f) for f in findings],
         "count": len(findings),
         "countsBySeverity": {
             sev: sum(1 for f in findings if f.severity.value == sev)
             for sev in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]
         },
     }
+    if suppressed is not None:
+        out["suppressed"] = suppressed
+    return out
 
 
-def render_json(findings: list[Finding], *, indent: int = 2) -> str:
-    return json.dumps(to_json_dict(findings), ensure_ascii=False, indent=indent)
+def render_json(
+    findings: list[Finding], *, indent: int = 2, suppressed: int | None = None
+) -> str:
+    return json.dumps(
+        to_json_dict(findings, suppressed=suppressed), ensure_ascii=False, indent=indent
+    )
@@ -1,14 +1,102 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from enum import IntFlag
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
-from static.models import Finding
+from static.models import Finding, FindingKind, Severity
 from static.secrets import SecretDetectionEngine
 
 
+class Feature(IntFlag):
+    # Cheap facts about a workflow, computed in one pass before any rule runs.
+    NONE = 0
+    PULL_REQUEST_TARGET = 1 << 0
+    JOBS = 1 << 1
+    STEPS = 1 << 2
+    RUN = 1 << 3
+    USES = 1 << 4
+    ENV = 1 << 5
+    PERMISSIONS = 1 << 6
+
+
+_SEVERITY_ORDER = (Severity.LOW, Severity.MEDIUM, Severity.HIGH, Severity.CRITICAL)
+
+
+def _triggers(on: Any) -> set[str]:
+    if isinstance(on, str):
+        return {on}
+    if isinstance(on, (dict, list)):
+        return {t for t in on if isinstance(t, str)}
+    return set()
+
+
+def workflow_triggers(workflow: dict[str, Any]) -> set[str]:
+    # PyYAML reads a bare `on:` key as True.
+    return _triggers(workflow.get("on")) | _triggers(workflow.get(True))
+
+
+def workflow_features(workflow: dict[str, Any]) -> Feature:
+    # Must over-approximate: a rule is skipped only when a feature it requires
+    # is certainly absent.
+    features = Feature.NONE
+    if "pull_request_target" in workflow_triggers(workflow):
+        features |= Feature.PULL_REQUEST_TARGET
+    if isinstance(workflow.get("env"), dict):
+        features |= Feature.ENV
+    if workflow.get("permissions") is not None:
+        features |= Feature.PERMISSIONS
+
+    jobs = workflow.get("jobs")
+    if not isinstance(jobs, dict):
+        return features
+    for job in jobs.values():
+        if not isinstance(job, dict):
+            continue
+        features |= Feature.JOBS
+        if isinstance(job.get("env"), dict):
+            features |= Feature.ENV
+        if job.get("permissions") is not None:
+            features |= Feature.PERMISSIONS
+        steps = job.get("steps")
+        if not isinstance(steps, list):
+            continue
+        for step in steps:
+            if not isinstance(step, dict):
+                continue
+            features |= Feature.STEPS
+            if isinstance(step.get("run"), str):
+                features |= Feature.RUN
+            if isinstance(step.get("uses"), str):
+                features |= Feature.USES
+            if isinstance(step.get("env"), dict):
+                features |= Feature.ENV
+    return features
+
+
 class WorkflowRule(ABC):
+    # Static metadata, read without instantiating or evaluating the rule.
+    # rule_id defaults to the module name; `requires` lists features that must
+    # all be present for the rule to possibly report anything.
+    rule_id: ClassVar[str] = ""
+    requires: ClassVar[Feature] = Feature.NONE
+    kinds: ClassVar[tuple[FindingKind, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if not cls.__dict__.get("rule_id"):
+            cls.rule_id = cls.__module__.rsplit(".", 1)[-1]
+
+    @classmethod
+    def fqn(cls) -> str:
+        return f"{cls.__module__}.{cls.__name__}"
+
+    @classmethod
+    def severities(cls) -> tuple[Severity, ...]:
+        present = {k.severity for k in cls.kinds}
+        return tuple(s for s in _SEVERITY_ORDER if s in present)
+
     @abstractmethod
     def evaluate(
         self,
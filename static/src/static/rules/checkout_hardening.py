@@ -3,15 +3,33 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_uses, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+PERSISTED_CREDENTIALS = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Checkout Hardening",
+    description=(
+        "actions/checkout выполняется с persist-credentials=true (явно или по умолчанию). "
+        "Это оставляет токен в git-конфиге и увеличивает риск злоупотребления при выполнении стороннего кода."
+    ),
+    recommendation=(
+        "Установите `with: persist-credentials: false` для actions/checkout, если push не требуется. "
+        "Также минимизируйте permissions для GITHUB_TOKEN."
+    ),
+)
+
+
 @register_workflow_rule
 class CheckoutCredentialPersistenceRule(WorkflowRule):
+    rule_id = "checkout_hardening"
+    requires = Feature.USES
+    kinds = (PERSISTED_CREDENTIALS,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -37,19 +55,7 @@ class CheckoutCredentialPersistenceRule(WorkflowRule):
                     and pc.strip().lower() in {"true", "1", "yes", "on"}
                 ):
                     out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Checkout Hardening",
-                            description=(
-                                "actions/checkout выполняется с persist-credentials=true (явно или по умолчанию). "
-                                "Это оставляет токен в git-конфиге и увеличивает риск злоупотребления при выполнении стороннего кода."
-                            ),
-                            location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                            recommendation=(
-                                "Установите `with: persist-credentials: false` для actions/checkout, если push не требуется. "
-                                "Также минимизируйте permissions для GITHUB_TOKEN."
-                            ),
-                        )
+                        PERSISTED_CREDENTIALS.at(f"{path}:jobs.{job_name}.steps[{idx}]")
                     )
 
         return out
@@ -3,14 +3,29 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.secrets import SecretDetectionEngine
 
 
+PULL_REQUEST_TARGET = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Dangerous Trigger",
+    description="Использование 'pull_request_target' может привести к утечке секретов из форков.",
+    recommendation=(
+        "Используйте 'pull_request' вместо 'pull_request_target' или добавьте строгую проверку источника PR. "
+        "Не выполняйте непроверенный код из PR с доступом к secrets."
+    ),
+)
+
+
 @register_workflow_rule
 class DangerousTriggersRule(WorkflowRule):
+    rule_id = "dangerous_triggers"
+    requires = Feature.PULL_REQUEST_TARGET
+    kinds = (PULL_REQUEST_TARGET,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -23,16 +38,5 @@ class DangerousTriggersRule(WorkflowRule):
             on_triggers = {on_triggers: {}}
 
         if isinstance(on_triggers, dict) and "pull_request_target" in on_triggers:
-            out.append(
-                Finding(
-                    severity=Severity.CRITICAL,
-                    category="Dangerous Trigger",
-                    description="Использование 'pull_request_target' может привести к утечке секретов из форков.",
-                    location=f"{path}:on.pull_request_target",
-                    recommendation=(
-                        "Используйте 'pull_request' вместо 'pull_request_target' или добавьте строгую проверку источника PR. "
-                        "Не выполняйте непроверенный код из PR с доступом к secrets."
-                    ),
-                )
-            )
+            out.append(PULL_REQUEST_TARGET.at(f"{path}:on.pull_request_target"))
         return out
@@ -4,15 +4,46 @@ import re
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
+from static.models import Finding, FindingKind, Severity
 from static.rules.base import WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_env, get_run, get_step_name, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+_DEBUG_RECOMMENDATION = (
+    "Отключайте debug-логирование в production CI, чтобы снизить риск утечки чувствительных данных в логи."
+)
+
+WORKFLOW_DEBUG_ENV = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Logging",
+    description="Включён режим отладки через env '{key}={value}'.",
+    recommendation=_DEBUG_RECOMMENDATION,
+)
+
+JOB_DEBUG_ENV = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Logging",
+    description="Включён режим отладки через env '{key}={value}' в job '{job}'.",
+    recommendation=_DEBUG_RECOMMENDATION,
+)
+
+SHELL_TRACING = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Logging",
+    description="В шаге '{step}' включён shell tracing (set -x / bash -x).",
+    recommendation=(
+        "Не используйте set -x / bash -x в CI с секретами: команды и значения переменных могут попасть в логи."
+    ),
+)
+
+
 @register_workflow_rule
 class DebugTracingRule(WorkflowRule):
+    rule_id = "debug_tracing"
+    kinds = (WORKFLOW_DEBUG_ENV, JOB_DEBUG_ENV, SHELL_TRACING)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -24,17 +55,7 @@ class DebugTracingRule(WorkflowRule):
         for key in ("ACTIONS_STEP_DEBUG", "ACTIONS_RUNNER_DEBUG"):
             v = wf_env.get(key)
             if isinstance(v, str) and v.strip().lower() in {"1", "true", "yes", "on"}:
-                out.append(
-                    Finding(
-                        severity=Severity.MEDIUM,
-                        category="Logging",
-                        description=f"Включён режим отладки через env '{key}={v}'.",
-                        location=f"{path}:env.{key}",
-                        recommendation=(
-                            "Отключайте debug-логирование в production CI, чтобы снизить риск утечки чувствительных данных в логи."
-                        ),
-                    )
-                )
+                out.append(WORKFLOW_DEBUG_ENV.at(f"{path}:env.{key}", key=key, value=v))
 
         for job_name, job_config in iter_jobs(workflow):
             job_env = get_env(job_config)
@@ -47,14 +68,11 @@ class DebugTracingRule(WorkflowRule):
                     "on",
                 }:
                     out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Logging",
-                            description=f"Включён режим отладки через env '{key}={v}' в job '{job_name}'.",
-                            location=f"{path}:jobs.{job_name}.env.{key}",
-                            recommendation=(
-                                "Отключайте debug-логирование в production CI, чтобы снизить риск утечки чувствительных данных в логи."
-                            ),
+                        JOB_DEBUG_ENV.at(
+                            f"{path}:jobs.{job_name}.env.{key}",
+                            key=key,
+                            value=v,
+                            job=job_name,
                         )
                     )
 
@@ -68,14 +86,8 @@ class DebugTracingRule(WorkflowRule):
                 ):
                     step_name = get_step_name(step, idx)
                     out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Logging",
-                            description=f"В шаге '{step_name}' включён shell tracing (set -x / bash -x).",
-                            location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                            recommendation=(
-                                "Не используйте set -x / bash -x в CI с секретами: команды и значения переменных могут попасть в логи."
-                            ),
+                        SHELL_TRACING.at(
+                            f"{path}:jobs.{job_name}.steps[{idx}]", step=step_name
                         )
                     )
 
@@ -3,15 +3,30 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_uses, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+UNPINNED_IMAGE = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Supply Chain",
+    description="Используется docker image без pin на digest (или с latest).",
+    recommendation=(
+        "Закрепляйте docker image по digest (docker://image@sha256:...) или используйте фиксированный тег. "
+        "Это снижает риск supply-chain подмены."
+    ),
+)
+
+
 @register_workflow_rule
 class DockerImagePinningRule(WorkflowRule):
+    rule_id = "docker_image_pinning"
+    requires = Feature.USES
+    kinds = (UNPINNED_IMAGE,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -35,16 +50,8 @@ class DockerImagePinningRule(WorkflowRule):
 
                 if ":" not in image or image.endswith(":latest"):
                     out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Supply Chain",
-                            description="Используется docker image без pin на digest (или с latest).",
-                            location=f"{path}:jobs.{job_name}.steps[{idx}].uses",
-                            recommendation=(
-                                "Закрепляйте docker image по digest (docker://image@sha256:...) или используйте фиксированный тег. "
-                                "Это снижает риск supply-chain подмены."
-                            ),
-                            evidence=uses,
+                        UNPINNED_IMAGE.at(
+                            f"{path}:jobs.{job_name}.steps[{idx}].uses", evidence=uses
                         )
                     )
 
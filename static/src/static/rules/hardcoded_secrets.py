@@ -5,14 +5,35 @@ from typing import Any
 
 import yaml  # type: ignore[import-untyped]
 
-from static.models import Finding, Severity
+from static.fingerprint import SecretDeduplicator, collapse_overlapping
+from static.models import Finding, FindingKind, Severity
 from static.rules.base import WorkflowRule
 from .registry import register_workflow_rule
 from static.secrets import SecretDetectionEngine
 
 
+_HARDCODED_RECOMMENDATION = "Перенесите секрет в GitHub Secrets/Variables и подставляйте через ${{ secrets.NAME }}."
+
+HARDCODED_SECRET = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Hardcoded Secret",
+    description="Обнаружен hardcoded секрет типа '{secret_type}'.",
+    recommendation=_HARDCODED_RECOMMENDATION,
+)
+
+REPEATED_HARDCODED_SECRET = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Hardcoded Secret",
+    description="Обнаружен hardcoded секрет типа '{secret_type}'. Встречается {count} раз.",
+    recommendation=_HARDCODED_RECOMMENDATION,
+)
+
+
 @register_workflow_rule
 class HardcodedSecretsRule(WorkflowRule):
+    rule_id = "hardcoded_secrets"
+    kinds = (HARDCODED_SECRET, REPEATED_HARDCODED_SECRET)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -21,19 +42,23 @@ class HardcodedSecretsRule(WorkflowRule):
     ) -> list[Finding]:
         out: list[Finding] = []
         yaml_str = yaml.dump(workflow, sort_keys=False)
-        for secret in secret_engine.detect_in_text(yaml_str):
+        rank = secret_engine.pattern_rank
+        dedup = SecretDeduplicator(rank)
+        matches = collapse_overlapping(secret_engine.detect_in_text(yaml_str), rank)
+        for secret in sorted(matches, key=lambda m: m.start):
             if "${{" in secret.value or "secrets." in secret.value:
                 continue
+            dedup.add(secret)
+        for occ in dedup.finish():
+            kind = REPEATED_HARDCODED_SECRET if occ.count > 1 else HARDCODED_SECRET
             out.append(
-                Finding(
-                    severity=Severity.CRITICAL,
-                    category="Hardcoded Secret",
-                    description=f"Обнаружен hardcoded секрет типа '{secret.secret_type}'.",
-                    location=str(path),
-                    recommendation="Перенесите секрет в GitHub Secrets/Variables и подставляйте через ${{ secrets.NAME }}.",
-                    evidence=(secret.value[:20] + "...")
-                    if len(secret.value) > 20
-                    else secret.value,
+                kind.at(
+                    str(path),
+                    evidence=occ.evidence,
+                    fingerprint=occ.fingerprint,
+                    occurrences=occ.count,
+                    secret_type=occ.label,
+                    count=occ.count,
                 )
             )
         return out
@@ -4,15 +4,32 @@ import re
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_run, get_step_name, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+PIPE_TO_SHELL = FindingKind(
+    severity=Severity.HIGH,
+    category="Supply Chain",
+    description=(
+        "В шаге '{step}' обнаружен потенциально небезопасный паттерн загрузки и выполнения: curl/wget | shell."
+    ),
+    recommendation=(
+        "Избегайте curl|bash. Загружайте артефакт по HTTPS, проверяйте checksum/подпись и выполняйте локально. "
+        "Предпочитайте фиксированные версии и проверенные источники."
+    ),
+)
+
+
 @register_workflow_rule
 class InsecureDownloadsRule(WorkflowRule):
+    rule_id = "insecure_downloads"
+    requires = Feature.RUN
+    kinds = (PIPE_TO_SHELL,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -33,17 +50,8 @@ class InsecureDownloadsRule(WorkflowRule):
                 if pipe_exec.search(run):
                     step_name = get_step_name(step, idx)
                     out.append(
-                        Finding(
-                            severity=Severity.HIGH,
-                            category="Supply Chain",
-                            description=(
-                                f"В шаге '{step_name}' обнаружен потенциально небезопасный паттерн загрузки и выполнения: curl/wget | shell."
-                            ),
-                            location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                            recommendation=(
-                                "Избегайте curl|bash. Загружайте артефакт по HTTPS, проверяйте checksum/подпись и выполняйте локально. "
-                                "Предпочитайте фиксированные версии и проверенные источники."
-                            ),
+                        PIPE_TO_SHELL.at(
+                            f"{path}:jobs.{job_name}.steps[{idx}]", step=step_name
                         )
                     )
 
@@ -3,12 +3,32 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.secrets import SecretDetectionEngine
 
 
+WORKFLOW_ID_TOKEN = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Permissions",
+    description="Workflow запрашивает 'id-token: write' (OIDC).",
+    recommendation=(
+        "Используйте 'id-token: write' только когда это необходимо (OIDC federation). "
+        "Убедитесь, что доверенные аудитории/провайдеры настроены строго и минимизируйте остальные permissions."
+    ),
+)
+
+JOB_ID_TOKEN = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Permissions",
+    description="Job '{job}' запрашивает 'id-token: write' (OIDC).",
+    recommendation=(
+        "Запрашивайте OIDC токен только в job, который его использует, и только на время необходимости."
+    ),
+)
+
+
 def _check_permissions_obj(permissions: Any) -> bool:
     if not isinstance(permissions, dict):
         return False
@@ -18,6 +38,10 @@ def _check_permissions_obj(permissions: Any) -> bool:
 
 @register_workflow_rule
 class OIDCPermissionsRule(WorkflowRule):
+    rule_id = "oidc_permissions"
+    requires = Feature.PERMISSIONS
+    kinds = (WORKFLOW_ID_TOKEN, JOB_ID_TOKEN)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -26,18 +50,7 @@ class OIDCPermissionsRule(WorkflowRule):
     ) -> list[Finding]:
         out: list[Finding] = []
         if _check_permissions_obj(workflow.get("permissions")):
-            out.append(
-                Finding(
-                    severity=Severity.MEDIUM,
-                    category="Permissions",
-                    description="Workflow запрашивает 'id-token: write' (OIDC).",
-                    location=f"{path}:permissions.id-token",
-                    recommendation=(
-                        "Используйте 'id-token: write' только когда это необходимо (OIDC federation). "
-                        "Убедитесь, что доверенные аудитории/провайдеры настроены строго и минимизируйте остальные permissions."
-                    ),
-                )
-            )
+            out.append(WORKFLOW_ID_TOKEN.at(f"{path}:permissions.id-token"))
 
         jobs = workflow.get("jobs", {})
         if isinstance(jobs, dict):
@@ -46,14 +59,8 @@ class OIDCPermissionsRule(WorkflowRule):
                     continue
                 if _check_permissions_obj(job_config.get("permissions")):
                     out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Permissions",
-                            description=f"Job '{job_name}' запрашивает 'id-token: write' (OIDC).",
-                            location=f"{path}:jobs.{job_name}.permissions.id-token",
-                            recommendation=(
-                                "Запрашивайте OIDC токен только в job, который его использует, и только на время необходимости."
-                            ),
+                        JOB_ID_TOKEN.at(
+                            f"{path}:jobs.{job_name}.permissions.id-token", job=job_name
                         )
                     )
 
@@ -3,14 +3,42 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
+from static.models import Finding, FindingKind, Severity
 from static.rules.base import WorkflowRule
 from .registry import register_workflow_rule
 from static.secrets import SecretDetectionEngine
 
 
+IMPLICIT_PERMISSIONS = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Permissions",
+    description="Workflow не задаёт явные permissions для GITHUB_TOKEN.",
+    recommendation=(
+        "Явно задавайте минимально необходимые permissions (principle of least privilege). "
+        "Это снижает риск эскалации при компрометации runner/Action."
+    ),
+)
+
+WRITE_ALL = FindingKind(
+    severity=Severity.HIGH,
+    category="Excessive Permissions",
+    description="Workflow имеет 'write-all' permissions.",
+    recommendation="Используйте принцип наименьших привилегий: перечислите только необходимые permissions.",
+)
+
+WRITE_SCOPE = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Permissions",
+    description="Workflow запрашивает повышенные privileges: '{scope}: write'.",
+    recommendation="Проверьте необходимость write-доступа и минимизируйте permissions, где это возможно.",
+)
+
+
 @register_workflow_rule
 class ExcessivePermissionsRule(WorkflowRule):
+    rule_id = "permissions"
+    kinds = (IMPLICIT_PERMISSIONS, WRITE_ALL, WRITE_SCOPE)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -20,30 +48,11 @@ class ExcessivePermissionsRule(WorkflowRule):
         out: list[Finding] = []
         permissions = workflow.get("permissions")
         if permissions is None:
-            out.append(
-                Finding(
-                    severity=Severity.MEDIUM,
-                    category="Permissions",
-                    description="Workflow не задаёт явные permissions для GITHUB_TOKEN.",
-                    location=f"{path}:permissions",
-                    recommendation=(
-                        "Явно задавайте минимально необходимые permissions (principle of least privilege). "
-                        "Это снижает риск эскалации при компрометации runner/Action."
-                    ),
-                )
-            )
+            out.append(IMPLICIT_PERMISSIONS.at(f"{path}:permissions"))
             return out
 
         if permissions == "write-all":
-            out.append(
-                Finding(
-                    severity=Severity.HIGH,
-                    category="Excessive Permissions",
-                    description="Workflow имеет 'write-all' permissions.",
-                    location=f"{path}:permissions",
-                    recommendation="Используйте принцип наименьших привилегий: перечислите только необходимые permissions.",
-                )
-            )
+            out.append(WRITE_ALL.at(f"{path}:permissions"))
 
         if isinstance(permissions, dict):
             risky = {
@@ -58,13 +67,5 @@ class ExcessivePermissionsRule(WorkflowRule):
                 if not isinstance(k, str) or not isinstance(v, str):
                     continue
                 if k in risky and v.lower().strip() == "write":
-                    out.append(
-                        Finding(
-                            severity=Severity.MEDIUM,
-                            category="Permissions",
-                            description=f"Workflow запрашивает повышенные privileges: '{k}: write'.",
-                            location=f"{path}:permissions.{k}",
-                            recommendation="Проверьте необходимость write-доступа и минимизируйте permissions, где это возможно.",
-                        )
-                    )
+                    out.append(WRITE_SCOPE.at(f"{path}:permissions.{k}", scope=k))
         return out
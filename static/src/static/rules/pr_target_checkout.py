@@ -3,15 +3,34 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_uses, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+PR_HEAD_CHECKOUT = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Untrusted Code Execution",
+    description=(
+        "В workflow с 'pull_request_target' выполняется checkout PR head ref/sha. "
+        "Это типовой путь к выполнению кода из форка с доступом к secrets."
+    ),
+    recommendation=(
+        "Не делайте checkout кода из PR в workflow на pull_request_target. "
+        "Используйте pull_request или разделите workflow: проверки для PR без secrets, "
+        "а деплой/секреты — только после merge/approval."
+    ),
+)
+
+
 @register_workflow_rule
 class PRTargetUntrustedCheckoutRule(WorkflowRule):
+    rule_id = "pr_target_checkout"
+    requires = Feature.PULL_REQUEST_TARGET | Feature.USES
+    kinds = (PR_HEAD_CHECKOUT,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -48,19 +67,8 @@ class PRTargetUntrustedCheckoutRule(WorkflowRule):
                     or "pull_request.head" in lower
                 ):
                     out.append(
-                        Finding(
-                            severity=Severity.CRITICAL,
-                            category="Untrusted Code Execution",
-                            description=(
-                                "В workflow с 'pull_request_target' выполняется checkout PR head ref/sha. "
-                                "Это типовой путь к выполнению кода из форка с доступом к secrets."
-                            ),
-                            location=f"{path}:jobs.{job_name}.steps[{idx}].with.ref",
-                            recommendation=(
-                                "Не делайте checkout кода из PR в workflow на pull_request_target. "
-                                "Используйте pull_request или разделите workflow: проверки для PR без secrets, "
-                                "а деплой/секреты — только после merge/approval."
-                            ),
+                        PR_HEAD_CHECKOUT.at(
+                            f"{path}:jobs.{job_name}.steps[{idx}].with.ref",
                             evidence=ref,
                         )
                     )
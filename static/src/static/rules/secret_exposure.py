@@ -4,15 +4,34 @@ import re
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_step_name, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+SECRET_ECHO = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Secret Exposure",
+    description="Секрет может быть выведен в логи через echo/print в шаге '{step}'.",
+    recommendation="Не выводите secrets/token в stdout. Если нужно отладить — используйте маскирование и redaction.",
+)
+
+SECRET_ARTIFACT = FindingKind(
+    severity=Severity.HIGH,
+    category="Artifact Exposure",
+    description="Артефакт может содержать секреты: '{upload_path}'.",
+    recommendation="Исключите .env/credentials/secrets из артефактов (artifact exclude / отдельные пути).",
+)
+
+
 @register_workflow_rule
 class SecretExposureRule(WorkflowRule):
+    rule_id = "secret_exposure"
+    requires = Feature.STEPS
+    kinds = (SECRET_ECHO, SECRET_ARTIFACT)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -30,12 +49,8 @@ class SecretExposureRule(WorkflowRule):
                 ):
                     step_name = get_step_name(step, idx)
                     out.append(
-                        Finding(
-                            severity=Severity.CRITICAL,
-                            category="Secret Exposure",
-                            description=f"Секрет может быть выведен в логи через echo/print в шаге '{step_name}'.",
-                            location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                            recommendation="Не выводите secrets/token в stdout. Если нужно отладить — используйте маскирование и redaction.",
+                        SECRET_ECHO.at(
+                            f"{path}:jobs.{job_name}.steps[{idx}]", step=step_name
                         )
                     )
 
@@ -51,12 +66,9 @@ class SecretExposureRule(WorkflowRule):
                             for k in ["env", "secret", ".env", "credential"]
                         ):
                             out.append(
-                                Finding(
-                                    severity=Severity.HIGH,
-                                    category="Artifact Exposure",
-                                    description=f"Артефакт может содержать секреты: '{upload_path}'.",
-                                    location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                                    recommendation="Исключите .env/credentials/secrets из артефактов (artifact exclude / отдельные пути).",
+                                SECRET_ARTIFACT.at(
+                                    f"{path}:jobs.{job_name}.steps[{idx}]",
+                                    upload_path=upload_path,
                                 )
                             )
 
@@ -3,15 +3,30 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import iter_jobs
 from static.secrets import SecretDetectionEngine
 
 
+SELF_HOSTED = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Runner",
+    description="Job '{job}' использует self-hosted runner.",
+    recommendation=(
+        "Self-hosted runners повышают риск (персистентное окружение, возможные остатки секретов/артефактов). "
+        "Рекомендуется усилить hardening, изоляцию, очистку workspace, контроль egress и минимизировать permissions."
+    ),
+)
+
+
 @register_workflow_rule
 class SelfHostedRunnerRule(WorkflowRule):
+    rule_id = "self_hosted_runners"
+    requires = Feature.JOBS
+    kinds = (SELF_HOSTED,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -30,16 +45,7 @@ class SelfHostedRunnerRule(WorkflowRule):
 
             if any(lbl.lower().strip() == "self-hosted" for lbl in labels):
                 out.append(
-                    Finding(
-                        severity=Severity.MEDIUM,
-                        category="Runner",
-                        description=f"Job '{job_name}' использует self-hosted runner.",
-                        location=f"{path}:jobs.{job_name}.runs-on",
-                        recommendation=(
-                            "Self-hosted runners повышают риск (персистентное окружение, возможные остатки секретов/артефактов). "
-                            "Рекомендуется усилить hardening, изоляцию, очистку workspace, контроль egress и минимизировать permissions."
-                        ),
-                    )
+                    SELF_HOSTED.at(f"{path}:jobs.{job_name}.runs-on", job=job_name)
                 )
 
         return out
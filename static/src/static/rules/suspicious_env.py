@@ -3,8 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import (
     contains_secret_context,
@@ -16,8 +16,22 @@ from static.rules.utils import (
 from static.secrets import SecretDetectionEngine
 
 
+LITERAL_SECRET_ENV = FindingKind(
+    severity=Severity.HIGH,
+    category="Hardcoded Secret",
+    description=(
+        "Подозрительная переменная окружения '{name}' имеет литеральное значение (возможный hardcoded секрет)."
+    ),
+    recommendation="Перенесите значение в GitHub Secrets/Variables и подставляйте через ${{ secrets.NAME }}.",
+)
+
+
 @register_workflow_rule
 class SuspiciousEnvRule(WorkflowRule):
+    rule_id = "suspicious_env"
+    requires = Feature.ENV
+    kinds = (LITERAL_SECRET_ENV,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -35,15 +49,10 @@ class SuspiciousEnvRule(WorkflowRule):
                 if is_expression(v) or contains_secret_context(v):
                     continue
                 out.append(
-                    Finding(
-                        severity=Severity.HIGH,
-                        category="Hardcoded Secret",
-                        description=(
-                            f"Подозрительная переменная окружения '{k}' имеет литеральное значение (возможный hardcoded секрет)."
-                        ),
-                        location=location,
-                        recommendation="Перенесите значение в GitHub Secrets/Variables и подставляйте через ${{ secrets.NAME }}.",
+                    LITERAL_SECRET_ENV.at(
+                        location,
                         evidence=(v[:20] + "...") if len(v) > 20 else v,
+                        name=k,
                     )
                 )
 
@@ -3,8 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import (
     contains_secret_context,
@@ -17,6 +17,17 @@ from static.rules.utils import (
 from static.secrets import SecretDetectionEngine
 
 
+SECRETS_TO_THIRD_PARTY = FindingKind(
+    severity=Severity.HIGH,
+    category="Third-Party Action",
+    description="Секреты/токены передаются в сторонний GitHub Action.",
+    recommendation=(
+        "Минимизируйте передачу secrets в сторонние actions. Предпочитайте официальные actions, "
+        "проверяйте репутацию/подпись, закрепляйте по SHA и используйте отдельный токен с минимальными правами."
+    ),
+)
+
+
 def _dict_values_strings(d: dict[str, Any]) -> list[str]:
     out: list[str] = []
     for v in d.values():
@@ -27,6 +38,10 @@ def _dict_values_strings(d: dict[str, Any]) -> list[str]:
 
 @register_workflow_rule
 class ThirdPartyActionSecretsRule(WorkflowRule):
+    rule_id = "third_party_action_secrets"
+    requires = Feature.USES
+    kinds = (SECRETS_TO_THIRD_PARTY,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -60,16 +75,8 @@ class ThirdPartyActionSecretsRule(WorkflowRule):
                     continue
 
                 out.append(
-                    Finding(
-                        severity=Severity.HIGH,
-                        category="Third-Party Action",
-                        description="Секреты/токены передаются в сторонний GitHub Action.",
-                        location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                        recommendation=(
-                            "Минимизируйте передачу secrets в сторонние actions. Предпочитайте официальные actions, "
-                            "проверяйте репутацию/подпись, закрепляйте по SHA и используйте отдельный токен с минимальными правами."
-                        ),
-                        evidence=uses,
+                    SECRETS_TO_THIRD_PARTY.at(
+                        f"{path}:jobs.{job_name}.steps[{idx}]", evidence=uses
                     )
                 )
 
@@ -4,15 +4,27 @@ import re
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import get_uses, iter_jobs, iter_steps
 from static.secrets import SecretDetectionEngine
 
 
+UNPINNED_ACTION = FindingKind(
+    severity=Severity.MEDIUM,
+    category="Unpinned Action",
+    description="Action '{action}' не закреплён на commit SHA (используется тег/ветка).",
+    recommendation="Для снижения supply-chain рисков закрепляйте actions по SHA (например actions/checkout@<sha>).",
+)
+
+
 @register_workflow_rule
 class UnpinnedActionsRule(WorkflowRule):
+    rule_id = "unpinned_actions"
+    requires = Feature.USES
+    kinds = (UNPINNED_ACTION,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -31,12 +43,9 @@ class UnpinnedActionsRule(WorkflowRule):
                     continue
 
                 out.append(
-                    Finding(
-                        severity=Severity.MEDIUM,
-                        category="Unpinned Action",
-                        description=f"Action '{uses_value}' не закреплён на commit SHA (используется тег/ветка).",
-                        location=f"{path}:jobs.{job_name}.steps[{idx}].uses",
-                        recommendation="Для снижения supply-chain рисков закрепляйте actions по SHA (например actions/checkout@<sha>).",
+                    UNPINNED_ACTION.at(
+                        f"{path}:jobs.{job_name}.steps[{idx}].uses",
+                        action=uses_value,
                     )
                 )
 
@@ -3,8 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-from static.models import Finding, Severity
-from static.rules.base import WorkflowRule
+from static.models import Finding, FindingKind, Severity
+from static.rules.base import Feature, WorkflowRule
 from .registry import register_workflow_rule
 from static.rules.utils import (
     get_run,
@@ -16,8 +16,26 @@ from static.rules.utils import (
 from static.secrets import SecretDetectionEngine
 
 
+LOCAL_EXEC_ON_PR_TARGET = FindingKind(
+    severity=Severity.CRITICAL,
+    category="Untrusted Code Execution",
+    description=(
+        "В шаге '{step}' выполняется локальный скрипт/файл при trigger 'pull_request_target'. "
+        "Это может позволить PR-автору выполнить произвольный код с доступом к secrets."
+    ),
+    recommendation=(
+        "Не выполняйте код из PR при pull_request_target. Используйте pull_request или разделите workflow: "
+        "безопасные проверки для PR, а деплой/секреты — только после merge/approval."
+    ),
+)
+
+
 @register_workflow_rule
 class UntrustedCodeOnPRTargetRule(WorkflowRule):
+    rule_id = "untrusted_pr_target"
+    requires = Feature.PULL_REQUEST_TARGET | Feature.RUN
+    kinds = (LOCAL_EXEC_ON_PR_TARGET,)
+
     def evaluate(
         self,
         workflow: dict[str, Any],
@@ -42,18 +60,8 @@ class UntrustedCodeOnPRTargetRule(WorkflowRule):
 
                 step_name = get_step_name(step, idx)
                 out.append(
-                    Finding(
-                        severity=Severity.CRITICAL,
-                        category="Untrusted Code Execution",
-                        description=(
-                            f"В шаге '{step_name}' выполняется локальный скрипт/файл при trigger 'pull_request_target'. "
-                            "Это может позволить PR-автору выполнить произвольный код с доступом к secrets."
-                        ),
-                        location=f"{path}:jobs.{job_name}.steps[{idx}]",
-                        recommendation=(
-                            "Не выполняйте код из PR при pull_request_target. Используйте pull_request или разделите workflow: "
-                            "безопасные проверки для PR, а деплой/секреты — только после merge/approval."
-                        ),
+                    LOCAL_EXEC_ON_PR_TARGET.at(
+                        f"{path}:jobs.{job_name}.steps[{idx}]", step=step_name
                     )
                 )
 
@@ -3,14 +3,31 @@ from __future__ import annotations
 from collections.abc import Iterable
 import json
 import re
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from static.pattern_set import (
+    PatternSet,
+    load_pattern_set,
+    pattern_set_from_mapping,
+)
+
+if TYPE_CHECKING:
+    from static.decoding import EncodedSecretDecoder
+    from static.entropy import EntropyDetector
 
 
 @dataclass(frozen=True)
 class SecretMatch:
     secret_type: str
     value: str
+    start: int = -1
+    end: int = -1
+    # Encodings the value was found under, outermost first; empty for raw text.
+    encoding: tuple[str, ...] = ()
 
 
 class SecretDetectionEngine:
@@ -39,24 +56,144 @@ class SecretDetectionEngine:
         "AUTH",
     ]
 
-    def __init__(self, *, patterns_path: Path | None = None):
-        self._patterns: dict[str, str] = dict(self.DEFAULT_PATTERNS)
-
+    def __init__(
+        self,
+        *,
+        patterns_path: Path | None = None,
+        pattern_budget: float | None = None,
+        use_cache: bool = True,
+        entropy_detector: EntropyDetector | None = None,
+        decoder: EncodedSecretDecoder | None = None,
+    ):
+        # Parsing, validation and anchor extraction are cached next to the patterns
+        # file (keyed by its hash) and memoized per process; regexes compile lazily.
+        pattern_set: PatternSet | None = None
         resolved = self._resolve_patterns_path(patterns_path)
         if resolved is not None:
-            loaded = self._load_patterns_json(resolved)
-            if loaded:
-                self._patterns = loaded
+            pattern_set = load_pattern_set(
+                resolved,
+                self._parse_patterns_json,
+                suspicious_names=self.SUSPICIOUS_ENV_NAME_SUBSTRINGS,
+                use_cache=use_cache,
+            )
+            if pattern_set is not None and not pattern_set.patterns:
+                pattern_set = None
+        if pattern_set is None:
+            pattern_set = pattern_set_from_mapping(
+                self.DEFAULT_PATTERNS,
+                suspicious_names=self.SUSPICIOUS_ENV_NAME_SUBSTRINGS,
+            )
+        self._pattern_set = pattern_set
+
+        # Optional per-pattern, per-line time budget (seconds). Python's `re` cannot
+        # be interrupted mid-match, so a pattern that blows the budget on a line is
+        # skipped on every later line at least that long.
+        self.pattern_budget = pattern_budget
+        self.budget_skips: dict[str, int] = {}
+        self._budget_line_limit: dict[str, int] = {}
+        # The thread backend shares one engine between rules; without the GIL
+        # the read-modify-writes above would lose updates.
+        self._budget_lock = threading.Lock()
+
+        # Optional regex-free detector for custom secrets without a known prefix.
+        self.entropy_detector = entropy_detector
+
+        # Optional layer that re-scans base64/hex/URL-encoded spans once decoded.
+        self.decoder = decoder
+
+    @property
+    def patterns(self) -> dict[str, str]:
+        return {p.name: p.regex for p in self._pattern_set.patterns}
+
+    @property
+    def pattern_set(self) -> PatternSet:
+        return self._pattern_set
+
+    def warm(self) -> None:
+        # Compile everything up front, e.g. before forking pool workers.
+        self._pattern_set.warm()
 
     def detect_in_text(self, text: str) -> list[SecretMatch]:
+        if self.pattern_budget is not None:
+            matches = self._detect_with_budget(text, self.pattern_budget)
+        else:
+            matches = self._detect_regex(text)
+        if self.decoder is not None:
+            matches.extend(self.decoder.detect(text, self._detect_regex))
+        if self.entropy_detector is not None:
+            matches.extend(self._detect_entropy(text, matches))
+        return matches
+
+    def _detect_entropy(
+        self, text: str, regex_matches: list[SecretMatch]
+    ) -> list[SecretMatch]:
+        assert self.entropy_detector is not None
+        candidates = self.entropy_detector.detect(text)
+        if not regex_matches:
+            return candidates
+        # Known patterns win: drop entropy hits overlapping any regex match.
+        spans = sorted((m.start, m.end) for m in regex_matches)
+        out: list[SecretMatch] = []
+        for c in candidates:
+            if any(s < c.end and c.start < e for s, e in spans):
+                continue
+            out.append(c)
+        return out
+
+    def _detect_regex(self, text: str) -> list[SecretMatch]:
         matches: list[SecretMatch] = []
-        for secret_type, pattern in self._patterns.items():
-            for match in re.finditer(pattern, text):
+        for p in self._pattern_set.candidates(text):
+            for match in p.compiled.finditer(text):
                 matches.append(
-                    SecretMatch(secret_type=secret_type, value=match.group(0))
+                    SecretMatch(
+                        secret_type=p.name,
+                        value=match.group(0),
+                        start=match.start(),
+                        end=match.end(),
+                    )
                 )
         return matches
 
+    def pattern_rank(self, secret_type: str) -> int:
+        # Lower is more specific: patterns files list specific patterns first and
+        # generic catch-alls last.
+        return self._pattern_set.rank.get(secret_type, len(self._pattern_set.rank))
+
+    def _detect_with_budget(self, text: str, budget: float) -> list[SecretMatch]:
+        matches: list[SecretMatch] = []
+        lines: list[tuple[int, str]] = []
+        offset = 0
+        for raw in text.splitlines(keepends=True):
+            lines.append((offset, raw.rstrip("\r\n")))
+            offset += len(raw)
+        for p in self._pattern_set.candidates(text):
+            secret_type, compiled = p.name, p.compiled
+            limit = self._budget_line_limit.get(secret_type)
+            for line_start, line in lines:
+                if limit is not None and len(line) >= limit:
+                    with self._budget_lock:
+                        self.budget_skips[secret_type] = (
+                            self.budget_skips.get(secret_type, 0) + 1
+                        )
+                    continue
+                started = time.perf_counter()
+                for match in compiled.finditer(line):
+                    matches.append(
+                        SecretMatch(
+                            secret_type=secret_type,
+                            value=match.group(0),
+                            start=line_start + match.start(),
+                            end=line_start + match.end(),
+                        )
+                    )
+                if time.perf_counter() - started > budget:
+                    with self._budget_lock:
+                        # Another thread may have lowered it meanwhile.
+                        shared = self._budget_line_limit.get(secret_type)
+                        limit = len(line) if shared is None else min(shared, len(line))
+                        self._budget_line_limit[secret_type] = limit
+        return matches
+
     @staticmethod
     def _resolve_patterns_path(patterns_path: Path | None) -> Path | None:
         if patterns_path is not None:
@@ -77,11 +214,36 @@ class SecretDetectionEngine:
         return None
 
     @staticmethod
-    def _load_patterns_json(path: Path) -> dict[str, str]:
+    def _load_patterns_json(path: Path, *, validate: bool = True) -> dict[str, str]:
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
+            raw = path.read_bytes()
+        except OSError:
+            return {}
+        patterns = SecretDetectionEngine._parse_patterns_json(raw)
+        if validate:
+            patterns = {
+                name: regex
+                for name, regex in patterns.items()
+                if SecretDetectionEngine._is_valid_regex(regex)
+            }
+        return patterns
+
+    @staticmethod
+    def _is_valid_regex(regex: str) -> bool:
+        try:
+            re.compile(regex)
+        except re.error:
+            return False
+        return True
+
+    @staticmethod
+    def _parse_patterns_json(raw: bytes) -> dict[str, str]:
+        try:
+            data = json.loads(raw.decode("utf-8"))
         except Exception:
             return {}
+        if not isinstance(data, dict):
+            return {}
 
         patterns: dict[str, str] = {}
         items = data.get("patterns")
@@ -99,8 +261,8 @@ class SecretDetectionEngine:
         return patterns
 
     def is_suspicious_env_name(self, name: str) -> bool:
-        upper = name.upper()
-        return any(s in upper for s in self.SUSPICIOUS_ENV_NAME_SUBSTRINGS)
+        suspicious = self._pattern_set.suspicious
+        return suspicious is not None and suspicious.search(name.upper()) is not None
 
     def iter_suspicious_env_names(self, env: Iterable[str]) -> list[str]:
         out: list[str] = []
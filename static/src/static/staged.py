@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from contextlib import closing
+from pathlib import Path
+
+from static.analyzers.static_github_actions import StaticGithubActionsAnalyzer
+from static.git import SKIP_MODES, WORKFLOWS_DIR, CatFile, git, is_workflow_path
+from static.models import Finding, Severity
+
+
+def staged_workflows(root: Path) -> list[tuple[str, str]]:
+    # (path, blob id) of workflow files added, copied, modified or renamed in the
+    # index, as they will be committed.
+    out = git(
+        root,
+        "diff",
+        "--cached",
+        "--raw",
+        "-z",
+        "--no-abbrev",
+        "--diff-filter=ACMR",
+        "--",
+        WORKFLOWS_DIR,
+    )
+    tokens = out.split(b"\0")
+    result: list[tuple[str, str]] = []
+    i = 0
+    while i < len(tokens):
+        header = tokens[i].decode()
+        i += 1
+        if not header.startswith(":"):
+            continue
+        _, new_mode, _, new_sha, status = header[1:].split()
+        if status[0] in "RC":
+            i += 1  # source path
+        path = tokens[i].decode("utf-8", "surrogateescape")
+        i += 1
+        if new_mode in SKIP_MODES:
+            continue
+        if is_workflow_path(path):
+            result.append((path, new_sha))
+    return result
+
+
+def read_staged_workflows(root: Path) -> list[tuple[str, bytes]]:
+    entries = staged_workflows(root)
+    if not entries:
+        return []
+    # Everything is read before analysis starts: forked pool workers would
+    # inherit the pipe and keep cat-file from ever seeing EOF.
+    with CatFile(root) as cat:
+        return [(path, cat.read(sha)) for path, sha in entries]
+
+
+def analyze_staged(
+    analyzer: StaticGithubActionsAnalyzer, root: Path, *, fail_fast: bool = False
+) -> list[Finding]:
+    findings: list[Finding] = []
+    with closing(analyzer.analyze_many(read_staged_workflows(root))) as results:
+        for _, found in results:
+            findings.extend(found)
+            if fail_fast and any(f.severity == Severity.CRITICAL for f in found):
+                break
+    return findings
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from static.fingerprint import finding_fingerprint
+from static.models import Finding
+
+
+STORE_VERSION = 1
+
+# Rows handed to executemany at once; bounds memory for very large scans.
+_BATCH = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    file TEXT NOT NULL,
+    scanned_at REAL NOT NULL,
+    findings INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    repo TEXT NOT NULL,
+    file TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    location TEXT NOT NULL,
+    recommendation TEXT NOT NULL,
+    evidence TEXT NOT NULL,
+    occurrences INTEGER NOT NULL,
+    first_scan INTEGER NOT NULL,
+    last_scan INTEGER NOT NULL,
+    open INTEGER NOT NULL,
+    PRIMARY KEY (repo, file, rule_id, fingerprint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS findings_rule ON findings (rule_id, open, repo);
+CREATE INDEX IF NOT EXISTS findings_severity ON findings (severity, open);
+CREATE TABLE IF NOT EXISTS repo_rules (
+    repo TEXT NOT NULL,
+    rule_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    findings INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL,
+    PRIMARY KEY (repo, rule_id, severity)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS repo_rules_rule ON repo_rules (rule_id, severity);
+"""
+
+_UPSERT = """
+INSERT INTO findings (
+    repo, file, rule_id, fingerprint, severity, category, description, location,
+    recommendation, evidence, occurrences, first_scan, last_scan, open
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT (repo, file, rule_id, fingerprint) DO UPDATE SET
+    severity = excluded.severity,
+    category = excluded.category,
+    description = excluded.description,
+    location = excluded.location,
+    recommendation = excluded.recommendation,
+    evidence = excluded.evidence,
+    occurrences = excluded.occurrences,
+    last_scan = excluded.last_scan,
+    open = 1
+"""
+
+
+class StoreError(Exception):
+    pass
+
+
+class FindingStore:
+    # Findings of all scans keyed by (repo, file, rule, fingerprint). A finding
+    # missing from the latest scan of its file is kept but marked closed, so
+    # history survives and "still open" is a plain indexed filter. repo_rules
+    # aggregates open findings per repo and is adjusted by each scan's delta,
+    # which keeps fleet-wide summaries independent of the number of findings.
+    def __init__(self, path: Path):
+        try:
+            self._db = sqlite3.connect(path, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("PRAGMA busy_timeout=30000")
+            self._db.executescript(_SCHEMA)
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise StoreError(str(e)) from None
+        if row is None:
+            self._db.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', ?)",
+                (str(STORE_VERSION),),
+            )
+        elif int(row[0]) > STORE_VERSION:
+            self._db.close()
+            raise StoreError(
+                f"неподдерживаемая версия хранилища {row[0]} (максимум {STORE_VERSION})"
+            )
+
+    def __enter__(self) -> FindingStore:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Groups several record_scan calls into one write transaction; batch
+        # scans commit once per journal checkpoint (--sync-every files).
+        if self._db.in_transaction:
+            yield
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def record_scan(
+        self,
+        repo: str,
+        file: str,
+        findings: Iterable[Finding],
+        *,
+        scanned_at: float | None = None,
+    ) -> int:
+        now = time.time() if scanned_at is None else scanned_at
+        db = self._db
+        with self.transaction():
+            scan_id = db.execute(
+                "INSERT INTO scans (repo, file, scanned_at, findings) VALUES (?, ?, ?, 0)",
+                (repo, file, now),
+            ).lastrowid
+            assert scan_id is not None
+            before = self._file_counts(repo, file)
+            count = 0
+            batch: list[tuple[Any, ...]] = []
+            for f in findings:
+                batch.append(_row(repo, file, f, scan_id))
+                if len(batch) >= _BATCH:
+                    db.executemany(_UPSERT, batch)
+                    count += len(batch)
+                    batch.clear()
+            db.executemany(_UPSERT, batch)
+            count += len(batch)
+
+            db.execute(
+                "UPDATE findings SET open = 0"
+                " WHERE repo = ? AND file = ? AND open = 1 AND last_scan < ?",
+                (repo, file, scan_id),
+            )
+            db.execute("UPDATE scans SET findings = ? WHERE id = ?", (count, scan_id))
+            self._apply_delta(repo, before, self._file_counts(repo, file))
+        return count
+
+    def _file_counts(
+        self, repo: str, file: str
+    ) -> dict[tuple[str, str], tuple[int, int]]:
+        rows = self._db.execute(
+            "SELECT rule_id, severity, count(*), sum(occurrences) FROM findings"
+            " WHERE repo = ? AND file = ? AND open = 1 GROUP BY rule_id, severity",
+            (repo, file),
+        )
+        return {(r, s): (n, occ) for r, s, n, occ in rows}
+
+    def _apply_delta(
+        self,
+        repo: str,
+        before: dict[tuple[str, str], tuple[int, int]],
+        after: dict[tuple[str, str], tuple[int, int]],
+    ) -> None:
+        for key in before.keys() | after.keys():
+            n0, occ0 = before.get(key, (0, 0))
+            n1, occ1 = after.get(key, (0, 0))
+            if (n0, occ0) == (n1, occ1):
+                continue
+            rule_id, severity = key
+            self._db.execute(
+                "INSERT INTO repo_rules (repo, rule_id, severity, findings, occurrences)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (repo, rule_id, severity) DO UPDATE SET"
+                " findings = findings + excluded.findings,"
+                " occurrences = occurrences + excluded.occurrences",
+                (repo, rule_id, severity, n1 - n0, occ1 - occ0),
+            )
+        self._db.execute(
+            "DELETE FROM repo_rules WHERE repo = ? AND findings <= 0", (repo,)
+        )
+
+    def summary(self) -> list[tuple[str, int, int, int]]:
+        # (severity, repos, findings, occurrences) over open findings.
+        return self._db.execute(
+            "SELECT severity, count(DISTINCT repo), sum(findings), sum(occurrences)"
+            " FROM repo_rules GROUP BY severity"
+        ).fetchall()
+
+    def rules(self) -> list[tuple[str, str, int, int]]:
+        # (rule_id, severity, repos, findings), most widespread first.
+        return self._db.execute(
+            "SELECT rule_id, severity, count(*), sum(findings) FROM repo_rules"
+            " GROUP BY rule_id, severity ORDER BY count(*) DESC, rule_id, severity"
+        ).fetchall()
+
+    def repos(
+        self, *, rule: str | None = None, severity: str | None = None
+    ) -> list[tuple[str, int]]:
+        # Repos with open findings, optionally of one rule and/or severity.
+        where, params = _filters(rule=rule, severity=severity)
+        return self._db.execute(
+            f"SELECT repo, sum(findings) FROM repo_rules{where}"
+            " GROUP BY repo ORDER BY sum(findings) DESC, repo",
+            params,
+        ).fetchall()
+
+    def findings(
+        self,
+        *,
+        repo: str | None = None,
+        rule: str | None = None,
+        severity: str | None = None,
+        include_closed: bool = False,
+        limit: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        where, params = _filters(
+            repo=repo, rule=rule, severity=severity, open=None if include_closed else 1
+        )
+        sql = f"SELECT * FROM findings{where} ORDER BY repo, file, rule_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cur = self._db.execute(sql, params)
+        names = [d[0] for d in cur.description]
+        for row in cur:
+            item = dict(zip(names, row))
+            item["open"] = bool(item["open"])
+            yield item
+
+
+def guess_repo(path: Path) -> str:
+    # Name of the enclosing git checkout, or "" outside of one.
+    for parent in path.resolve().parents:
+        if (parent / ".git").exists():
+            return parent.name
+    return ""
+
+
+def _row(repo: str, file: str, f: Finding, scan_id: int) -> tuple[Any, ...]:
+    return (
+        repo,
+        file,
+        f.rule_id or f.category,
+        finding_fingerprint(f),
+        f.severity.value,
+        f.category,
+        f.description,
+        f.location,
+        f.recommendation,
+        f.evidence,
+        f.occurrences,
+        scan_id,
+        scan_id,
+    )
+
+
+def _filters(**values: Any) -> tuple[str, list[Any]]:
+    columns = {"repo": "repo", "rule": "rule_id", "severity": "severity", "open": "open"}
+    clauses: list[str] = []
+    params: list[Any] = []
+    for name, value in values.items():
+        if value is not None:
+            clauses.append(f"{columns[name]} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from static.analyzers.static_github_actions import StaticGithubActionsAnalyzer
+from static.baseline import finding_key
+from static.models import Finding
+
+
+WORKFLOWS_DIR = Path(".github/workflows")
+ACTIONS_DIR = Path(".github/actions")
+
+_YAML_SUFFIXES = (".yml", ".yaml")
+_ACTION_FILES = ("action.yml", "action.yaml")
+
+# Local references: `uses: ./path` in steps (actions) and jobs (reusable workflows).
+_LOCAL_USES_RE = re.compile(r"""(?m)^[\s-]*uses:\s*['"]?(\./[^\s'"#]+)""")
+
+
+class Watcher(ABC):
+    @abstractmethod
+    def wait(self, timeout: float | None) -> set[Path]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher(Watcher):
+    # Recursive inotify watch over .github (or the root until .github appears),
+    # through libc via ctypes so no extra dependency is needed.
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify недоступен")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._fd = fd
+        self._root = root
+        self._dirs: dict[int, Path] = {}
+        self._rescan = False
+        self._watch_roots()
+
+    def _add(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def _add_tree(self, path: Path) -> None:
+        for dirpath, _, _ in os.walk(path):
+            self._add(Path(dirpath))
+
+    def _watch_roots(self) -> None:
+        github = self._root / ".github"
+        if github.is_dir():
+            self._add_tree(github)
+        else:
+            self._add(self._root)
+
+    def _rearm(self) -> None:
+        # .github was deleted or moved away: drop the watches on its tree and
+        # watch the root until it comes back. It may already be back.
+        github = self._root / ".github"
+        for wd, path in list(self._dirs.items()):
+            if path == github or github in path.parents:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+        self._add(self._root)
+        if github.is_dir():
+            self._add_tree(github)
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        github = self._root / ".github"
+        changed: set[Path] = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+                pos += _EVENT.size
+                name = buf[pos : pos + length].rstrip(b"\0")
+                pos += length
+                if mask & _IN_Q_OVERFLOW:
+                    self._rescan = True
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                base = self._dirs.get(wd)
+                if base is None:
+                    continue
+                if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF) and base == github:
+                    self._rearm()
+                    self._rescan = True
+                    continue
+                path = base / os.fsdecode(name) if name else base
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        if base == self._root and path.name != ".github":
+                            continue
+                        self._add_tree(path)
+                        # Files may have landed before the watch existed.
+                        changed.update(p for p in path.rglob("*") if p.is_file())
+                    changed.add(path)
+                    continue
+                changed.add(path)
+        if self._rescan:
+            self._rescan = False
+            changed.add(self._root)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, root: Path, interval: float = 0.1):
+        self._root = root
+        self._interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        out: dict[Path, tuple[int, int]] = {}
+        for path in iter_watched_files(self._root):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            out[path] = (st.st_mtime_ns, st.st_size)
+        return out
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {
+                p
+                for p in state.keys() | self._state.keys()
+                if state.get(p) != self._state.get(p)
+            }
+            self._state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            pause = self._interval
+            if deadline is not None:
+                pause = min(pause, max(0.0, deadline - time.monotonic()))
+            time.sleep(pause)
+
+
+def open_watcher(root: Path, *, poll: bool = False, interval: float = 0.1) -> Watcher:
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+def is_workflow(root: Path, path: Path) -> bool:
+    return path.parent == root / WORKFLOWS_DIR and path.suffix in _YAML_SUFFIXES
+
+
+def is_action(root: Path, path: Path) -> bool:
+    return path.name in _ACTION_FILES and (root / ACTIONS_DIR) in path.parents
+
+
+def iter_watched_files(root: Path) -> Iterable[Path]:
+    workflows = root / WORKFLOWS_DIR
+    if workflows.is_dir():
+        for p in sorted(workflows.iterdir()):
+            if p.suffix in _YAML_SUFFIXES and p.is_file():
+                yield p
+    actions = root / ACTIONS_DIR
+    if actions.is_dir():
+        for name in _ACTION_FILES:
+            yield from sorted(actions.rglob(name))
+
+
+def local_uses(root: Path, text: str) -> set[Path]:
+    # Targets of local `uses:` references: an action directory or a reusable
+    # workflow file, resolved against the repository root.
+    out: set[Path] = set()
+    for ref in _LOCAL_USES_RE.findall(text):
+        out.add(Path(os.path.normpath(root / ref.split("@", 1)[0])))
+    return out
+
+
+@dataclass
+class FileDiff:
+    path: Path
+    added: list[Finding] = field(default_factory=list)
+    removed: list[Finding] = field(default_factory=list)
+
+
+class WatchSession:
+    # Keeps the analyzer, the last findings per workflow and a reverse index of
+    # local `uses:` references between watched files.
+    def __init__(self, root: Path, analyzer: StaticGithubActionsAnalyzer):
+        self.root = root
+        self.analyzer = analyzer
+        self.findings: dict[Path, dict[tuple[str, str, str], Finding]] = {}
+        self._uses: dict[Path, set[Path]] = {}
+        self._dependents: dict[Path, set[Path]] = {}
+
+    def _index(self, path: Path) -> None:
+        for target in self._uses.pop(path, set()):
+            deps = self._dependents.get(target)
+            if deps is not None:
+                deps.discard(path)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return
+        targets = local_uses(self.root, text)
+        self._uses[path] = targets
+        for target in targets:
+            self._dependents.setdefault(target, set()).add(path)
+
+    def affected(self, changed: Iterable[Path]) -> set[Path]:
+        # Changed workflows plus every workflow reaching a changed file through a
+        # chain of local `uses:` (composite actions may use other local actions).
+        seen: set[Path] = set()
+        queue = list(changed)
+        while queue:
+            path = queue.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            keys = [path]
+            if path.name in _ACTION_FILES:
+                keys.append(path.parent)
+            for key in keys:
+                queue.extend(self._dependents.get(key, ()))
+        return {p for p in seen if is_workflow(self.root, p)}
+
+    def scan_all(self) -> list[FileDiff]:
+        files = list(iter_watched_files(self.root))
+        for path in files:
+            self._index(path)
+        return self._analyze(p for p in files if is_workflow(self.root, p))
+
+    def update(self, changed: set[Path]) -> list[FileDiff]:
+        if self.root in changed:
+            # Event queue overflowed or .github was replaced: start over.
+            known = set(self.findings) | set(self._uses) | set(iter_watched_files(self.root))
+            changed = known
+        relevant = {
+            p for p in changed if is_workflow(self.root, p) or is_action(self.root, p)
+        }
+        for path in relevant:
+            self._index(path)
+        return self._analyze(sorted(self.affected(relevant)))
+
+    def _analyze(self, paths: Iterable[Path]) -> list[FileDiff]:
+        diffs: list[FileDiff] = []
+        for path in paths:
+            old = self.findings.get(path, {})
+            if path.is_file():
+                new = {finding_key(f): f for f in self.analyzer.analyze_workflow_file(path)}
+                self.findings[path] = new
+            else:
+                new = {}
+                self.findings.pop(path, None)
+            diff = FileDiff(
+                path,
+                added=[f for k, f in new.items() if k not in old],
+                removed=[f for k, f in old.items() if k not in new],
+            )
+            if diff.added or diff.removed:
+                diffs.append(diff)
+        return diffs
+
+
+def run(
+    session: WatchSession,
+    watcher: Watcher,
+    *,
+    debounce: float,
+    report: Callable[[list[FileDiff], float], None],
+) -> None:
+    while True:
+        changed = watcher.wait(None)
+        if not changed:
+            continue
+        started = time.perf_counter()
+        # Editors save in bursts (truncate, write, rename); wait for a quiet gap.
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        diffs = session.update(changed)
+        report(diffs, time.perf_counter() - started)